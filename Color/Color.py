@@ -8,10 +8,79 @@ Color : Blue,Green,Red,Yellowの
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24 (Updated: 2025/11/11)" 
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import os
+
+from Color.SharedSoundBank import SharedSoundBank
 
 from Instrument.Instrument import Instrument
 
+from Returner.Returner import *
+
+def makeSoundFromSeed(an_instrument, seed):
+    """
+    楽器の音を作成します
+    乱数を使う楽器があるため、楽器ごとに渡されたシードから作成し、
+    呼び出したプロセスの乱数の状態は元に戻す
+    Arguments:
+        an_instrument : 楽器
+        seed : 乱数のシード
+    """
+
+    state = np.random.get_state()
+    np.random.seed(seed)
+    try:
+        an_instrument.makeSound()
+    finally:
+        np.random.set_state(state)
+
+def renderInstrument(an_instrument, seed):
+    """
+    楽器の音を作成し、(音の群れ, 音ごとに計算を打ち切った位置の群れ, 楽器に残した状態)を応答します
+    プロセスプールの各プロセスで呼ばれるため、モジュールの関数として定義する
+    音の群れと楽器に残した状態(トレースの記録など)はpickleされて親のプロセスに送られる
+    Arguments:
+        an_instrument : 楽器
+        seed : 乱数のシード
+    """
+
+    makeSoundFromSeed(an_instrument, seed)
+
+    return an_instrument.getSoundBank(), an_instrument.getSilenceCutoffs(), an_instrument.getRenderState()
+
+def renderInstrumentShared(an_instrument, seed, name, shape, sample_format):
+    """
+    楽器の音を、親のプロセスが確保した共有メモリに直接作成し、
+    (音ごとに計算を打ち切った位置の群れ, 楽器に残した状態)を応答します
+    音の群れ自体は送らないため、送る量は(トレースの記録などがなければ)音の長さによらない
+    楽器がそのまま書き込めなかった(既に音の群れを持っていた)場合に限り、共有メモリにコピーする
+    Arguments:
+        an_instrument : 楽器
+        seed : 乱数のシード
+        name : 共有メモリの名前
+        shape : 共有メモリの音の群れの形(getSoundBankShapeの形)
+        sample_format : 共有メモリの配列の型の名前
+    """
+
+    shared_sound_bank = SharedSoundBank(shape, sample_format, name)
+    try:
+        an_instrument.setSoundBuffer(shared_sound_bank.soundBank)
+        makeSoundFromSeed(an_instrument, seed)
+        if an_instrument.getSoundBank() is not shared_sound_bank.soundBank:
+            shared_sound_bank.soundBank[...] = an_instrument.getSoundBank()
+        silence_cutoffs = list(an_instrument.getSilenceCutoffs())
+        render_state = an_instrument.getRenderState()
+        an_instrument.releaseSounds()
+    finally:
+        shared_sound_bank.close()
+
+    return silence_cutoffs, render_state
+
 class Color:
     """
     Colorクラス
@@ -24,28 +93,140 @@ class Color:
         2:  prepareToPerformの作成
         2:  performの作成
         3:  テスト(いらんかも)を行う
+        4:  prepareToPerformで、楽器の音をプロセスプールで並列に作成する
+        5:  並列に作成した音を、共有メモリでコピーせずに受け取る
     Properties:
         instruments: 音を出す楽器群
+        maxWorkers: 楽器の音を並列に作成するプロセス数(Noneなら環境変数、またはCPUの数)
+        sharedMemory: 並列に作成した音を共有メモリで受け取るか(Falseならpickleで受け取る)
     """
 
     def __init__(self):
         """
         このクラスのコンストラクタ
-        instrumentsプロパティを初期化する
+        instrumentsプロパティと、maxWorkersプロパティ、sharedMemoryプロパティを初期化する
         """
 
         self.instruments = []
-    
+        self.maxWorkers = nonePointer()
+        self.sharedMemory = returnTrue()
+
+    def setMaxWorkers(self, max_workers):
+        """
+        prepareToPerformが楽器の音を並列に作成するプロセス数を設定します
+        1なら、プロセスを作らずに順に作成する
+        Arguments:
+            max_workers : プロセス数(正の整数)、Noneなら設定を取り消す
+        """
+
+        assert max_workers is None or (isinstance(max_workers, int) and max_workers > 0), \
+            "プロセス数は正の整数です"
+        self.maxWorkers = max_workers
+
+    def setSharedMemory(self, shared_memory):
+        """
+        prepareToPerformが並列に作成した音を、共有メモリで受け取るかを設定します
+        Arguments:
+            shared_memory : Trueなら共有メモリ、Falseならpickleで受け取る
+        """
+
+        self.sharedMemory = bool(shared_memory)
+
+    def getMaxWorkers(self):
+        """
+        prepareToPerformが楽器の音を並列に作成するプロセス数を応答します
+        setMaxWorkersで設定されていればそれを、
+        そうでなければ環境変数に設定された数を、どちらもなければCPUの数を、
+        楽器の数を上限として応答する
+        """
+
+        max_workers = self.maxWorkers
+        if max_workers is None:
+            max_workers = configuredWorkerCount()
+        if max_workers is None:
+            max_workers = os.cpu_count() or oneInt()
+
+        return max(min(max_workers, len(self.instruments)), oneInt())
+
     def prepareToPerform(self):
         """
         演奏(音を出す)ための準備を行います。
-        自分が持っている楽器それぞれのmakeSoundを呼び出します
+        自分が持っている楽器それぞれの音を作成し、その音の群れを楽器に束縛します
+        楽器の計算はPythonのループが重く、スレッドではGILのため速くならないので、
+        プロセスプール(getMaxWorkersのプロセス数)で楽器ごとに並列に作成する
+        そのため、全ての楽器を準備する時間は、おおよそ最も遅い楽器の時間となる
+        乱数のシードは楽器ごとにここで決めるため、作成される音はプロセス数によらない
+        各プロセスで楽器に残した状態(OboeのsetTraceによるリード流量の記録など)は、
+        音と共に送り返し、この楽器に束縛する(順に作成した場合と同じ状態になる)
+        sharedMemoryがTrueなら、各プロセスは共有メモリに音の群れを直接書き込み、
+        楽器のsoundBankはその共有メモリを包む配列となる(releaseInstrumentsで解放する)
         """
 
         for an_instrument in self.instruments:
             assert isinstance(an_instrument, Instrument)
-            an_instrument.makeSound()
-    
+
+        seeds = np.random.randint(np.iinfo(np.uint32).max, size=len(self.instruments))
+        max_workers = self.getMaxWorkers()
+
+        if max_workers == oneInt():
+            self.__adoptSounds(map(renderInstrument, self.instruments, seeds))
+            return
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            if self.sharedMemory:
+                self.__adoptSharedSounds(executor, seeds)
+            else:
+                self.__adoptSounds(executor.map(renderInstrument, self.instruments, seeds))
+
+    def __adoptSounds(self, results):
+        """
+        renderInstrumentの結果の群れを、楽器の並びのまま楽器それぞれに束縛します
+        Arguments:
+            results : (音の群れ, 音ごとに計算を打ち切った位置の群れ, 楽器に残した状態)の群れ
+        """
+
+        for an_instrument, (sound_bank, silence_cutoffs, render_state) in zip(self.instruments, results):
+            an_instrument.setSoundBank(sound_bank, silence_cutoffs)
+            an_instrument.setRenderState(render_state)
+
+    def __adoptSharedSounds(self, executor, seeds):
+        """
+        楽器ごとに、作成される音の群れの大きさ(soundWaveDataから求まるサンプル数)の共有メモリを確保し、
+        各プロセスに書き込ませて、その共有メモリを包む配列を楽器それぞれに束縛します
+        共有メモリの名前は、書き込み終えたら(失敗しても)消す
+        以降は楽器が開いている間だけ残り、楽器を解放したときに解放される
+        Arguments:
+            executor : プロセスプール
+            seeds : 楽器ごとの乱数のシード
+        """
+
+        shared_sound_banks = []
+        try:
+            for an_instrument in self.instruments:
+                shape, sample_format = an_instrument.getSoundBankShape()
+                shared_sound_banks.append(SharedSoundBank(shape, sample_format))
+
+            results = executor.map(renderInstrumentShared, self.instruments, seeds,
+                                   [a_bank.getName() for a_bank in shared_sound_banks],
+                                   [a_bank.shape for a_bank in shared_sound_banks],
+                                   [a_bank.sampleFormat for a_bank in shared_sound_banks])
+            for an_instrument, a_bank, (silence_cutoffs, render_state) in zip(self.instruments,
+                                                                              shared_sound_banks, results):
+                an_instrument.setSoundBank(a_bank.soundBank, silence_cutoffs, a_bank)
+                an_instrument.setRenderState(render_state)
+        finally:
+            for a_bank in shared_sound_banks:
+                a_bank.unlink()
+
+    def releaseInstruments(self):
+        """
+        自分が持っている楽器それぞれの音の群れを手放し(共有メモリにあれば閉じ)、楽器群を空にします
+        """
+
+        for an_instrument in self.instruments:
+            an_instrument.releaseSounds()
+        self.instruments = emptyList()
+
     def perform(self):
         """
         演奏を行います。
@@ -58,4 +239,4 @@ class Color:
         但し、このperformは何もしない。子クラスのperformに処理を任せる
         """
 
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,93 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+SharedSoundBank : 共有メモリ上の音の群れ
+楽器の音を作成するプロセスが音の群れを直接書き込み、
+親のプロセスがコピーせずにnumpyの配列として受け取るための
+共有メモリを定義するファイル
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from Returner.Returner import *
+
+class SharedSoundBank:
+    """
+    共有メモリ上の音の群れクラス
+    親のプロセスが(音の数 × サンプル数)の大きさで共有メモリを確保し、
+    子のプロセスは名前でそれを開いて音の群れを書き込む
+    どちらのプロセスも、soundBankは共有メモリをそのまま包む配列(コピーではない)である
+    共有メモリの名前は、子のプロセスが書き込み終えたらunlinkで消してよい
+    (開いている間は消えず、全てのプロセスがcloseしたときに解放される)
+    Properties:
+        soundBank : 共有メモリを包む配列(音の数 × サンプル数)
+        sharedMemory : 共有メモリ
+        shape : 音の群れの形(音の数, サンプル数)
+        sampleFormat : 配列の型の名前
+    """
+
+    def __init__(self, shape, sample_format, name=None):
+        """
+        このクラスのコンストラクタ
+        nameがなければ共有メモリを確保し、あればその名前の共有メモリを開く
+        soundBankは、手放すときに共有メモリより先に手放されるよう、最初に初期化する
+        Arguments:
+            shape : 音の群れの形(音の数, サンプル数)
+            sample_format : 配列の型の名前(sampleFormatsのいずれか)
+            name : 開く共有メモリの名前、Noneなら確保する
+        """
+
+        self.soundBank = nonePointer()
+        self.shape = tuple(int(a_length) for a_length in shape)
+        self.sampleFormat = np.dtype(sample_format).name
+        if name is None:
+            size = int(np.prod(self.shape)) * np.dtype(self.sampleFormat).itemsize
+            self.sharedMemory = SharedMemory(create=True, size=max(size, oneInt()))
+        else:
+            self.sharedMemory = self.__attach(name)
+        self.soundBank = np.ndarray(self.shape, dtype=self.sampleFormat, buffer=self.sharedMemory.buf)
+
+    def __attach(self, name):
+        """
+        名前で共有メモリを開いて応答します
+        消すのは確保したプロセスであるため、開いたプロセスでは資源の追跡をしない
+        (Python 3.12以前にはtrackの引数がないため、そのまま開く)
+        Arguments:
+            name : 共有メモリの名前
+        """
+
+        try:
+            return SharedMemory(name=name, track=False)
+        except TypeError:
+            return SharedMemory(name=name)
+
+    def getName(self):
+        """
+        共有メモリの名前(子のプロセスに渡すもの)を応答します
+        """
+
+        return self.sharedMemory.name
+
+    def unlink(self):
+        """
+        共有メモリの名前を消します
+        既に開いているプロセスはそのまま使い続けられ、全てがcloseしたときに解放される
+        """
+
+        self.sharedMemory.unlink()
+
+    def close(self):
+        """
+        soundBankを手放し、このプロセスから共有メモリを閉じます
+        soundBankの行などを指す配列が残っていると閉じられないため、先に手放しておくこと
+        """
+
+        self.soundBank = nonePointer()
+        self.sharedMemory.close()
@@ -0,0 +1,106 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+BiquadBank : 二次セクション(biquad)の群れ
+縦続接続した二次セクション(SOS)をまとめて掛けるクラスと、
+その係数を設計してキャッシュする関数群を定義するファイル
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/17"
+
+import numpy as np
+
+from scipy.signal import butter, sosfilt
+
+# 設計ごとの二次セクション(SOS)のキャッシュ
+sos_cache = {}
+
+def resonatorSOS(frequencies, Q, sample_rate):
+    """
+    共鳴(ピークの利得が1のバンドパス)フィルタ群を縦続接続したSOSを応答します
+    一度設計したSOSは保存し、以降はそれを使い回す
+    Arguments:
+        frequencies : 共鳴周波数の群れ
+        Q : 共鳴の鋭さ
+        sample_rate : サンプリング周波数
+    """
+
+    key = ("resonator", tuple(frequencies), Q, sample_rate)
+    if key not in sos_cache:
+        omegas = 2 * np.pi * np.asarray(frequencies, dtype=float) / sample_rate
+        alphas = np.sin(omegas) / (2 * Q)
+        a0 = 1 + alphas
+
+        sos = np.zeros((len(omegas), 6))
+        sos[:, 0] = alphas / a0
+        sos[:, 2] = -alphas / a0
+        sos[:, 3] = 1.0
+        sos[:, 4] = -2 * np.cos(omegas) / a0
+        sos[:, 5] = (1 - alphas) / a0
+        sos_cache[key] = sos
+    return sos_cache[key]
+
+def butterworthSOS(order, cutoffs, btype, sample_rate):
+    """
+    バターワースフィルタのSOSを応答します
+    一度設計したSOSは保存し、以降はそれを使い回す
+    Arguments:
+        order : 次数
+        cutoffs : 遮断周波数の群れ(low, high, lowpass, highpassなら一つ、bandpassなら二つ)
+        btype : フィルタの種類
+        sample_rate : サンプリング周波数
+    """
+
+    key = ("butterworth", order, tuple(cutoffs), btype, sample_rate)
+    if key not in sos_cache:
+        nyquist = 0.5 * sample_rate
+        normalized = [a_cutoff / nyquist for a_cutoff in cutoffs]
+        if len(normalized) == 1:
+            normalized = normalized[0]
+        sos_cache[key] = butter(order, normalized, btype=btype, output='sos')
+    return sos_cache[key]
+
+class BiquadBank:
+    """
+    縦続接続した二次セクションの群れクラス
+    信号(1次元、または 音の数 × サンプル数 の2次元配列)の最後の軸に沿って
+    全てのセクションを一度に掛ける
+    フィルタの状態を持ち越すため、信号を区切って(ブロックごとに)渡しても、
+    全体を一度に渡した場合と同じ出力になる
+    Properties:
+        sos : 二次セクションの係数(セクションの数 × 6)
+        state : フィルタの状態(最初のprocessまではNone)
+    """
+
+    def __init__(self, sos):
+        """
+        このクラスのコンストラクタ
+        Arguments:
+            sos : 二次セクションの係数(セクションの数 × 6)
+        """
+
+        self.sos = np.atleast_2d(sos)
+        self.state = None
+
+    def reset(self):
+        """
+        フィルタの状態を捨て、次のprocessを無音から始めます
+        """
+
+        self.state = None
+
+    def process(self, signals):
+        """
+        信号にフィルタを掛けて応答します
+        Arguments:
+            signals : 信号(1次元、または 音の数 × サンプル数 の2次元配列)
+        """
+
+        signals = np.asarray(signals, dtype=float)
+        if self.state is None:
+            self.state = np.zeros((len(self.sos),) + signals.shape[:-1] + (2,))
+        outputs, self.state = sosfilt(self.sos, signals, axis=-1, zi=self.state)
+        return outputs
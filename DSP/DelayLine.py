@@ -0,0 +1,75 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+DelayLine : 遅延線
+np.rollによるコピーを行わず、先頭の位置(head)を動かすことで
+値を送るリングバッファとしての遅延線を定義するファイル
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/17"
+
+class DelayLine:
+    """
+    遅延線クラス
+    論理的な k 番目の値(0 番目が最も古い値)は buffer[(head + k) % length] にある
+    pushで最も古い値を新しい値で上書きし、先頭を一つ進めるため、
+    一サンプル進めるのに値のコピーは起こらない
+    1サンプルごとのループから呼ばれるため、値はnumpy配列ではなく
+    (添字による読み書きが速い)Pythonのリストで持つ
+    Properties:
+        buffer : 値を持つリスト
+        length : 遅延線の長さ
+        head : 最も古い値の位置
+    """
+
+    __slots__ = ("buffer", "length", "head")
+
+    def __init__(self, length, initial_values=None):
+        """
+        このクラスのコンストラクタ
+        Arguments:
+            length : 遅延線の長さ
+            initial_values : 初期値の群れ(Noneなら全て0)
+        """
+
+        assert length > 0, "遅延線の長さは1以上です"
+        if initial_values is None:
+            self.buffer = [0.0] * length
+        else:
+            self.buffer = [float(a_value) for a_value in initial_values]
+            assert len(self.buffer) == length, "初期値の数と遅延線の長さが一致しません"
+        self.length = length
+        self.head = 0
+
+    def tap(self, k):
+        """
+        論理的な k 番目(0 番目が最も古い、-1 番目が最も新しい)の値を応答します
+        Arguments:
+            k : 最も古い値からの位置
+        """
+
+        return self.buffer[(self.head + k) % self.length]
+
+    def push(self, value):
+        """
+        最も古い値を新しい値で上書きし、先頭を一つ進めます
+        Arguments:
+            value : 新しい値
+        """
+
+        head = self.head
+        self.buffer[head] = value
+        head += 1
+        if head == self.length:
+            head = 0
+        self.head = head
+
+    def getValues(self):
+        """
+        最も古い値から順に並べた値の群れを応答します
+        """
+
+        return self.buffer[self.head:] + self.buffer[:self.head]
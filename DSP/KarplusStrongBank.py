@@ -0,0 +1,206 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+KarplusStrongBank : Karplus-Strongの弦の群れ
+長さの違う複数の弦(遅延線)をまとめて鳴らすクラスを定義するファイル
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/18 (Updated: 2025/11/21)"
+
+import numpy as np
+
+from .SilenceDetector import SilenceDetector
+
+class KarplusStrongBank:
+    """
+    Karplus-Strongの弦の群れクラス
+    弦ごとに、遅延線の最も古い二つの値の平均に減衰係数を掛けた値
+        y[n] = damping * (d[n] + d[n+1]) / 2 (d は初期波形の後ろに y が続く列)
+    を遅延線に送る
+    全ての弦の列 d を、最も長い弦に合わせて詰めた一つの2次元バッファ(弦の数 × (最長の遅延線長 + サンプル数))
+    に持ち、全ての弦をまとめて進める
+    y[n] が読む d[n], d[n+1] は、n + 1 < n + L である限り既に求まっているため、
+    最も短い遅延線長 L_min から1を引いた長さのブロック単位で、全ての弦を一度に進める(process)
+    (弦ごとのlfilterでは一サンプルあたり遅延線長に比例した計算が掛かるため、低い音や多くの音では遅い)
+    検証用に、弦ごとの先頭の位置を動かしながら1サンプルずつ進める実装(processByStep)も持つ
+    無音の閾値(dB)を渡すと、聞こえなくなった弦(SilenceDetector)から計算を打ち切り、残りを0で埋める
+    打ち切った弦はブロックから外すため、短い弦が先に止まれば、ブロックも長くなる
+    Properties:
+        initialWaves : 弦ごとの初期波形
+        lengths : 弦ごとの遅延線の長さ
+        dampings : 弦ごとの減衰係数
+        cutoffs : 直前のprocessで、弦ごとに計算を打ち切った位置(打ち切らなければサンプル数)
+    """
+
+    # processで無音の判定を行う間隔(サンプル数)
+    __checkInterval = 1024
+
+    def __init__(self, initial_waves, damping):
+        """
+        このクラスのコンストラクタ
+        Arguments:
+            initial_waves : 弦ごとの初期波形(長さは弦ごとに違ってよい)
+            damping : 減衰係数(全ての弦で共通の値、または弦ごとの値)
+        """
+
+        self.initialWaves = [np.asarray(a_wave, dtype=float) for a_wave in initial_waves]
+        self.lengths = np.array([len(a_wave) for a_wave in self.initialWaves])
+        assert np.all(self.lengths >= 2), "遅延線の長さは2以上です"
+        self.dampings = np.broadcast_to(np.asarray(damping, dtype=float),
+                                        (len(self.initialWaves),))
+        self.cutoffs = None
+
+    def process(self, num_samples, silence_threshold=None):
+        """
+        全ての弦が遅延線に送る値 y (弦の数 × サンプル数)を、ブロック単位でまとめて求めて応答します
+        Arguments:
+            num_samples : サンプル数
+            silence_threshold : 無音の閾値(最大振幅に対するdB)、Noneなら最後まで求める
+        """
+
+        num_strings = len(self.initialWaves)
+        rows = np.arange(num_strings)[:, np.newaxis]
+        lengths = self.lengths[:, np.newaxis]
+        c = (self.dampings / 2)[:, np.newaxis]
+
+        sequences = np.zeros((num_strings, self.lengths.max() + num_samples))
+        for i, a_wave in enumerate(self.initialWaves):
+            sequences[i, :len(a_wave)] = a_wave
+
+        detector = self.__silenceDetector(silence_threshold, num_samples)
+        active = np.arange(num_strings)
+        # 鳴っている弦の添字、遅延線長、係数(弦を打ち切るたびに作り直す)
+        active_rows, active_lengths, active_c = rows, lengths, c
+        checked = 0
+
+        block_size = self.lengths.min() - 1
+        start = 0
+        while start < num_samples and len(active) > 0:
+            stop = min(start + block_size, num_samples)
+            sequences[active_rows, active_lengths + np.arange(start, stop)] = active_c * (
+                sequences[active, start:stop] + sequences[active, start + 1:stop + 1])
+            start = stop
+
+            # 無音の判定は、一つのブロックごとではなく、ある程度のサンプル数ごとにまとめて行う
+            if detector is not None and (stop - checked >= self.__checkInterval or stop == num_samples):
+                values = sequences[active_rows, active_lengths + np.arange(checked, stop)]
+                checked = stop
+                silent = detector.update(active, values, stop)
+                if np.any(silent):
+                    active = active[~silent]
+                    active_rows, active_lengths, active_c = rows[active], lengths[active], c[active]
+                    if len(active) > 0:
+                        block_size = self.lengths[active].min() - 1
+
+        self.cutoffs = self.__cutoffs(detector, num_samples)
+
+        # 打ち切った後の値は0のままであるため、弦ごとに打ち切った位置までだけを写す
+        outputs = np.zeros((num_strings, num_samples))
+        for i, (a_length, a_cutoff) in enumerate(zip(self.lengths, self.cutoffs)):
+            outputs[i, :a_cutoff] = sequences[i, a_length:a_length + a_cutoff]
+
+        return outputs
+
+    def processByStep(self, num_samples, silence_threshold=None):
+        """
+        processと同じ値を、全ての弦を1サンプルずつまとめて進めて求め、応答します(検証用の参照実装)
+        弦ごとの遅延線は(最も長い弦に合わせて詰めた)2次元バッファの行として持ち、
+        行ごとの先頭の位置(heads)を動かすことで、np.rollを使わずに値を送る
+        無音の判定は1サンプルごとに行い、全ての弦が無音になればそこで打ち切る
+        (無音になった弦の以降の値は0とする)
+        Arguments:
+            num_samples : サンプル数
+            silence_threshold : 無音の閾値(最大振幅に対するdB)、Noneなら最後まで求める
+        """
+
+        num_strings = len(self.initialWaves)
+        rows = np.arange(num_strings)
+        lengths = self.lengths
+        c = self.dampings / 2
+
+        buffer = np.zeros((num_strings, lengths.max()))
+        for i, a_wave in enumerate(self.initialWaves):
+            buffer[i, :len(a_wave)] = a_wave
+        heads = np.zeros(num_strings, dtype=np.intp)
+
+        outputs = np.zeros((num_strings, num_samples))
+
+        detector = self.__silenceDetector(silence_threshold, num_samples)
+        sounding = np.ones(num_strings, dtype=bool)
+
+        for n in range(num_samples):
+            nexts = heads + 1
+            nexts[nexts == lengths] = 0
+            new_values = c * (buffer[rows, heads] + buffer[rows, nexts])
+            buffer[rows, heads] = new_values
+            outputs[:, n] = new_values
+            heads = nexts
+
+            if detector is not None:
+                active = rows[sounding]
+                sounding[active[detector.update(active, new_values[active, np.newaxis], n + 1)]] = False
+                if not np.any(sounding):
+                    break
+
+        self.cutoffs = self.__cutoffs(detector, num_samples)
+        for i, a_cutoff in enumerate(self.cutoffs):
+            outputs[i, a_cutoff:] = 0.0
+
+        return outputs
+
+    def __silenceDetector(self, silence_threshold, num_samples):
+        """
+        無音の閾値が与えられていれば、弦ごとの無音の検出器を作成して応答します(なければNone)
+        Arguments:
+            silence_threshold : 無音の閾値(最大振幅に対するdB)、またはNone
+            num_samples : サンプル数
+        """
+
+        if silence_threshold is None:
+            return None
+
+        return SilenceDetector(self.lengths, silence_threshold, num_samples,
+                               [np.max(np.abs(a_wave)) for a_wave in self.initialWaves])
+
+    def __cutoffs(self, detector, num_samples):
+        """
+        弦ごとに計算を打ち切った位置を応答します
+        Arguments:
+            detector : 無音の検出器(またはNone)
+            num_samples : サンプル数
+        """
+
+        if detector is None:
+            return np.full(len(self.initialWaves), num_samples, dtype=np.intp)
+
+        return detector.cutoffs
+
+    def tap(self, outputs, offsets):
+        """
+        各サンプルで値を送った後の、遅延線の論理的な offset 番目(0 番目が最も古い)の値
+        (弦の数 × サンプル数)を応答します
+        遅延線の中身は初期波形の後ろに y が続く列 d の窓であるため、
+        n 番目の値を送った後の offset 番目の値は d[n + 1 + offset] となる
+        d を繋げた配列は作らず、直前のprocessで打ち切った位置より後(0の部分)は読まない
+        Arguments:
+            outputs : processで求めた値
+            offsets : 弦ごとの読み出し位置(0 以上 遅延線の長さ未満)
+        """
+
+        num_samples = outputs.shape[1]
+        offsets = np.broadcast_to(np.asarray(offsets, dtype=np.intp), (len(self.initialWaves),))
+        assert np.all((offsets >= 0) & (offsets < self.lengths)), "読み出し位置が遅延線の外です"
+
+        taps = np.zeros_like(outputs)
+        cutoffs = np.full(len(self.initialWaves), num_samples) if self.cutoffs is None else self.cutoffs
+        for i, (a_wave, an_offset, a_cutoff) in enumerate(zip(self.initialWaves, offsets, cutoffs)):
+            # 初期波形から読む部分と、y から読む部分(打ち切った位置まで、以降は0)を別々に写す
+            from_wave = min(len(a_wave) - 1 - an_offset, num_samples)
+            taps[i, :from_wave] = a_wave[1 + an_offset:1 + an_offset + from_wave]
+            from_outputs = min(a_cutoff, num_samples - from_wave)
+            taps[i, from_wave:from_wave + from_outputs] = outputs[i, :from_outputs]
+
+        return taps
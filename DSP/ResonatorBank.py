@@ -0,0 +1,78 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+ResonatorBank : 共鳴フィルタの群れ
+並列に接続した二極の共鳴フィルタ群を定義するファイル
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/17"
+
+import numpy as np
+
+from scipy.signal import sosfilt
+
+class ResonatorBank:
+    """
+    並列な共鳴フィルタ群クラス
+    共鳴周波数 f0 ごとの二極の共鳴フィルタ
+        y[n] = b0 * x[n] + a1 * y[n-1] + a2 * y[n-2]
+        (r = exp(-π f0 / (Q fs)), a1 = 2r cos(2π f0 / fs), a2 = -r^2, b0 = (1 - r) * gain)
+    を、共鳴周波数の数だけ並列に持ち、それらの出力の和を応答する
+    並列な群れは縦続のsosfiltひとつにはまとめられない(分母を掛け合わせると数値的に不安定になる)ため、
+    セクションごとにsosfiltを掛けて足し合わせる
+    フィルタの状態を持ち越すため、信号を区切って(ブロックごとに)渡しても、
+    全体を一度に渡した場合と同じ出力になる
+    Properties:
+        sos : 共鳴周波数ごとの二次セクション [b0, 0, 0, 1, -a1, -a2]
+        states : セクションごとのフィルタの状態(最初のprocessまではNone)
+    """
+
+    def __init__(self, frequencies, fs, Q=10, gain=1.0):
+        """
+        このクラスのコンストラクタ
+        共鳴周波数ごとの二次セクションを、まとめて(配列として)求めておく
+        Arguments:
+            frequencies : 共鳴周波数の群れ
+            fs : サンプリング周波数
+            Q : 共鳴の鋭さ
+            gain : 利得
+        """
+
+        f0 = np.asarray(frequencies, dtype=float)
+        omega = 2.0 * np.pi * f0 / fs
+        r = np.exp(-np.pi * f0 / (Q * fs))
+
+        self.sos = np.zeros((len(f0), 6))
+        self.sos[:, 0] = (1.0 - r) * gain
+        self.sos[:, 3] = 1.0
+        self.sos[:, 4] = -2.0 * r * np.cos(omega)
+        self.sos[:, 5] = r**2
+        self.states = None
+
+    def reset(self):
+        """
+        フィルタの状態を捨て、次のprocessを無音から始めます
+        """
+
+        self.states = None
+
+    def process(self, signals):
+        """
+        信号全体に共鳴フィルタ群を掛け、その和を応答します
+        Arguments:
+            signals : 信号(1次元、または 音の数 × サンプル数 の2次元配列)
+        """
+
+        signals = np.asarray(signals, dtype=float)
+        if self.states is None:
+            self.states = np.zeros((len(self.sos), 1) + signals.shape[:-1] + (2,))
+
+        outputs = np.zeros_like(signals)
+        for i, a_section in enumerate(self.sos):
+            output, self.states[i] = sosfilt(a_section[np.newaxis], signals,
+                                             axis=-1, zi=self.states[i])
+            outputs += output
+        return outputs
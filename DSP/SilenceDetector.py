@@ -0,0 +1,78 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+SilenceDetector : 無音の検出
+減衰していく遅延線の群れが聞こえなくなったかどうかを、
+ブロックごとの最大値だけから安く判定するクラスを定義するファイル
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+import numpy as np
+
+class SilenceDetector:
+    """
+    無音の検出クラス
+    行(遅延線)ごとに、これまでの最大振幅(peak)と、
+    値が peak * 10^(threshold_db / 20) 以下に収まり続けているサンプル数(quietRuns)を持つ
+    y[n] = c1 * y[n-1] + c2 * y[n-L] (|c1| + |c2| <= 1) のように、
+    直近 L サンプルの値の重み付き平均(以下)を送る遅延線では、
+    直近 L サンプルが全て閾値以下であれば、以降の値も閾値を超えない
+    そのため、静かなサンプルが遅延線長以上続いた行を無音とし、
+    そのサンプルの位置(cutoffs)で計算を打ち切ってよい(以降は0で埋める)
+    判定に使うのは新しく求めたブロックの絶対値の最大値だけであり、
+    遅延線の中身を読み直すことはない
+    Properties:
+        windowLengths : 行ごとの遅延線の長さ
+        ratio : 閾値(最大振幅に対する比)
+        peaks : 行ごとのこれまでの最大振幅
+        quietRuns : 行ごとの、閾値以下に収まり続けているサンプル数
+        cutoffs : 行ごとの、無音とした位置(無音にならなければサンプル数)
+    """
+
+    def __init__(self, window_lengths, threshold_db, num_samples, initial_peaks=None):
+        """
+        このクラスのコンストラクタ
+        Arguments:
+            window_lengths : 行ごとの遅延線の長さ
+            threshold_db : 閾値(最大振幅に対するdB、負の値)
+            num_samples : サンプル数
+            initial_peaks : 行ごとの初期値(遅延線の初期波形など)の最大振幅、Noneなら0
+        """
+
+        assert threshold_db < 0, "無音の閾値は最大振幅に対する負のdBです"
+
+        self.windowLengths = np.asarray(window_lengths, dtype=np.intp)
+        self.ratio = 10.0 ** (threshold_db / 20.0)
+        num_rows = len(self.windowLengths)
+        if initial_peaks is None:
+            self.peaks = np.zeros(num_rows)
+        else:
+            self.peaks = np.array(initial_peaks, dtype=float)
+        self.quietRuns = np.zeros(num_rows, dtype=np.intp)
+        self.cutoffs = np.full(num_rows, num_samples, dtype=np.intp)
+
+    def update(self, rows, block, stop):
+        """
+        新しく求めたブロックで判定を進め、そのブロックで無音になった行の真理値(rowsと同じ並び)を応答します
+        Arguments:
+            rows : ブロックの各行が何行目に当たるか
+            block : 新しく求めた値(行の数 × ブロックの長さ)
+            stop : ブロックの終わりの位置(次に求めるサンプルの位置)
+        """
+
+        block_peaks = np.max(np.abs(block), axis=1)
+        peaks = np.maximum(self.peaks[rows], block_peaks)
+        self.peaks[rows] = peaks
+
+        quiet_runs = np.where(block_peaks <= peaks * self.ratio,
+                              self.quietRuns[rows] + block.shape[1], 0)
+        self.quietRuns[rows] = quiet_runs
+
+        silent = quiet_runs >= self.windowLengths[rows]
+        self.cutoffs[rows[silent]] = stop
+
+        return silent
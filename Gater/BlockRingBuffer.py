@@ -0,0 +1,185 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+BlockRingBuffer : ブロックのリングバッファ
+音を作る側(一つの書き手)と、出力のコールバック(一つの読み手)の間で、
+あらかじめ確保したブロックを受け渡すクラスを定義するファイル
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+import numpy as np
+
+import time
+
+from Returner.Returner import *
+
+class BlockRingBuffer:
+    """
+    ブロックのリングバッファクラス
+    書き手と読み手がそれぞれ一つだけであることを前提に、ロックを用いずにブロックを受け渡す
+    書いたブロックの数(writeCount)は書き手だけが、読んだブロックの数(readCount)は読み手だけが進め、
+    書き手はブロックを書き終えてからwriteCountを、読み手はブロックを読み終えてからreadCountを進める
+    (整数の属性の束縛は一度に行われるため、相手が書きかけ、読みかけのブロックに触れることはない)
+    ブロックは全て最初に確保し、読み手(コールバック)の側では配列を確保しない
+    Properties:
+        blocks : ブロックの群れ(ブロックの数 × ブロックの長さ × チャンネル数)
+        stamps : ブロックごとの、書き終えた時刻
+        writeCount : 書いたブロックの数(書き手だけが進める)
+        readCount : 読んだブロックの数(読み手だけが進める)
+        closed : 書き手がもう書かないか
+        underruns : 読もうとしたときにブロックがなかった回数(0で埋めて出力した回数)
+        overruns : writeで書こうとしたときに空きがなく、ブロックを捨てた回数
+        highWaterMark : これまで(resetHighWaterMarkの後)に溜まったブロックの数の最大値
+        latencyLast : 最後に読んだブロックの、書き終えてから読むまでの時間(秒)
+        latencyMax : 書き終えてから読むまでの時間の最大値(秒)
+        latencySum : 書き終えてから読むまでの時間の合計(秒)
+    """
+
+    def __init__(self, num_blocks, block_size, channels, sample_format="float32"):
+        """
+        このクラスのコンストラクタ
+        ブロックを全て確保し、数え上げを0で初期化する
+        Arguments:
+            num_blocks : ブロックの数
+            block_size : ブロックの長さ(サンプル数)
+            channels : チャンネル数
+            sample_format : ブロックの型の名前
+        """
+
+        assert num_blocks > 0 and block_size > 0 and channels > 0, \
+            "ブロックの数、長さ、チャンネル数は正の整数です"
+
+        self.blocks = np.zeros((num_blocks, block_size, channels), dtype=sample_format)
+        self.stamps = np.zeros(num_blocks)
+        self.writeCount = zeroInt()
+        self.readCount = zeroInt()
+        self.closed = returnFalse()
+        self.underruns = zeroInt()
+        self.overruns = zeroInt()
+        self.highWaterMark = zeroInt()
+        self.latencyLast = 0.0
+        self.latencyMax = 0.0
+        self.latencySum = 0.0
+
+    def getNumBlocks(self):
+        """
+        ブロックの数を応答します
+        """
+
+        return len(self.blocks)
+
+    def getFillLevel(self):
+        """
+        書かれていて、まだ読まれていないブロックの数を応答します
+        """
+
+        return self.writeCount - self.readCount
+
+    def getFreeBlock(self):
+        """
+        書き手が次に書くブロック(コピーではない)を応答します
+        空きがなければNoneを応答する(待てる書き手は、空くのを待って書き直す)
+        書き終えたらcommitBlockを呼ぶこと
+        """
+
+        if self.getFillLevel() >= self.getNumBlocks():
+            return nonePointer()
+
+        return self.blocks[self.writeCount % self.getNumBlocks()]
+
+    def commitBlock(self):
+        """
+        getFreeBlockで得たブロックを書き終えたことを、読み手に知らせます
+        """
+
+        self.stamps[self.writeCount % self.getNumBlocks()] = time.perf_counter()
+        self.writeCount += oneInt()
+        self.highWaterMark = max(self.highWaterMark, self.getFillLevel())
+
+    def resetHighWaterMark(self):
+        """
+        溜まったブロックの数の最大値を0に戻し、ここから数え直します
+        書き手がcommitBlockで書き換えるため、書き手が書いていない間(満たされて待っている間など)に呼ぶこと
+        """
+
+        self.highWaterMark = zeroInt()
+
+    def write(self, a_block):
+        """
+        ブロックをコピーして書き、書けたかを応答します
+        待てない書き手のためのものであり、空きがなければoverrunsを数えてブロックを捨てる
+        Arguments:
+            a_block : ブロック(ブロックの長さ × チャンネル数)
+        """
+
+        free_block = self.getFreeBlock()
+        if free_block is None:
+            self.overruns += oneInt()
+            return returnFalse()
+
+        free_block[:] = a_block
+        self.commitBlock()
+
+        return returnTrue()
+
+    def close(self):
+        """
+        書き手がもう書かないことを、読み手に知らせます
+        """
+
+        self.closed = returnTrue()
+
+    def isFinished(self):
+        """
+        書き手がもう書かず、全てのブロックを読み終えたかを応答します
+        """
+
+        return self.closed and self.getFillLevel() == zeroInt()
+
+    def read(self, outdata):
+        """
+        次のブロックをoutdataにコピーし、まだ続きがあるかを応答します
+        ブロックがなければ、outdataを0で埋める
+        (書き手がまだ書く場合はunderrunsを数え、もう書かない場合は続きがないと応答する)
+        Arguments:
+            outdata : 出力する配列(ブロックの長さ × チャンネル数)
+        """
+
+        if self.getFillLevel() == zeroInt():
+            closed = self.closed
+            outdata.fill(zeroInt())
+            if closed and self.getFillLevel() == zeroInt():
+                return returnFalse()
+            self.underruns += oneInt()
+            return returnTrue()
+
+        slot = self.readCount % self.getNumBlocks()
+        outdata[:] = self.blocks[slot]
+        latency = time.perf_counter() - self.stamps[slot]
+        self.readCount += oneInt()
+
+        self.latencyLast = latency
+        self.latencyMax = max(self.latencyMax, latency)
+        self.latencySum += latency
+
+        return returnTrue()
+
+    def getStatistics(self):
+        """
+        数え上げた値を辞書にして応答します
+        """
+
+        return {
+            "blocks_written": self.writeCount,
+            "blocks_read": self.readCount,
+            "underruns": self.underruns,
+            "overruns": self.overruns,
+            "high_water_mark": self.highWaterMark,
+            "latency_last": self.latencyLast,
+            "latency_max": self.latencyMax,
+            "latency_mean": self.latencySum / max(self.readCount, oneInt())
+        }
@@ -0,0 +1,321 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+InstrumentGater : ゲーター(スレッド管理者)
+色(Blue,Green,Red,Yellow)を受け取り、その全ての楽器の音を
+一つの出力ストリームで並行に鳴らすクラスを定義するファイル
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+import numpy as np
+
+import threading
+import time
+
+from Color.Color import Color
+
+from Gater.BlockRingBuffer import BlockRingBuffer
+
+from Instrument.Instrument import Instrument
+
+from Returner.Returner import *
+
+try:
+    import sounddevice as sd
+except ImportError:
+    sd = None
+
+class InstrumentGater:
+    """
+    InstrumentGaterクラス
+    楽器ごとにスレッドやストリームを作らず、sounddeviceのOutputStreamを一つだけ開き、
+    そのコールバックの中で全ての楽器の音を足し合わせて出力する
+    楽器の音(soundBankの行を順に並べたもの)は、演奏の前に一つの行列(楽器の数 × サンプル数)にまとめ、
+    開始位置の分だけ後ろにずらしておく そのため、楽器の開始はサンプル単位で揃い、
+    コールバックは行列の一区間と音量の内積を求めるだけとなる(計算量は楽器の数 × ブロックの長さで一定)
+    リングバッファを用いる場合は、足し合わせは書き手のスレッドが先に行い、
+    コールバックはリングバッファからブロックをコピーするだけとなる(待つことも、配列を確保することもない)
+    Goal:
+        全ての色の楽器の音を、並行に鳴らすこと
+    Target:
+        1: 色と楽器を受け取る
+        2: 楽器の音を一つの行列にまとめる(開始位置はサンプル単位)
+        3: 一つのOutputStreamのコールバックで、全ての楽器の音をまとめて足し合わせる
+        4: 演奏が終わるまで待つ
+        5: 足し合わせとコールバックの間をリングバッファでつなぎ、取りこぼしを数える
+        6: 全ての色の楽器の音を、一つのプロセスプールでまとめて作成する
+    Properties:
+        colors : 受け取った色の群れ
+        voices : 鳴らす楽器ごとの(楽器, 開始位置(サンプル数), 音量(Noneなら楽器の数の逆数))の群れ
+        voiceBank : 楽器の音を開始位置に合わせて並べた行列(楽器の数 × サンプル数)
+        gains : 楽器ごとの音量
+        mixBuffer : コールバックで足し合わせた音を書き込む配列(ブロックの長さ)
+        position : 次に出力するサンプルの位置
+        blockSize : コールバック1回で出力するサンプル数
+        channels : 出力のチャンネル数
+        sampleFormat : 出力する配列の型の名前
+        ringBlocks : リングバッファのブロックの数(Noneならコールバックの中で足し合わせる)
+        ringBuffer : 演奏中のリングバッファ(演奏の後も、数え上げた値を読むために残す)
+        pool : 全ての色の楽器の音を、一つのプロセスプールでまとめて作成するための色
+    """
+
+    def __init__(self, colors=None):
+        """
+        このクラスのコンストラクタ
+        各プロパティを初期化し、渡された色を受け取る
+        Arguments:
+            colors : 色の群れ(Noneなら後からaddColorで受け取る)
+        """
+
+        gater_data = gaterData()
+
+        self.colors = emptyList()
+        self.voices = emptyList()
+        self.voiceBank = nonePointer()
+        self.gains = nonePointer()
+        self.mixBuffer = nonePointer()
+        self.position = zeroInt()
+        self.blockSize = gater_data["block_size"]
+        self.channels = gater_data["channels"]
+        self.sampleFormat = gater_data["sample_format"]
+        self.ringBlocks = gater_data["ring_blocks"]
+        self.ringBuffer = nonePointer()
+        self.pool = Color()
+
+        for a_color in colors or emptyList():
+            self.addColor(a_color)
+
+    def addColor(self, a_color, start=0.0):
+        """
+        色を受け取り、その全ての楽器を鳴らす楽器に加えます
+        Arguments:
+            a_color : 色
+            start : 楽器を鳴らし始める時刻(秒)
+        """
+
+        self.colors.append(a_color)
+        for an_instrument in a_color.instruments:
+            self.addInstrument(an_instrument, start)
+
+    def addInstrument(self, an_instrument, start=0.0, gain=None):
+        """
+        鳴らす楽器を加えます
+        開始時刻はサンプル数に丸め、全ての楽器で同じ時刻の基準を用いる
+        Arguments:
+            an_instrument : 楽器
+            start : 楽器を鳴らし始める時刻(秒)
+            gain : 楽器の音量、Noneなら楽器の数の逆数(全ての楽器が重なっても振幅が1を超えない)
+        """
+
+        assert isinstance(an_instrument, Instrument)
+        assert start >= 0, "開始時刻は0以上です"
+
+        start_sample = int(round(start * soundWaveData()["sampling_rate"]))
+        self.voices.append((an_instrument, start_sample, gain))
+
+    def setRingBlocks(self, num_blocks):
+        """
+        足し合わせた音をコールバックに渡すリングバッファのブロックの数を設定します
+        ブロックの数 × ブロックの長さが、書き手が先に足し合わせておける長さ(遅れの上限)となる
+        Arguments:
+            num_blocks : ブロックの数(正の整数)、Noneならリングバッファを用いずコールバックの中で足し合わせる
+        """
+
+        assert num_blocks is None or num_blocks > 0, "ブロックの数は正の整数です"
+        self.ringBlocks = num_blocks
+
+    def setMaxWorkers(self, max_workers):
+        """
+        prepareToPerformが楽器の音を並列に作成するプロセス数を設定します
+        (色ごとに設定されたプロセス数は用いず、全ての楽器をこの数のプロセスで作成する)
+        Arguments:
+            max_workers : プロセス数(正の整数)、Noneなら設定を取り消す
+        """
+
+        self.pool.setMaxWorkers(max_workers)
+
+    def setSharedMemory(self, shared_memory):
+        """
+        prepareToPerformが並列に作成した音を、共有メモリで受け取るかを設定します
+        Arguments:
+            shared_memory : Trueなら共有メモリ、Falseならpickleで受け取る
+        """
+
+        self.pool.setSharedMemory(shared_memory)
+
+    def prepareToPerform(self):
+        """
+        演奏(音を出す)ための準備を行います。
+        全ての色の楽器と、addInstrumentで加えた楽器のうちまだ音のないものを集め、
+        一つのプロセスプールで(色ごとにプールを作らずに)まとめて音を作成し、
+        全ての楽器の音を一つの行列にまとめます
+        同じ楽器が何度加えられていても、音の作成は一度だけ行う
+        """
+
+        instruments = emptyList()
+        for a_color in self.colors:
+            for an_instrument in a_color.instruments:
+                if not any(an_instrument is other for other in instruments):
+                    instruments.append(an_instrument)
+        for an_instrument, _, _ in self.voices:
+            if an_instrument.getSoundBank() is None and not any(an_instrument is other for other in instruments):
+                instruments.append(an_instrument)
+
+        self.pool.instruments = instruments
+        self.pool.prepareToPerform()
+        self.pool.instruments = emptyList()
+
+        self.__buildVoiceBank()
+
+    def __buildVoiceBank(self):
+        """
+        楽器ごとに、soundBankの行を順に並べた音を開始位置にずらして、一つの行列(voiceBank)にまとめ、
+        音量と、コールバックで用いる配列を確保します
+        C連続なsoundBankは、行を並べた音をコピーせずに得られる(型を揃えるときに一度だけ書き込む)
+        """
+
+        sounds = []
+        for an_instrument, _, _ in self.voices:
+            sound_bank = an_instrument.getSoundBank()
+            assert sound_bank is not None, f"{type(an_instrument).__name__}の音がまだ作成されていません"
+            sounds.append(sound_bank.reshape(-1))
+
+        num_samples = max([start + len(a_sound) for (_, start, _), a_sound in zip(self.voices, sounds)],
+                          default=zeroInt())
+        self.voiceBank = np.zeros((len(self.voices), num_samples), dtype=self.sampleFormat)
+        for row, ((_, start, _), a_sound) in enumerate(zip(self.voices, sounds)):
+            self.voiceBank[row, start:start + len(a_sound)] = a_sound
+
+        default_gain = oneInt() / max(len(self.voices), oneInt())
+        self.gains = np.array([default_gain if gain is None else gain for _, _, gain in self.voices],
+                              dtype=self.sampleFormat)
+        self.mixBuffer = np.zeros(self.blockSize, dtype=self.sampleFormat)
+        self.position = zeroInt()
+
+    def getNumSamples(self):
+        """
+        演奏全体のサンプル数(最も遅く鳴り終わる楽器の終わりの位置)を応答します
+        """
+
+        assert self.voiceBank is not None, "prepareToPerformを先に呼んでください"
+
+        return self.voiceBank.shape[1]
+
+    def mix(self, outdata, frames):
+        """
+        次のframesサンプルの全ての楽器の音を足し合わせてoutdataの全てのチャンネルに書き込み、
+        まだ続きがあるかを応答します
+        足し合わせは、voiceBankの一区間と音量の内積を、確保済みのmixBufferに求める一度の配列演算であり、
+        新しく配列を確保しない 鳴り終わった後の部分は0で埋める
+        Arguments:
+            outdata : 出力する配列(サンプル数 × チャンネル数)
+            frames : 出力するサンプル数(blockSize以下)
+        """
+
+        start = self.position
+        stop = min(start + frames, self.voiceBank.shape[1])
+        mixed = self.mixBuffer[:frames]
+
+        np.dot(self.gains, self.voiceBank[:, start:stop], out=mixed[:stop - start])
+        mixed[stop - start:] = zeroInt()
+        outdata[:] = mixed[:, None]
+        self.position = stop
+
+        return stop < self.voiceBank.shape[1]
+
+    def produce(self, ready=None):
+        """
+        リングバッファの書き手
+        空いているブロックに、次のブロックの全ての楽器の音を直接足し合わせて書き、
+        鳴り終わったら(例外で終わった場合も)リングバッファを閉じます
+        空きがなければ、ブロックの半分の時間だけ待って書き直す(ブロックは捨てないため、overrunsは数えない)
+        Arguments:
+            ready : 初めてリングバッファが満たされたとき(または閉じたとき)にsetするEvent(Noneなら知らせない)
+        """
+
+        wait = self.blockSize / soundWaveData()["sampling_rate"] / twoInt()
+        playing = returnTrue()
+        try:
+            while playing:
+                a_block = self.ringBuffer.getFreeBlock()
+                if a_block is None:
+                    if ready is not None:
+                        ready.set()
+                    time.sleep(wait)
+                    continue
+                playing = self.mix(a_block, self.blockSize)
+                self.ringBuffer.commitBlock()
+        finally:
+            # 足し合わせに失敗しても、待っているperformと読み手が止まったままにならないよう、閉じて知らせる
+            self.ringBuffer.close()
+            if ready is not None:
+                ready.set()
+
+    def callback(self, outdata, frames, time_info, status):
+        """
+        OutputStreamのコールバック
+        リングバッファがあれば次のブロックを、なければ全ての楽器の音を足し合わせて出力し、
+        鳴り終わったらストリームを止める
+        Arguments:
+            outdata : 出力する配列(サンプル数 × チャンネル数)
+            frames : 出力するサンプル数(リングバッファがあればblockSize)
+            time_info : 時刻の情報(用いない、timeモジュールと名前が重ならないようにする)
+            status : 出力の状態(用いない)
+        """
+
+        if self.ringBuffer is None:
+            playing = self.mix(outdata, frames)
+        else:
+            playing = self.ringBuffer.read(outdata)
+
+        if not playing:
+            raise sd.CallbackStop
+
+    def perform(self):
+        """
+        演奏を行います。
+        一つのOutputStreamを開き、全ての楽器の音が鳴り終わるまで待ちます
+        リングバッファを用いる場合は、書き手のスレッドがリングバッファを満たす(または閉じる)のを
+        Eventで待ってからストリームを開く(待つ間に回り続けることはない)
+        満たすまでに溜まったブロックの数は数えず、ストリームを開いてからの最大値を数える
+        (満たされた書き手は、最初のブロックが読まれるまで書かないため、ここで数え直してよい)
+        取りこぼしの数などは、演奏の後にgetStatisticsで得られる
+        """
+
+        assert sd is not None, "演奏にはsounddeviceが必要です"
+        assert self.voiceBank is not None, "prepareToPerformを先に呼んでください"
+
+        finished = threading.Event()
+        self.position = zeroInt()
+        self.ringBuffer = nonePointer()
+        producer = nonePointer()
+        if self.ringBlocks is not None:
+            self.ringBuffer = BlockRingBuffer(self.ringBlocks, self.blockSize, self.channels, self.sampleFormat)
+            ready = threading.Event()
+            producer = threading.Thread(target=self.produce, args=(ready,), daemon=returnTrue())
+            producer.start()
+            ready.wait()
+            self.ringBuffer.resetHighWaterMark()
+
+        with sd.OutputStream(samplerate=soundWaveData()["sampling_rate"], blocksize=self.blockSize,
+                             channels=self.channels, dtype=self.sampleFormat,
+                             callback=self.callback, finished_callback=finished.set):
+            finished.wait()
+
+        if producer is not None:
+            producer.join()
+
+    def getStatistics(self):
+        """
+        最後の演奏のリングバッファの数え上げた値(underruns, overruns, high_water_mark, latencyなど)を応答します
+        リングバッファを用いていなければNoneを応答する
+        """
+
+        if self.ringBuffer is None:
+            return nonePointer()
+
+        return self.ringBuffer.getStatistics()
@@ -0,0 +1,177 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+BowedString : 擦弦楽器
+ヴィオラ、チェロ、コントラバスが共通して用いる
+弓と弦の物理モデルを定義するクラス
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/14 (Updated: 2025/11/21)"
+
+from .Instrument import Instrument
+
+from Returner.Returner import (nonePointer,
+                               returnTimeData, ADSREnvelopTimeData)
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def bowedStringKernel(outputs, bow_velocities, neck_lengths, bridge_lengths,
+                      slopes, bridge_reflection, bridge_lowpass):
+    """
+    全ての音の弓と弦の相互作用を1サンプルずつ進め、
+    駒に届く弦の速度をoutputs(音の数 × サンプル数)に書き込みます
+    numbaがあればこの関数をそのままJITコンパイルして用いるため、
+    numbaが扱える書き方(スカラーとnumpy配列のみ)で書いている
+    弦は弓から糸巻き側へ往復する遅延線(neck)と、弓から駒側へ往復する遅延線(bridge)に分け、
+    それぞれ先頭の位置を動かすリングバッファとして扱う
+    Arguments:
+        outputs : 出力波形(音の数 × サンプル数の配列)
+        bow_velocities : 弓の速さの時間軸データ
+        neck_lengths : 音ごとの糸巻き側の遅延線の長さ
+        bridge_lengths : 音ごとの駒側の遅延線の長さ
+        slopes : 音ごとの摩擦特性の傾き
+        bridge_reflection : 駒での反射の大きさ
+        bridge_lowpass : 駒での反射に掛ける一次ローパスフィルタの係数
+    """
+
+    num_samples = outputs.shape[1]
+
+    for note in range(outputs.shape[0]):
+        neck_length = neck_lengths[note]
+        bridge_length = bridge_lengths[note]
+        slope = slopes[note]
+        neck = np.zeros(neck_length)
+        bridge = np.zeros(bridge_length)
+        neck_head = 0
+        bridge_head = 0
+        lowpassed = 0.0
+
+        for n in range(num_samples):
+            bridge_out = bridge[bridge_head]
+            lowpassed = (1.0 - bridge_lowpass) * bridge_out + bridge_lowpass * lowpassed
+            bridge_reflected = -bridge_reflection * lowpassed
+            nut_reflected = -neck[neck_head]
+
+            string_velocity = bridge_reflected + nut_reflected
+            velocity_difference = bow_velocities[n] - string_velocity
+
+            # 弓の摩擦特性(bow table) : (|Δv * slope| + 0.75)^-4 を1で打ち切る
+            friction = (abs(velocity_difference * slope) + 0.75) ** -4.0
+            if friction > 1.0:
+                friction = 1.0
+            new_velocity = velocity_difference * friction
+
+            neck[neck_head] = bridge_reflected + new_velocity
+            bridge[bridge_head] = nut_reflected + new_velocity
+            neck_head += 1
+            if neck_head == neck_length:
+                neck_head = 0
+            bridge_head += 1
+            if bridge_head == bridge_length:
+                bridge_head = 0
+
+            outputs[note, n] = bridge_out
+
+if njit is not None:
+    compiledBowedStringKernel = njit(cache=True)(bowedStringKernel)
+else:
+    compiledBowedStringKernel = None
+
+class BowedString(Instrument):
+    """
+    擦弦楽器クラス
+    Goal:
+        弦の長さ、張力、弓のデータから、擦弦楽器の音を
+        一つの物理モデルで再現する
+    Target:
+        0: Instrumentクラスを正しく実装する
+        1: __init__を実装する(子クラスがデータと周波数群を束縛する)
+        2: renderNotesを正しく実装する(全ての音をまとめて作る)
+        3: テストを行う
+    Properties:
+        frequencies : 奏でる周波数群
+        bowedStringData : 弦と弓のデータ
+        bowEnvelop : 弓の速さのエンベロープ(ADSRの値、時間軸データは音の長さに合わせて求める)
+    """
+
+    def __init__(self):
+        """
+        このクラスのコンストラクタ
+        """
+
+        super().__init__()
+        self.bowedStringData = nonePointer()
+        self.bowEnvelop = nonePointer()
+
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        numbaが使える場合は、コンパイル済みの計算(jit)を既定とする
+        reference : 1サンプルごとの計算を純粋なPythonで行う
+        jit : 同じ関数をnumbaでコンパイルして行う
+        """
+
+        if compiledBowedStringKernel is None:
+            return ("reference",)
+        return ("jit", "reference")
+
+    def renderNotes(self, frequencies, sound_wave_data):
+        """
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
+        Target:
+            1: 弦と弓のデータを得る
+            2: 全ての周波数に対して、以下を求める
+                a. 1周期の遅延線長を求め、弓の位置で糸巻き側と駒側に分ける
+                b. 弦の長さと張力から線密度 u = T / 4L^2f^2 を求め、
+                   弦の特性インピーダンス Z = √(T*u) を求める
+                c. 弓の力をインピーダンスで割った値から、摩擦特性の傾きを求める
+            3: 弓の速さの時間軸データを(音の長さに合わせて)求める
+            4: 全ての音をまとめて1サンプルずつ進める(getBackendが"jit"ならコンパイル済みの関数で行う)
+            5: 正規化を行い、応答する
+        """
+
+        string_data = self.bowedStringData
+
+        num_notes = len(frequencies)
+
+        neck_lengths = np.zeros(num_notes, dtype=np.int64)
+        bridge_lengths = np.zeros(num_notes, dtype=np.int64)
+        slopes = np.zeros(num_notes)
+
+        for i, a_frequency in enumerate(frequencies):
+            delay_length = max(2, int(sound_wave_data["sampling_rate"] / a_frequency))
+            bridge_lengths[i] = min(delay_length - 1,
+                                    max(1, int(string_data["bow_position"] * delay_length)))
+            neck_lengths[i] = delay_length - bridge_lengths[i]
+
+            u = string_data["string_tension"] / (4 * (string_data["string_length"]**2) * (a_frequency**2))
+            string_impedance = np.sqrt(string_data["string_tension"] * u)
+            pressure = min(1.0, string_data["bow_force"] / string_impedance)
+            slopes[i] = 5.0 - 4.0 * pressure
+
+        bow_envelop = ADSREnvelopTimeData(self.bowEnvelop,
+                                          returnTimeData(sound_wave_data["duration"]),
+                                          sound_wave_data)
+        bow_velocities = string_data["bow_velocity"] * bow_envelop
+
+        outputs = np.zeros((num_notes, sound_wave_data["num_samples"]))
+
+        kernel = compiledBowedStringKernel if self.getBackend() == "jit" else bowedStringKernel
+        kernel(outputs, bow_velocities, neck_lengths, bridge_lengths, slopes,
+               string_data["bridge_reflection"], string_data["bridge_lowpass"])
+
+        for output in outputs:
+            output /= np.max(np.abs(output)) + 1e-12
+
+        return outputs
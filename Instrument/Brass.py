@@ -0,0 +1,218 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+Brass : 金管楽器
+コルネット、フリューゲルホルン、トロンボーン、ホルン、チューバが共通して用いる
+唇(リード)と管の物理モデルを定義するクラス
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/15 (Updated: 2025/11/21)"
+
+from .Instrument import Instrument
+
+from Returner.Returner import (nonePointer,
+                               returnTimeData, ADSREnvelopTimeData)
+
+import numpy as np
+
+import math
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def brassKernel(outputs, breaths, delays, omegas, lip_quality, lip_mass, lip_area,
+                a0, a1, rho, impedance, r_bell, bell_lowpass, dt):
+    """
+    全ての音の唇の運動と管の往復を1サンプルずつ進め、
+    ベルから放射される圧力をoutputs(音の数 × サンプル数)に書き込みます
+    numbaがあればこの関数をそのままJITコンパイルして用いるため、
+    numbaが扱える書き方(スカラーとnumpy配列のみ)で書いている
+    管は往復分(2 * delay)の長さを持つ一つのリングバッファとして扱い、
+    先頭(head)がマウスピース、delay先がベルに当たる
+    Arguments:
+        outputs : 出力波形(音の数 × サンプル数の配列)
+        breaths : 吹く圧力の時間軸データ
+        delays : 音ごとの管の片道の遅延線の長さ
+        omegas : 音ごとの唇の固有角周波数
+        lip_quality : 唇の共振の鋭さ(Q)
+        lip_mass : 唇の質量
+        lip_area : 圧力を受ける唇の面積
+        a0, a1 : 唇の開口面積の係数(開口面積 = a0 + a1 * x)
+        rho : 空気の密度
+        impedance : 管の特性インピーダンス
+        r_bell : ベルでの反射係数
+        bell_lowpass : ベルでの反射に掛ける一次ローパスフィルタの係数
+        dt : サンプリング周期
+    """
+
+    num_samples = outputs.shape[1]
+
+    for note in range(outputs.shape[0]):
+        delay = delays[note]
+        round_trip = 2 * delay
+        omega = omegas[note]
+        stiffness = lip_mass * omega * omega
+        lip_damping = lip_mass * omega / lip_quality
+
+        bore = np.zeros(round_trip)
+        head = 0
+        x = 0.0
+        v = 0.0
+        lowpassed = 0.0
+        cup_pressure = 0.0
+
+        for n in range(num_samples):
+            # ベルに届いた波の低域を反射させ、残り(高域)を放射する
+            bell_index = head + delay
+            if bell_index >= round_trip:
+                bell_index -= round_trip
+            bell_in = bore[bell_index]
+            lowpassed = (1.0 - bell_lowpass) * bell_in + bell_lowpass * lowpassed
+            bore[bell_index] = r_bell * lowpassed
+            outputs[note, n] = bell_in - lowpassed
+
+            # 唇の運動方程式 m x'' = S * Δp - b x' - k x
+            p_minus = bore[head]
+            mouth_pressure = breaths[n]
+            accel = (lip_area * (mouth_pressure - cup_pressure)
+                     - lip_damping * v - stiffness * x) / lip_mass
+            v += accel * dt
+            x += v * dt
+            area = a0 + a1 * x
+            if area < 0.0:
+                area = 0.0
+
+            # ベルヌーイの式 U = A * sign(Δp) * √(2|Δp|/ρ) と
+            # マウスピースの圧力 p = 2 * p_minus + Z * U を連立して、流量Uを求める
+            drive = mouth_pressure - 2.0 * p_minus
+            b = 2.0 * area * area * impedance / rho
+            c = 2.0 * area * area * abs(drive) / rho
+            U = 0.5 * (-b + math.sqrt(b * b + 4.0 * c))
+            if drive < 0.0:
+                U = -U
+
+            p_plus = p_minus + impedance * U
+            cup_pressure = p_plus + p_minus
+            bore[head] = p_plus
+            head += 1
+            if head == round_trip:
+                head = 0
+
+if njit is not None:
+    compiledBrassKernel = njit(cache=True)(brassKernel)
+else:
+    compiledBrassKernel = None
+
+class Brass(Instrument):
+    """
+    金管楽器クラス
+    Goal:
+        管の長さ、ベルの反射、唇の質量から、金管楽器の音を
+        一つの物理モデルで再現する
+    Target:
+        0: Instrumentクラスを正しく実装する
+        1: __init__を実装する(子クラスがデータと周波数群を束縛する)
+        2: renderNotesを正しく実装する(全ての音をまとめて作る)
+        3: テストを行う
+    Properties:
+        frequencies : 奏でる周波数群
+        brassData : 唇と管のデータ
+        breathEnvelop : 吹く圧力のエンベロープ(ADSRの値、時間軸データは音の長さに合わせて求める)
+    """
+
+    def __init__(self):
+        """
+        このクラスのコンストラクタ
+        """
+
+        super().__init__()
+        self.brassData = nonePointer()
+        self.breathEnvelop = nonePointer()
+
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        numbaが使える場合は、コンパイル済みの計算(jit)を既定とする
+        reference : 1サンプルごとの計算を純粋なPythonで行う
+        jit : 同じ関数をnumbaでコンパイルして行う
+        """
+
+        if compiledBrassKernel is None:
+            return ("reference",)
+        return ("jit", "reference")
+
+    def renderNotes(self, frequencies, sound_wave_data):
+        """
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
+        Target:
+            1: 唇と管のデータを得る
+            2: 全ての周波数に対して、以下を求める
+                a. 管の長さに最も近く、その周波数に共鳴する管の長さ(ヴァルブ、スライド)から、
+                   片道の遅延線長を求める
+                b. 唇の固有角周波数(周波数より少し低く合わせる)を求める
+                   唇の運動は半陰的オイラー法で進めるため、固有角周波数 × dt が2以上の周波数
+                   (ナイキスト周波数の近く)は発散する 黙って無限大やNaNを返さず、assertで止める
+            3: 吹く圧力の時間軸データを(音の長さに合わせて)求める
+            4: 全ての音をまとめて1サンプルずつ進める(getBackendが"jit"ならコンパイル済みの関数で行う)
+            5: 正規化を行い、応答する
+        """
+
+        brass_data = self.brassData
+
+        num_notes = len(frequencies)
+
+        delays = np.zeros(num_notes, dtype=np.int64)
+        omegas = np.zeros(num_notes)
+
+        for i, a_frequency in enumerate(frequencies):
+            delays[i] = self.__boreDelay(brass_data["tube_length"], a_frequency,
+                                         sound_wave_data["sampling_rate"],
+                                         sound_wave_data["sound_speed"])
+            omegas[i] = 2 * np.pi * a_frequency * brass_data["lip_tuning"]
+            assert omegas[i] * sound_wave_data["dt"] < 2, \
+                (f"{a_frequency}Hzは唇のモデルで表せる周波数"
+                 f"({2 / sound_wave_data['dt'] / (2 * np.pi * brass_data['lip_tuning']):.0f}Hz未満)を超えています")
+
+        breath_envelop = ADSREnvelopTimeData(self.breathEnvelop,
+                                             returnTimeData(sound_wave_data["duration"]),
+                                             sound_wave_data)
+        breaths = brass_data["blowing_pressure"] * breath_envelop
+        impedance = brass_data["rho"] * sound_wave_data["sound_speed"] / brass_data["tube_area"]
+
+        outputs = np.zeros((num_notes, sound_wave_data["num_samples"]))
+
+        kernel = compiledBrassKernel if self.getBackend() == "jit" else brassKernel
+        kernel(outputs, breaths, delays, omegas,
+               brass_data["lip_quality"], brass_data["lip_mass"], brass_data["lip_area"],
+               brass_data["a0"], brass_data["a1"], brass_data["rho"], impedance,
+               brass_data["r_bell"], brass_data["bell_lowpass"], sound_wave_data["dt"])
+
+        for output in outputs:
+            output /= np.max(np.abs(output)) + 1e-12
+
+        return outputs
+
+    def __boreDelay(self, tube_length, frequency, sampling_rate, sound_speed):
+        """
+        管の片道の遅延線長を求め、応答します
+        ベルで符号が反転する管の共鳴は (2m+1) * fs / 4D であるため、
+        元の管の長さに最も近い共鳴の次数mを選び、その共鳴が周波数に
+        一致するように遅延線長Dを決める(ヴァルブやスライドで管の長さを変えることに当たる)
+        Arguments:
+            tube_length : 管の長さ
+            frequency : 周波数
+            sampling_rate : サンプリング周波数
+            sound_speed : 音速
+        """
+
+        nominal_delay = tube_length / sound_speed * sampling_rate
+        mode = max(0, round((4 * frequency * nominal_delay / sampling_rate - 1) / 2))
+        return max(2, int(round((2 * mode + 1) * sampling_rate / (4 * frequency))))
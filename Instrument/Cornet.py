@@ -8,9 +8,14 @@ Cornet : コルネット
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
 
-class Cornet:
+from .Brass import Brass
+
+from Returner.Returner import (blueChar, blueFrequencies,
+                               cornetData, cornetADSREnvelopFloatValue)
+
+class Cornet(Brass):
     """
     コルネットクラス
     Goal:
@@ -18,8 +23,21 @@ class Cornet:
         [220.00, 233.08, 246.94, 256, 261.62, 277.178, 293.66]
         の音をリアルに再現する
     Target:
-        0: Instrumentクラスを正しく実装する
+        0: Instrumentクラス(Brassクラス)を正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
-    """
\ No newline at end of file
+    """
+
+    def __init__(self):
+        """
+        このクラスのコンストラクタ
+        スーパークラスのコンストラクタを呼び出し、
+        自分の色と周波数群、唇と管のデータを束縛する
+        """
+
+        super().__init__()
+        self.color = blueChar()
+        self.frequencies = blueFrequencies()
+        self.brassData = cornetData()
+        self.breathEnvelop = cornetADSREnvelopFloatValue()
@@ -8,9 +8,14 @@ DoubleBass : コントラバス
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
 
-class DoubleBass:
+from .BowedString import BowedString
+
+from Returner.Returner import (blueChar, blueFrequencies,
+                               doubleBassData, doubleBassADSREnvelopFloatValue)
+
+class DoubleBass(BowedString):
     """
     コントラバスクラス
     Goal:
@@ -18,8 +23,21 @@ class DoubleBass:
         [220.00, 233.08, 246.94, 256, 261.62, 277.178, 293.66]
         の音をリアルに再現する
     Target:
-        0: Instrumentクラスを正しく実装する
+        0: Instrumentクラス(BowedStringクラス)を正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
-    """
\ No newline at end of file
+    """
+
+    def __init__(self):
+        """
+        このクラスのコンストラクタ
+        スーパークラスのコンストラクタを呼び出し、
+        自分の色と周波数群、弦と弓のデータを束縛する
+        """
+
+        super().__init__()
+        self.color = blueChar()
+        self.frequencies = blueFrequencies()
+        self.bowedStringData = doubleBassData()
+        self.bowEnvelop = doubleBassADSREnvelopFloatValue()
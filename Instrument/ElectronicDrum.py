@@ -8,9 +8,20 @@ ElectronicDrum : 電子的なドラム
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
 
-class ElectronicDrum:
+from .Instrument import Instrument
+
+from Returner.Returner import (yellowChar, yellowFrequencies,
+                               electronicDrumData, returnTimeData)
+
+import numpy as np
+
+from scipy.signal import butter, sosfilt
+
+from DSP.BiquadBank import BiquadBank, butterworthSOS
+
+class ElectronicDrum(Instrument):
     """
     電子的ドラムクラス
     Goal:
@@ -20,6 +31,199 @@ class ElectronicDrum:
     Target:
         0: Instrumentクラスを正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する(減算合成)
         3: テストを行う
-    """
\ No newline at end of file
+    """
+
+    # シードと行の数ごとのノイズの群れ(これまでに求めた最も長いものだけを持つ)
+    __noise_cache = {}
+    # フィルタごとの、フィルタに通したノイズの群れ(これまでに求めた最も長いものだけを持つ)
+    __filtered_noise_cache = {}
+
+    def __init__(self):
+        """
+        このクラスのコンストラクタ
+        """
+
+        super().__init__()
+        self.color = yellowChar()
+        self.frequencies = yellowFrequencies()
+
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        numpy : 全ての音をまとめて求め、ノイズとフィルタを使い回す(既定)
+        reference : 音ごとに、ノイズとフィルタをその都度求める
+        """
+
+        return ("numpy", "reference")
+
+    def renderNotes(self, frequencies, sound_wave_data):
+        """
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        全ての音をまとめて求める
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
+        Target:
+            1. ドラムのデータ、時間軸配列tを得る
+            2. 音ごとに、(対数で)最も近い黄色の周波数のドラムの種類を選び、そのデータを並べる
+            3. 音程のある成分を求める
+                周波数が f_start から f_end へ指数的に下がる正弦波の位相
+                2π(f_end * t + (f_start - f_end) * τ * (1 - exp(-t/τ))) を閉じた形で求め、
+                指数的な減衰を掛ける
+            4. ノイズ成分を求める
+                シード付きのノイズの群れを種類ごとのフィルタに通したもの(一度だけ求める)に、
+                指数的な減衰を掛ける(i番目の音は、ノイズの群れのi % 行の数 番目の行を使う)
+                ノイズの群れは音の長さによらない一つの音源であり、音の長さの分だけ先頭から切り出す
+            5. 二つの成分を足し合わせ、正規化して応答する
+        """
+
+        drum_data = electronicDrumData()
+        t = returnTimeData(sound_wave_data["duration"])
+
+        voices = self.__noteVoices(frequencies, drum_data)
+        num_rows = len(drum_data["voices"])
+
+        if self.getBackend() == "reference":
+            outputs = np.zeros((len(frequencies), len(t)))
+            for i, (a_frequency, a_voice) in enumerate(zip(frequencies, voices)):
+                outputs[i] = self.__hitByNote(i % num_rows, a_frequency, drum_data[a_voice],
+                                              drum_data["seed"], num_rows, t, sound_wave_data)
+                outputs[i] /= np.max(np.abs(outputs[i]))
+            return outputs
+
+        frequencies = np.asarray(frequencies, dtype=float)
+        f_end = frequencies[:, np.newaxis] * self.__voiceParameters(drum_data, voices, "pitch_ratio")
+        f_start = f_end * self.__voiceParameters(drum_data, voices, "sweep_ratio")
+        sweep_time = self.__voiceParameters(drum_data, voices, "sweep_time")
+
+        phases = 2 * np.pi * (f_end * t + (f_start - f_end) * sweep_time
+                              * (1 - np.exp(-t / sweep_time)))
+        tone_envelops = np.exp(-t / self.__voiceParameters(drum_data, voices, "tone_decay"))
+        tones = (self.__voiceParameters(drum_data, voices, "tone_level")
+                 * np.sin(phases) * tone_envelops)
+
+        noises = np.empty_like(tones)
+        for i, a_voice in enumerate(voices):
+            filtered_noise = self.__filteredNoise(drum_data["seed"], num_rows,
+                                                  drum_data[a_voice]["noise_filter"],
+                                                  sound_wave_data["sampling_rate"],
+                                                  sound_wave_data["num_samples"])
+            noises[i] = filtered_noise[i % num_rows]
+        noise_envelops = np.exp(-t / self.__voiceParameters(drum_data, voices, "noise_decay"))
+        noises *= self.__voiceParameters(drum_data, voices, "noise_level") * noise_envelops
+
+        outputs = tones + noises
+        outputs /= np.max(np.abs(outputs), axis=-1, keepdims=True)
+
+        return outputs
+
+    def __noteVoices(self, frequencies, drum_data):
+        """
+        音ごとのドラムの種類の群れを応答します
+        黄色の周波数のうち、(対数で)最も近いものに割り当てられた種類を選ぶ
+        Arguments:
+            frequencies : 周波数の群れ
+            drum_data : ドラムのデータ
+        """
+
+        yellow_frequencies = np.asarray(yellowFrequencies(), dtype=float)
+        distances = np.abs(np.log(np.asarray(frequencies, dtype=float))[:, np.newaxis]
+                           - np.log(yellow_frequencies))
+        return [drum_data["voices"][index] for index in np.argmin(distances, axis=1)]
+
+    def __hitByNote(self, index, frequency, voice_data, seed, num_rows, t, sound_wave_data):
+        """
+        一つの音を、ノイズもフィルタもその都度求めて作成し、応答します(検証用の参照実装)
+        Arguments:
+            index : 音の番号(ノイズの群れの何行目を使うか)
+            frequency : 周波数
+            voice_data : ドラムの種類のデータ
+            seed : 乱数のシード
+            num_rows : ノイズの数
+            t : 時間軸データ
+            sound_wave_data : サウンドデータ
+        """
+
+        f_end = frequency * voice_data["pitch_ratio"]
+        f_start = f_end * voice_data["sweep_ratio"]
+        sweep_time = voice_data["sweep_time"]
+
+        phase = 2 * np.pi * (f_end * t + (f_start - f_end) * sweep_time
+                             * (1 - np.exp(-t / sweep_time)))
+        tone = voice_data["tone_level"] * np.sin(phase) * np.exp(-t / voice_data["tone_decay"])
+
+        btype, cutoffs, order = voice_data["noise_filter"]
+        nyquist = 0.5 * sound_wave_data["sampling_rate"]
+        normalized = [a_cutoff / nyquist for a_cutoff in cutoffs]
+        sos = butter(order, normalized if len(normalized) > 1 else normalized[0],
+                     btype=btype, output='sos')
+        noise = self.__noiseRow(seed, index, len(t))
+        noise = sosfilt(sos, noise)
+        noise *= voice_data["noise_level"] * np.exp(-t / voice_data["noise_decay"])
+
+        return tone + noise
+
+    def __voiceParameters(self, drum_data, voices, name):
+        """
+        音ごとのドラムの種類のデータを縦に並べた配列(音の数 × 1)を応答します
+        Arguments:
+            drum_data : ドラムのデータ
+            voices : 音ごとのドラムの種類の群れ
+            name : データの名前
+        """
+
+        return np.array([drum_data[a_voice][name] for a_voice in voices])[:, np.newaxis]
+
+    def __noiseRow(self, seed, row, num_samples):
+        """
+        シード付きの白色ノイズの群れのrow行目を、先頭からサンプル数の分だけ応答します
+        行ごとに(seed, row)から乱数を求めるため、短いものは長いものの先頭と一致する
+        Arguments:
+            seed : 乱数のシード
+            row : 行の番号
+            num_samples : サンプル数
+        """
+
+        return np.random.default_rng([seed, row]).standard_normal(num_samples)
+
+    def __noiseBank(self, seed, num_rows, num_samples):
+        """
+        シード付きの白色ノイズの群れ(行の数 × サンプル数)を応答します
+        クラスにはこれまでに求めた最も長いものだけを保存し、それより短いものは先頭を切り出して応答する
+        (音の長さが変わっても、保存するノイズの群れは増えない)
+        Arguments:
+            seed : 乱数のシード
+            num_rows : ノイズの数
+            num_samples : サンプル数
+        """
+
+        key = (seed, num_rows)
+        cache = ElectronicDrum.__noise_cache
+        if key not in cache or cache[key].shape[1] < num_samples:
+            cache[key] = np.array([self.__noiseRow(seed, row, num_samples) for row in range(num_rows)])
+        return cache[key][:, :num_samples]
+
+    def __filteredNoise(self, seed, num_rows, noise_filter, sampling_rate, num_samples):
+        """
+        ノイズの群れをフィルタに通したもの(行の数 × サンプル数)を応答します
+        ノイズもフィルタ(の設計)も固定であり、フィルタは因果的であるため、
+        フィルタに通したものも長いものの先頭が短いものと一致する
+        そのため、クラスにはフィルタごとに最も長いものだけを保存し、以降の打撃では先頭を切り出して使い回す
+        Arguments:
+            seed : 乱数のシード
+            num_rows : ノイズの数
+            noise_filter : (種類, 遮断周波数, 次数)
+            sampling_rate : サンプリング周波数
+            num_samples : サンプル数
+        """
+
+        key = (seed, num_rows, noise_filter, sampling_rate)
+        cache = ElectronicDrum.__filtered_noise_cache
+        if key not in cache or cache[key].shape[1] < num_samples:
+            btype, cutoffs, order = noise_filter
+            noise_bank = self.__noiseBank(seed, num_rows, num_samples)
+            noise_filter_bank = BiquadBank(butterworthSOS(order, cutoffs, btype, sampling_rate))
+            cache[key] = noise_filter_bank.process(noise_bank)
+        return cache[key][:, :num_samples]
@@ -8,12 +8,11 @@ ElectronicGuitar : 電子的なギター
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
 
 from .Instrument import Instrument
 
 from Returner.Returner import (redChar, redFrequencies,
-                               soundWaveData,
                                zeroInt, oneInt, twoInt,
                                electronicGuitarADSRTimeData,
                                electronicGuitarData)
@@ -21,7 +20,8 @@ from Returner.Returner import (redChar, redFrequencies,
 from collections import deque
 import numpy as np
 
-from scipy.signal import butter, lfilter
+from DSP.KarplusStrongBank import KarplusStrongBank
+from DSP.BiquadBank import BiquadBank, butterworthSOS
 
 class ElectronicGuitar(Instrument):
     """
@@ -33,7 +33,7 @@ class ElectronicGuitar(Instrument):
     Target:
         0: Instrumentクラスを正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
     """
 
@@ -41,39 +41,59 @@ class ElectronicGuitar(Instrument):
         """
         このクラスのコンストラクタ
         スーパークラスのコンストラクタを呼び出し、
-        自分の色を定義する
+        自分の色と、既定で奏でる周波数の群れを定義する
         """
 
         super().__init__()
         self.color = redChar()
+        self.frequencies = redFrequencies()
 
-    def makeSound(self):
+    def getBackends(self):
         """
-        奏でる音を作成します。
+        この楽器が持つ計算の実装の名前の群れを応答します
+        numpy : 全ての弦をブロック単位でまとめて進める(既定)
+        reference : 全ての弦を1サンプルずつ進める
+        """
+
+        return ("numpy", "reference")
+
+    def renderNotes(self, frequencies, sound_wave_data):
+        """
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
         Target:
             1. サンプリング周波数と周期,周波数群を得る
             2. 周波数ごとに:
                 delay_lengthを求め、
                 ディレイラインをランダム値で初期化し、
-                出力信号配列を準備します。
-                その後、
+                ピックアップの位置を求めます。
+            3. 全ての弦をまとめて(KarplusStrongBankで)鳴らします。
                 各サンプル毎に:
                     a. ディレイラインの最初の2つの値を平均する
                     b. 減衰係数を掛ける
                     c. 新しい値を末尾に追加し、古い値を取り除く
-            3. 完成した出力信号を返す
+               ピックアップの位置の隣り合う値の差をピックアップ信号とします。
+            4. ピックアップ信号にバンドパスフィルタ、歪み、エンベロープを掛け、正規化します。
         """
 
-        sound_wave_data = soundWaveData()
-        red_frequencies = redFrequencies()
         electronicguitar_data = electronicGuitarData()
-        adsr_envelop = electronicGuitarADSRTimeData()
+        adsr_envelop = electronicGuitarADSRTimeData(sound_wave_data["duration"])
 
         #max_freq = red_frequencies[-1]
 
         #decay_rate = 0.996
 
-        for frequency in red_frequencies:
+        # バンドパスフィルタは周波数によらないため、設計(SOS)を使い回す
+        bandpass_sos = self.__bandpassFilter(sound_wave_data["sampling_rate"])
+
+        num_samples = int(sound_wave_data["sampling_rate"]*sound_wave_data["duration"])
+
+        initial_waves = []
+        pickup_indexes = []
+
+        for frequency in frequencies:
             delay_float = sound_wave_data["sampling_rate"] / frequency
             delay_int = int(delay_float)
             #delay_length = int(sound_wave_data["sampling_rate"] / frequency)
@@ -84,61 +104,61 @@ class ElectronicGuitar(Instrument):
 
             #frac = delay_float - delay_int
 
-            #freq_norm = frequency / max_freq
-            #decay = decay_rate - 0.005 * freq_norm
-            decay = 0.996
-
-            #complex_frequency = 1j * 2 * np.pi * frequency
-
-            pickup_index = int(electronicguitar_data["pickup_position"] * delay_int)
-
-            num_samples = int(sound_wave_data["sampling_rate"]*sound_wave_data["duration"])
-            output = np.zeros(num_samples)
-
-            for i in range(num_samples):
-                right_value = delay_line[zeroInt()]
-                left_value = delay_line[oneInt()]
-                new_value = decay * (right_value + left_value) / 2
-                delay_line = np.roll(delay_line, -1)
-                delay_line[-1] = new_value
-
-                if pickup_index < len(delay_line) - 1:
-                    pickup_signal = delay_line[pickup_index+1] - delay_line[pickup_index]
-                else:
-                    pickup_signal = 0.0
-                
-                
-                #pickup_signal = self.__pickupCircuit(complex_frequency,
-                                                 #electronicguitar_data["inductance"],
-                                                 #electronicguitar_data["resistance"],
-                                                 #electronicguitar_data["capatitance"])
-                #output[i] = pickup_signal.real
-                output[i] = self.__bandpassFilter(pickup_signal, sound_wave_data["sampling_rate"])
+            initial_waves.append(delay_line)
+            pickup_indexes.append(int(electronicguitar_data["pickup_position"] * delay_int))
+
+        #freq_norm = frequency / max_freq
+        #decay = decay_rate - 0.005 * freq_norm
+        decay = 0.996
+
+        #complex_frequency = 1j * 2 * np.pi * frequency
+
+        # 全ての弦をまとめて鳴らし(無音の閾値があれば、聞こえなくなった弦から計算を打ち切る)、
+        # ピックアップ位置の遅延線の差分(弦の傾き)を読み出す
+        strings = KarplusStrongBank(initial_waves, decay)
+        if self.getBackend() == "numpy":
+            string_outputs = strings.process(num_samples, self.silenceThreshold)
+        else:
+            string_outputs = strings.processByStep(num_samples, self.silenceThreshold)
+        self.noteCutoffs = strings.cutoffs
+        pickup_indexes = np.array(pickup_indexes)
+        has_pickups = pickup_indexes < strings.lengths - 1
+        pickup_indexes = np.where(has_pickups, pickup_indexes, zeroInt())
+        pickup_signals = (strings.tap(string_outputs, pickup_indexes + 1)
+                          - strings.tap(string_outputs, pickup_indexes))
+        pickup_signals[~has_pickups] = 0.0
+
+        #pickup_signal = self.__pickupCircuit(complex_frequency,
+                                         #electronicguitar_data["inductance"],
+                                         #electronicguitar_data["resistance"],
+                                         #electronicguitar_data["capatitance"])
+        #output[i] = pickup_signal.real
+
+        # ピックアップ信号全体に対して一度だけ(全ての音をまとめて)フィルタを掛ける
+        # 無音で打ち切った後の値は0であるため、フィルタは最も遅く打ち切った位置までに掛け、残りは0のままとする
+        # (0を入れ続けると、フィルタの状態が非正規化数まで小さくなり、かえって遅くなる)
+        sounding_end = strings.cutoffs.max()
+        outputs = np.zeros_like(pickup_signals)
+        outputs[:, :sounding_end] = BiquadBank(bandpass_sos).process(pickup_signals[:, :sounding_end])
             
-            output = np.tanh(output)
-
-            #output = self.__bandpassFilter(output, sound_wave_data["sampling_rate"])
+        outputs = np.tanh(outputs)
 
-            output *= adsr_envelop
+        outputs *= adsr_envelop
 
+        for output in outputs:
             output /= np.max(np.abs(output) + 1e-9)
-            
-            self.soundsInstrumentPlay.append(output)
+
+        return outputs
     
-    def __bandpassFilter(self, pickup_signal, sample_rate):
+    def __bandpassFilter(self, sample_rate):
         """
-        出力信号にバンドパスフィルタをかけて、応答します
-        この関数はピックアップ回路の代替関数です
+        ピックアップ回路の代替となるバンドパスフィルタを設計し、
+        その二次セクション(SOS)を応答します
         Arguments:
-            output : 出力波形
             sample_rate : サンプリング周波数
         """
 
-        lower_limit_cutoff = 100 / (sample_rate / 2)
-        upper_limit_cutoff = 6000 / (sample_rate / 2)
-
-        b, a = butter(2, [lower_limit_cutoff, upper_limit_cutoff], btype='band')
-        return lfilter(b, a, [pickup_signal])
+        return butterworthSOS(2, (100, 6000), 'bandpass', sample_rate)
     
     def __pickupCircuit(self, complex_frequency, inductance, 
                         resistance, capacitance):
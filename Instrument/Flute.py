@@ -8,15 +8,19 @@ Flute : フルート
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
 
 from .Instrument import Instrument
 
 from Returner.Returner import (greenChar, greenFrequencies,
-                               soundWaveData, fluteData)
+                               fluteData)
 
 import numpy as np
 
+from scipy.signal import lfilter
+
+from scipy.ndimage import maximum_filter1d
+
 class Flute(Instrument):
     """
     フルート
@@ -27,7 +31,7 @@ class Flute(Instrument):
     Target:
         0: Instrumentクラスを正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
     """
 
@@ -40,62 +44,173 @@ class Flute(Instrument):
 
         super().__init__()
         self.color = greenChar()
-    
-    def makeSound(self):
+        self.frequencies = greenFrequencies()
+
+    def getBackends(self):
         """
-        奏でる音を作成する
+        この楽器が持つ計算の実装の名前の群れを応答します
+        numpy : 全ての音を(音の数 × サンプル数の)配列としてまとめて求め、
+                管の往復を全ての音でまとめて進める(既定)
+        reference : 音ごとに求める
+        """
+
+        return ("numpy", "reference")
+
+    def renderNotes(self, frequencies, sound_wave_data):
+        """
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
+        Target:
+            1: フルートデータを得る
+            2: 息のノイズを全サンプル分まとめて生成する
+            3: 全ての周波数に対して、以下を実行する
+               (getBackendが"numpy"なら、全ての周波数を配列としてまとめて求める)
+                a. 管の長さから遅延線長を、jet_delayから窓の長さを求める
+                b. ジェット入力(息の圧力 + ノイズ)は管からの帰還を受けないため、
+                   全サンプルのジェットモデルの値を一度に求める
+                c. 直近 jet_delay_samples 個の最大値(スライディング最大値)を
+                   ジェット出力とする
+                d. 管の往復 right[0] = jet + damping * left[-1], left[-1] = -right[-1]
+                   は遅延線長の線形コムフィルタと等価であるため、lfilterで求める
+                e. 正規化を行い、応答する
         """
 
-        sound_wave_data = soundWaveData()
         flute_data = fluteData()
-        green_frequencies = greenFrequencies()
 
-        for a_frequency in green_frequencies:
+        num_samples = sound_wave_data["num_samples"]
+
+        if self.getBackend() == "numpy":
+            outputs = self.__blowInLockstep(frequencies, flute_data, sound_wave_data)
+            for output in outputs:
+                self.__normalize(output)
+            return outputs
+
+        outputs = np.zeros((len(frequencies), num_samples))
+
+        for output, a_frequency in zip(outputs, frequencies):
             pipe_length = sound_wave_data["sound_speed"] / (2 * a_frequency)
 
             delay_length = int(sound_wave_data["sampling_rate"] * 2 * pipe_length / sound_wave_data["sound_speed"])
 
-            right_buffer = np.zeros(delay_length)
-            left_buffer = np.zeros(delay_length)  
-
             jet_state = 0.0
-            jet_delay_samples = int(flute_data["jet_delay"]*delay_length)
+            # 高い音では遅延線が短く、0サンプルに切り捨てられるため、窓は1サンプル以上とする
+            jet_delay_samples = max(1, int(flute_data["jet_delay"]*delay_length))
 
-            jet_delay = np.zeros(jet_delay_samples)
+            # 息のノイズは1サンプルずつではなく、まとめて生成する
+            pressure_in = flute_data["blowing_pressure"] + flute_data["noise_level"] * np.random.randn(num_samples)
 
-            output = np.zeros(sound_wave_data["num_samples"])
+            jet_input = pressure_in - jet_state
 
-            for n in range(sound_wave_data["num_samples"]):
-                pressure_in = flute_data["blowing_pressure"] + flute_data["noise_level"] * np.random.randn()
+            # implement jet oscillation in half space
+            # jet_values = self.__jetOscillationInHalfSpace(jet_input, a_frequency)
 
-                p_reflected = left_buffer[-1]
+            # implement proposed jet oscillation
+            jet_values = self.__proposedJetOscillation(jet_input, a_frequency)
 
-                jet_input = pressure_in - jet_state
+            jet_output = self.__slidingMaximum(jet_values, jet_delay_samples)
 
-                jet_delay = np.roll(jet_delay, -1)
-                jet_delay[0] = jet_input
+            #jet_output = np.tanh(jet_input * 5.0)
 
-                # implement jet oscillation in half space
-                # jet_output = self.__jetOscillationInHalfSpace(jet_delay, a_frequency)
+            right_wave = self.__boreReflection(jet_output, delay_length, flute_data["damping"])
 
-                # implement proposed jet oscillation
-                jet_output = self.__proposedJetOscillation(jet_delay, a_frequency)
+            output[delay_length - 1:] = right_wave[:num_samples - delay_length + 1]
+            
+            #output += flute_data["noise_level"] * np.random.rand(len(output))
 
-                #jet_output = np.tanh(jet_input * 5.0)
+            self.__normalize(output)
 
-                left_buffer = np.roll(left_buffer, -1)
-                right_buffer = np.roll(right_buffer, 1)
+        return outputs
 
-                right_buffer[0] = jet_output + p_reflected * flute_data["damping"]
-                left_buffer[-1] = -right_buffer[-1]
+    def __normalize(self, output):
+        """
+        出力波形を(その場で)正規化します
+        音が管の往復より短い場合は、出力が全て0のためそのままにする
+        Arguments:
+            output : 出力波形
+        """
 
-                output[n] = right_buffer[-1]
-            
-            #output += flute_data["noise_level"] * np.random.rand(len(output))
+        peak = max(abs(output))
+        if peak > 0.0:
+            output /= peak
 
-            output /= max(abs(output))
+    def __blowInLockstep(self, frequencies, flute_data, sound_wave_data):
+        """
+        全ての音の出力波形(音の数 × サンプル数)を、音ごとのループを使わずに求めて応答します
+        息のノイズ、ジェットモデルは(音の数 × サンプル数)の配列としてまとめて求め、
+        管の往復 r[n] = jet[n] - damping * r[n - D] は、
+        最も短い遅延線長 D_min のブロック単位で全ての音を一度に進める
+        (ブロックの中で読む r[n - D] は、既に求まっている)
+        Arguments:
+            frequencies : 周波数群
+            flute_data : フルートのデータ
+            sound_wave_data : サウンドデータ
+        """
+
+        num_samples = sound_wave_data["num_samples"]
+        num_notes = len(frequencies)
+        rows = np.arange(num_notes)[:, np.newaxis]
+
+        frequencies = np.asarray(frequencies, dtype=float)
+        pipe_lengths = sound_wave_data["sound_speed"] / (2 * frequencies)
+        delay_lengths = (sound_wave_data["sampling_rate"] * 2 * pipe_lengths
+                         / sound_wave_data["sound_speed"]).astype(int)
+        jet_delay_samples = np.maximum(1, (flute_data["jet_delay"] * delay_lengths).astype(int))
+
+        # 音ごとに生成した場合と同じ順に、息のノイズをまとめて生成する
+        pressure_in = flute_data["blowing_pressure"] + flute_data["noise_level"] * np.random.randn(num_notes, num_samples)
+
+        jet_values = self.__proposedJetOscillation(pressure_in, frequencies[:, np.newaxis])
+
+        jet_outputs = np.zeros((num_notes, num_samples))
+        for i, a_window in enumerate(jet_delay_samples):
+            jet_outputs[i] = self.__slidingMaximum(jet_values[i], a_window)
+
+        # r[n] を列 right_waves[:, offset + n] に持ち、その前を0で詰めておく
+        offset = delay_lengths.max()
+        right_waves = np.zeros((num_notes, offset + num_samples))
+        read_offsets = offset - delay_lengths[:, np.newaxis]
+        block_size = delay_lengths.min()
+        for start in range(0, num_samples, block_size):
+            positions = np.arange(start, min(start + block_size, num_samples))
+            right_waves[:, offset + positions] = (jet_outputs[:, positions] - flute_data["damping"]
+                                                  * right_waves[rows, read_offsets + positions])
+
+        outputs = np.zeros((num_notes, num_samples))
+        for i, a_delay in enumerate(delay_lengths):
+            outputs[i, a_delay - 1:] = right_waves[i, offset:offset + num_samples - a_delay + 1]
+
+        return outputs
 
-            self.soundsInstrumentPlay.append(output)
+    def __slidingMaximum(self, values, window):
+        """
+        各サンプルについて、直近window個(自身を含む)の値の最大値を応答します
+        遅延線の初期値(0)に対するジェットモデルの値は0であるため、
+        先頭の不足分は0として扱う
+        Arguments:
+            values : ジェットモデルの値の群れ
+            window : 窓の長さ(jet_delayのサンプル数)
+        """
+
+        padded = np.concatenate([np.zeros(window - 1), values])
+        maximums = maximum_filter1d(padded, size=window)
+        return maximums[window // 2: window // 2 + len(values)]
+
+    def __boreReflection(self, jet_output, delay_length, damping):
+        """
+        管の中を往復する右向き波 r[n] = jet[n] - damping * r[n - delay_length]
+        を求めて、応答します
+        Arguments:
+            jet_output : ジェット出力
+            delay_length : 遅延線の長さ
+            damping : 減衰係数
+        """
+
+        a = np.zeros(delay_length + 1)
+        a[0] = 1.0
+        a[delay_length] = damping
+        return lfilter([1.0], a, jet_output)
     
     def __jetOscillationInHalfSpace(self, x, frequency):
         """
@@ -104,7 +219,8 @@ class Flute(Instrument):
             x : jet_input 
             frequency : 周波数
         Return:
-            jet(x).real ジェットモデルの最大振幅の実部(型が合わないため)
+            jet(x).real ジェットモデルの実部(xの要素ごと、型が合わないため)
+            最大振幅は呼び出し側でスライディング最大値として求める
         """
 
         c_p = 5
@@ -116,10 +232,7 @@ class Flute(Instrument):
         second_expression = x * first_expression
         exp = np.exp(second_expression)
         third_expression = 1 - exp
-        real_values = third_expression.real
-        function_y = sorted(real_values, reverse=True)[0]
-
-        return function_y
+        return third_expression.real
     
     def __proposedJetOscillation(self, x, frequency):
         """
@@ -138,7 +251,8 @@ class Flute(Instrument):
             W = 0.05
             ω = 1j * 2 * π(np.pi or math.pi) * frequency
         Return:
-            jet(x).real ジェットモデルの最大振幅の実部
+            jet(x).real ジェットモデルの実部(xの要素ごと)
+            最大振幅は呼び出し側でスライディング最大値として求める
         """ 
 
         c_p = 5
@@ -153,9 +267,7 @@ class Flute(Instrument):
         eta_parag_one = 3 * alpha_for_jet * np.square(x/W)
         eta_parag_two = r_coeff * (1 - np.exp(index))
         eta = eta_parag_one + eta_parag_two
-        eta_reals = eta.real
-        function_y = sorted(eta_reals, reverse=True)[0]
-        return function_y
+        return eta.real
 
     
     def __alphaForJet(self, c_p, omega, r_coeff, u, W):
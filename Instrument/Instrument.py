@@ -9,7 +9,9 @@ Instrument : 楽器という抽象的な表現
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
+
+import numpy as np
 
 from Returner.Returner import *
 
@@ -21,29 +23,391 @@ class Instrument:
         つまり、プロパティやメソッドを完成させること
     Target:
         1: __init__を完成させる プロパティを初期化する(ゲッターも用意)
-        2: makeSoundを実装、といってもこのクラスのmakeSoundはpass
+        2: makeSoundを実装、音ごとの計算はrenderNotesに任せる(このクラスのrenderNotesはpass)
+        3: 計算の実装(backend)を選べるようにする
+        4: 任意の周波数、長さ、強さの音の群れを(音の数 × サンプル数)の配列として作れるようにする
+        5: 減衰する楽器が、聞こえなくなった音の計算を打ち切れるようにする(無音の閾値)
+        6: 音の群れを、一つの連続した(音の数 × サンプル数)の配列(soundBank)として束縛する
+        7: 別のプロセスが用意した配列(共有メモリなど)に、音の群れを直接書き込めるようにする
     """
 
     def __init__(self):
         """
         このクラスのコンストラクタ
         この楽器が奏でる音の群れプロパティと
-        所属する色(文字列)のプロパティを初期化する
+        所属する色(文字列)のプロパティ、
+        計算の実装(Noneなら環境変数、または楽器の既定の実装を用いる)のプロパティ、
+        makeSoundが既定で奏でる周波数の群れのプロパティ、
+        無音の閾値(Noneなら打ち切らない)と、音ごとに計算を打ち切った位置のプロパティ、
+        音の群れを束縛する配列とその型(Noneなら環境変数、または既定の型を用いる)のプロパティ、
+        makeSoundが音の群れを書き込む配列(Noneなら新しく確保する)と、
+        soundBankを置いている共有メモリ(Noneなら共有メモリではない)のプロパティを初期化する
+        soundsInstrumentPlayの各要素は、soundBankの行(コピーではない)である
         """
 
         self.soundsInstrumentPlay = emptyList()
         self.color = blankChar()
+        self.backend = nonePointer()
+        self.frequencies = emptyList()
+        self.silenceThreshold = nonePointer()
+        self.silenceCutoffs = emptyList()
+        self.noteCutoffs = nonePointer()
+        self.soundBank = nonePointer()
+        self.sampleFormat = nonePointer()
+        self.soundBuffer = nonePointer()
+        self.sharedSoundBank = nonePointer()
+
+    def __getstate__(self):
+        """
+        楽器を別のプロセスに渡すときの状態を応答します
+        共有メモリはこのプロセスが解放するものであるため、渡さない
+        """
+
+        state = self.__dict__.copy()
+        state["sharedSoundBank"] = nonePointer()
+
+        return state
+
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        先頭のものを、この楽器の既定の実装とする
+        子クラスは、自分が持つ実装に合わせてこのメソッドを上書きする
+        """
+
+        return ("reference",)
+
+    def setBackend(self, backend):
+        """
+        makeSoundが用いる計算の実装を設定します
+        Arguments:
+            backend : 実装の名前(getBackendsのいずれか)、Noneなら設定を取り消す
+        """
+
+        assert backend is None or backend in self.getBackends(), \
+            f"{type(self).__name__}の実装は{self.getBackends()}のいずれかです"
+        self.backend = backend
+
+    def getBackend(self):
+        """
+        makeSoundが用いる計算の実装の名前を応答します
+        setBackendで設定されていればそれを、
+        そうでなければ環境変数に設定された実装(この楽器が持つものに限る)を、
+        どちらもなければこの楽器の既定の実装を応答する
+        """
+
+        if self.backend is not None:
+            return self.backend
+
+        backend = configuredBackend()
+        if backend in self.getBackends():
+            return backend
+
+        return self.getBackends()[zeroInt()]
+
+    def setSilenceThreshold(self, threshold_db):
+        """
+        無音の閾値を設定します
+        減衰する楽器(ElectronicGuitar, Ukulele, JapaneseGuitar, Vibraphone, Piano)は、
+        遅延線の値が最大振幅に対してこの閾値を下回り続けた時点で計算を打ち切り、残りを0で埋める
+        それ以外の楽器は、閾値によらず最後まで求める
+        Arguments:
+            threshold_db : 最大振幅に対するdB(負の値)、Noneなら打ち切らない
+        """
+
+        assert threshold_db is None or threshold_db < 0, "無音の閾値は最大振幅に対する負のdBです"
+        self.silenceThreshold = threshold_db
+
+    def setSampleFormat(self, sample_format):
+        """
+        音の群れを束縛する配列の型を設定します
+        計算は型によらずfloat64で行い、型を変えるのは作成した音を束縛するときの一度だけとする
+        (遅延線や再帰的なフィルタはfloat32では誤差が積み重なるため)
+        Arguments:
+            sample_format : 型の名前(sampleFormatsのいずれか)、Noneなら設定を取り消す
+        """
+
+        assert sample_format is None or sample_format in sampleFormats(), \
+            f"配列の型は{sampleFormats()}のいずれかです"
+        self.sampleFormat = sample_format
+
+    def getSampleFormat(self):
+        """
+        音の群れを束縛する配列の型の名前を応答します
+        setSampleFormatで設定されていればそれを、
+        そうでなければ環境変数に設定された型を、どちらもなければ既定の型を応答する
+        """
+
+        if self.sampleFormat is not None:
+            return self.sampleFormat
+
+        sample_format = configuredSampleFormat()
+        if sample_format is not None:
+            return sample_format
+
+        return sampleFormats()[zeroInt()]
+
+    def getSilenceCutoffs(self):
+        """
+        音ごとに計算を打ち切った位置(サンプル数、打ち切らなければ音の長さ)の群れを応答します
+        並びはgetSoundsInstrumentPlayと同じ
+        """
+
+        return self.silenceCutoffs
     
-    def makeSound(self):
+    def makeSound(self, frequencies=None, durations=None, velocities=None):
+        """
+        音の群れを作り、soundBank(とその行であるsoundsInstrumentPlay)に加え、
+        加えた音の群れ(音の数 × サンプル数、soundBankの行)を応答します
+        長さが異なる音は、長さごとにまとめてrenderNotesで作り、
+        最も長い音に合わせて後ろを0で埋める
+        renderNotesが応答した配列がそのままsoundBankの形と型になるなら(__canAdopt)、
+        コピーせずにそれを用いる(音の群れの配列を二つ持たない)
+        そうでなければ(float32で束縛する、長さが異なる、書き込む配列が設定されている場合)、
+        音の群れの配列を確保して写す(renderNotesの配列と一時的に両方を持つ)
+        Arguments:
+            frequencies : 周波数の群れ(Noneならこの楽器の色の周波数の群れ)
+            durations : 音の長さ(秒)、またはその群れ(Noneなら既定の長さ)
+            velocities : 音の強さ(0から1)、またはその群れ(Noneなら1)
+        """
+
+        frequencies, durations, velocities = self.__noteArguments(frequencies, durations, velocities)
+        num_notes = len(frequencies)
+        num_samples = self.__numSamples(durations)
+        outputs = nonePointer()
+        cutoffs = np.zeros(num_notes, dtype=np.intp)
+
+        for a_duration in np.unique(durations):
+            indexes = np.flatnonzero(durations == a_duration)
+            sound_wave_data = soundWaveData(float(a_duration))
+            self.noteCutoffs = nonePointer()
+            rendered = self.renderNotes(frequencies[indexes], sound_wave_data)
+            if outputs is None and self.__canAdopt(rendered, num_notes, num_samples):
+                outputs = rendered
+            else:
+                if outputs is None:
+                    outputs = self.__allocateSounds(num_notes, num_samples)
+                outputs[indexes, :rendered.shape[1]] = rendered
+            if self.noteCutoffs is None:
+                cutoffs[indexes] = rendered.shape[1]
+            else:
+                cutoffs[indexes] = self.noteCutoffs
+
+        outputs *= velocities[:, None]
+        self.silenceCutoffs.extend(cutoffs.tolist())
+
+        return self.__storeSounds(outputs)
+
+    def __noteArguments(self, frequencies, durations, velocities):
+        """
+        makeSoundの引数を、音の数の長さを持つ(周波数, 長さ, 強さ)の配列の組にして応答します
+        Arguments:
+            frequencies : 周波数の群れ(Noneならこの楽器の色の周波数の群れ)
+            durations : 音の長さ(秒)、またはその群れ(Noneなら既定の長さ)
+            velocities : 音の強さ(0から1)、またはその群れ(Noneなら1)
+        """
+
+        if frequencies is None:
+            frequencies = self.frequencies
+        frequencies = np.atleast_1d(np.asarray(frequencies, dtype=np.float64))
+        assert frequencies.ndim == 1 and np.all(frequencies > 0), \
+            "周波数は正の数の群れです"
+
+        num_notes = len(frequencies)
+        if durations is None:
+            durations = soundWaveData()["duration"]
+        durations = np.broadcast_to(np.asarray(durations, dtype=np.float64), (num_notes,))
+        if velocities is None:
+            velocities = 1.0
+        velocities = np.broadcast_to(np.asarray(velocities, dtype=np.float64), (num_notes,))
+        assert np.all(durations > 0), "音の長さは正の数です"
+
+        return frequencies, durations, velocities
+
+    def __numSamples(self, durations):
+        """
+        長さの群れのうち、最も長い音のサンプル数を応答します
+        Arguments:
+            durations : 音の長さ(秒)の群れ
+        """
+
+        return max([soundWaveData(a_duration)["num_samples"] for a_duration in durations],
+                   default=zeroInt())
+
+    def __canAdopt(self, rendered, num_notes, num_samples):
+        """
+        renderNotesが応答した配列を、コピーせずにそのまま音の群れとしてよいかを応答します
+        全ての音を含む形で、型がgetSampleFormatと一致し、C連続で、
+        自分でデータを持つ(キャッシュなどを指していない)配列であり、
+        書き込む配列(soundBuffer)が設定されていない場合に限る
+        Arguments:
+            rendered : renderNotesが応答した配列
+            num_notes : 音の数
+            num_samples : サンプル数
+        """
+
+        return (self.soundBuffer is None
+                and rendered.shape == (num_notes, num_samples)
+                and rendered.dtype == self.getSampleFormat()
+                and rendered.flags["C_CONTIGUOUS"] and rendered.flags["OWNDATA"]
+                and rendered.flags["WRITEABLE"])
+
+    def __allocateSounds(self, num_notes, num_samples):
+        """
+        makeSoundが音の群れを書き込む配列(0で埋めたもの)を応答します
+        soundBufferが束縛されていて、それがそのままsoundBankになる(まだ音の群れがなく、形と型が合う)なら、
+        新しく確保せずにそれを用いる soundBufferは一度用いたら束縛を解く
+        Arguments:
+            num_notes : 音の数
+            num_samples : サンプル数
+        """
+
+        sound_buffer = self.soundBuffer
+        self.soundBuffer = nonePointer()
+        sample_format = self.getSampleFormat()
+
+        if sound_buffer is None or self.soundBank is not None \
+                or sound_buffer.shape != (num_notes, num_samples) or sound_buffer.dtype != sample_format:
+            return np.zeros((num_notes, num_samples), dtype=sample_format)
+
+        sound_buffer.fill(zeroInt())
+
+        return sound_buffer
+
+    def getSoundBankShape(self, frequencies=None, durations=None):
+        """
+        同じ引数でmakeSoundを呼んだ後のsoundBankの(形, 型の名前)を応答します
+        音の群れを受け取る配列(共有メモリなど)を、作成する前に確保するために用いる
+        Arguments:
+            frequencies : 周波数の群れ(Noneならこの楽器の色の周波数の群れ)
+            durations : 音の長さ(秒)、またはその群れ(Noneなら既定の長さ)
+        """
+
+        frequencies, durations, _ = self.__noteArguments(frequencies, durations, None)
+        num_notes = len(frequencies)
+        num_samples = self.__numSamples(durations)
+        sample_format = np.dtype(self.getSampleFormat())
+
+        if self.soundBank is not None:
+            num_notes += len(self.soundBank)
+            num_samples = max(num_samples, self.soundBank.shape[1])
+            sample_format = np.result_type(self.soundBank, sample_format)
+
+        return (num_notes, num_samples), sample_format.name
+
+    def setSoundBuffer(self, sound_buffer):
+        """
+        次のmakeSoundが音の群れを書き込む配列を設定します
+        形と型がgetSoundBankShapeと一致し、まだ音の群れがなければ、その配列がそのままsoundBankになる
+        そうでなければ、makeSoundは新しく配列を確保する(書き込まれたかはgetSoundBankで確かめる)
+        Arguments:
+            sound_buffer : 書き込む配列(音の数 × サンプル数)、Noneなら設定を取り消す
+        """
+
+        self.soundBuffer = sound_buffer
+
+    def __storeSounds(self, outputs):
+        """
+        作成した音の群れをsoundBankに加え、soundsInstrumentPlayをその行の群れとして束縛し直し、
+        加えた音の群れ(soundBankの行)を応答します
+        最初の音の群れはコピーせずにそのままsoundBankとする
+        既に音の群れがあれば、長い方に合わせて後ろを0で埋め、一つの配列にまとめ直す
+        Arguments:
+            outputs : 作成した音の群れ(音の数 × サンプル数)
+        """
+
+        if self.soundBank is None:
+            self.soundBank = outputs
+        else:
+            num_samples = max(self.soundBank.shape[1], outputs.shape[1])
+            sound_bank = np.zeros((len(self.soundBank) + len(outputs), num_samples),
+                                  dtype=np.result_type(self.soundBank, outputs))
+            sound_bank[:len(self.soundBank), :self.soundBank.shape[1]] = self.soundBank
+            sound_bank[len(self.soundBank):, :outputs.shape[1]] = outputs
+            self.soundBank = sound_bank
+
+        self.soundsInstrumentPlay = list(self.soundBank)
+
+        return self.soundBank[len(self.soundBank) - len(outputs):]
+
+    def getSoundBank(self):
+        """
+        楽器が演奏する音の集合を、一つの連続した(音の数 × サンプル数)の配列として応答します
+        まだ音を作成していなければNoneを応答する
+        """
+
+        return self.soundBank
+
+    def setSoundBank(self, sound_bank, silence_cutoffs, shared_sound_bank=None):
+        """
+        別のプロセスで作成された音の群れを、この楽器のsoundBankとして束縛します
+        soundsInstrumentPlayは、その行の群れとして束縛し直す
+        それまでの音の群れが共有メモリにあれば、それを解放する
+        Arguments:
+            sound_bank : 音の群れ(音の数 × サンプル数)
+            silence_cutoffs : 音ごとに計算を打ち切った位置の群れ
+            shared_sound_bank : sound_bankを置いている共有メモリ(楽器を解放するときに閉じる)、またはNone
+        """
+
+        assert len(sound_bank) == len(silence_cutoffs), "音の数と打ち切った位置の数が異なります"
+        previous = self.sharedSoundBank
+        self.soundBank = sound_bank
+        self.soundsInstrumentPlay = list(self.soundBank)
+        self.silenceCutoffs = list(silence_cutoffs)
+        self.sharedSoundBank = shared_sound_bank
+        if previous is not None:
+            previous.close()
+
+    def getRenderState(self):
+        """
+        音を作成したときに、音の群れ以外にこの楽器に残した状態(トレースの記録など)を、
+        {プロパティの名前: 値}の辞書として応答します
+        別のプロセスで作成した場合に、その状態を親のプロセスの楽器へ送り返すために用いる
+        子クラスは、そのような状態を持つ場合にこのメソッドを上書きする
+        """
+
+        return {}
+
+    def setRenderState(self, render_state):
+        """
+        getRenderStateで得た状態を、この楽器のプロパティとして束縛します
+        Arguments:
+            render_state : {プロパティの名前: 値}の辞書
+        """
+
+        for a_name, a_value in render_state.items():
+            setattr(self, a_name, a_value)
+
+    def releaseSounds(self):
+        """
+        楽器が演奏する音の集合を手放します
+        soundBankが共有メモリにあれば、その行を指す参照を全て外してから共有メモリを閉じる
+        (getSoundBankやgetSoundsInstrumentPlayで受け取った配列も、先に手放しておくこと)
+        """
+
+        self.soundBank = nonePointer()
+        self.soundsInstrumentPlay = emptyList()
+        self.silenceCutoffs = emptyList()
+        self.soundBuffer = nonePointer()
+        if self.sharedSoundBank is not None:
+            self.sharedSoundBank.close()
+            self.sharedSoundBank = nonePointer()
+
+    def renderNotes(self, frequencies, sound_wave_data):
         """
         pass method
+        子クラスは、周波数の群れの音を(音の数 × サンプル数)の配列として応答するように上書きする
+        無音で計算を打ち切った子クラスは、音ごとの打ち切った位置をnoteCutoffsに束縛する
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
         """
 
         pass
 
     def getSoundsInstrumentPlay(self):
         """
-        楽器が演奏する音の集合を応答します
+        楽器が演奏する音の集合(soundBankの行の群れ)を応答します
         """
 
         return self.soundsInstrumentPlay
@@ -8,19 +8,20 @@ JapanaseGuitar : 三味線
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
 
 from .Instrument import Instrument
 
 from Returner.Returner import (greenChar, greenFrequencies,
-                               soundWaveData, japaneseGuitarData)
+                               japaneseGuitarData)
 
 import numpy as np
 
-from scipy.signal import lfilter
-
 from collections import deque
 
+from DSP.BiquadBank import BiquadBank, resonatorSOS
+from DSP.KarplusStrongBank import KarplusStrongBank
+
 class JapaneseGuitar(Instrument):
     """
     三味線
@@ -31,7 +32,7 @@ class JapaneseGuitar(Instrument):
     Target:
         0: Instrumentクラスを正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
     """
 
@@ -42,17 +43,30 @@ class JapaneseGuitar(Instrument):
 
         super().__init__()
         self.color = greenChar()
-    
-    def makeSound(self):
+        self.frequencies = greenFrequencies()
+
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        numpy : 全ての弦をブロック単位でまとめて進める(既定)
+        reference : 全ての弦を1サンプルずつ進める
         """
-        奏でる音を作成する
+
+        return ("numpy", "reference")
+
+    def renderNotes(self, frequencies, sound_wave_data):
+        """
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
         """
 
-        sound_wave_data = soundWaveData()
-        green_frequencies = greenFrequencies()
         japanese_guitar_data = japaneseGuitarData()
 
-        for a_frequency in green_frequencies:
+        buffers = []
+
+        for a_frequency in frequencies:
             delay_length = int(sound_wave_data["sampling_rate"] / a_frequency)
 
             buffer = self.__create_initialized_noise(japanese_guitar_data["pick_force"],
@@ -63,23 +77,32 @@ class JapaneseGuitar(Instrument):
                                                  japanese_guitar_data["pick_position"],
                                                  delay_length)
             
-            output = np.zeros(sound_wave_data["num_samples"])
-
-            for n in range(sound_wave_data["num_samples"]):
-                x0 = buffer[0]
-                x1 = buffer[1]
-                averaged = 0.5 * (x0 + x1)
-                new_val = averaged * japanese_guitar_data["damping"]
-                buffer = np.roll(buffer, -1)
-                buffer[-1] = new_val
-                output[n] = new_val
-
-            for mode in japanese_guitar_data["body_modes"]:
-                output = self.__resonant_filter(output, mode)
-            
-            output /= max(abs(output))
-            self.soundsInstrumentPlay.append(output)
-            
+            buffers.append(buffer)
+
+        # 全ての弦をまとめて鳴らす(無音の閾値があれば、聞こえなくなった弦から計算を打ち切る)
+        string_bank = KarplusStrongBank(buffers, japanese_guitar_data["damping"])
+        if self.getBackend() == "numpy":
+            strings = string_bank.process(sound_wave_data["num_samples"], self.silenceThreshold)
+        else:
+            strings = string_bank.processByStep(sound_wave_data["num_samples"], self.silenceThreshold)
+        self.noteCutoffs = string_bank.cutoffs
+
+        # 胴の共鳴は全ての音で共通のため、全ての音をまとめて一度だけフィルタを掛ける
+        body_filter = BiquadBank(resonatorSOS(japanese_guitar_data["body_modes"], 4,
+                                              sound_wave_data["sampling_rate"]))
+        # 無音で打ち切った後の値は0であるため、フィルタは最も遅く打ち切った位置までに掛け、残りは0のままとする
+        # (0を入れ続けると、フィルタの状態が非正規化数まで小さくなり、かえって遅くなる)
+        sounding_end = string_bank.cutoffs.max()
+        outputs = np.zeros_like(strings)
+        outputs[:, :sounding_end] = body_filter.process(strings[:, :sounding_end])
+
+        for output in outputs:
+            # 音が弦の往復より短い、またはナイキスト周波数に近い場合は出力が全て0のため、そのままにする
+            peak = max(abs(output))
+            if peak > 0.0:
+                output /= peak
+
+        return outputs
     
     def __create_initialized_noise(self, 
                                    pick_force,
@@ -116,29 +139,5 @@ class JapaneseGuitar(Instrument):
         if delay == 0:
             return buffer
         filtered = np.copy(buffer)
-        for i in range(delay, len(buffer)):
-            filtered[i] -= buffer[i - delay]
+        filtered[delay:] -= buffer[:-delay]
         return filtered
-
-    def __resonant_filter(self, output, frequency, Q=4, sample_rate=44100):
-        """
-        出力波形にIIRフィルターを掛けます。
-        Arguments:
-            output : 出力波形
-            frequency : 周波数
-            Q : ?
-        """
-
-        omega = 2 * np.pi * frequency / sample_rate
-        alpha = np.sin(omega) / (2 * Q)
-
-        b0 = alpha
-        b1 = 0
-        b2 = -alpha
-        a0 = 1 + alpha
-        a1 = -2 * np.cos(omega)
-        a2 = 1 - alpha
-
-        b = np.array([b0, b1, b2]) / a0
-        a = np.array([1, a1 / a0, a2 / a0])
-        return lfilter(b, a, output)
\ No newline at end of file
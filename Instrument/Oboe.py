@@ -8,16 +8,19 @@ Oboe : オーボエ
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
 
 from .Instrument import Instrument
 
 from Returner.Returner import (redChar, redFrequencies,
-                               soundWaveData, returnTimeData,
-                               oboeData, zeroInt, oneInt, twoInt)
+                               returnTimeData,
+                               oboeData, zeroInt, oneInt, twoInt,
+                               returnFalse, emptyList)
 
 import numpy as np
 
+from DSP.DelayLine import DelayLine
+
 class Oboe(Instrument):
     """
     オーボエ
@@ -28,7 +31,7 @@ class Oboe(Instrument):
     Target:
         0: Instrumentクラスを正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
     """
 
@@ -38,56 +41,206 @@ class Oboe(Instrument):
         """
         super().__init__()
         self.color = redChar()
+        self.frequencies = redFrequencies()
+        self.trace = returnFalse()
+        self.reedFlows = emptyList()
+        self.reedSummaries = emptyList()
     
-    def makeSound(self):
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        reference : 音ごとに、遅延線を1サンプルずつ進める(既定)
+        numpy : 全ての音を1サンプルずつ同時に(numpy配列として)進める
+                (一サンプルごとのnumpyの呼び出しは重いため、音の数が多いほど有利になる)
+        """
+
+        return ("reference", "numpy")
+
+    def setTrace(self, trace):
+        """
+        診断用のトレースを有効(True)/無効(False)にします
+        有効にすると、各サンプルのリードを通る流量Uと、
+        音ごとのその要約を記録します(出力はしない、getReedSummariesで得る)
+        Arguments:
+            trace : トレースを行うかどうか
+        """
+
+        self.trace = trace
+
+    def getReedFlows(self):
+        """
+        トレースで記録した、音ごとのリード流量Uの配列群を応答します
+        """
+
+        return self.reedFlows
+
+    def getReedSummaries(self):
+        """
+        トレースで記録した、音ごとのリード流量Uの要約
+        ({"frequency": 周波数, "min": 最小値, "max": 最大値, "open": リードが開いていたサンプルの割合})
+        の群れを応答します
+        """
+
+        return self.reedSummaries
+
+    def getRenderState(self):
+        """
+        トレースを行っている場合は、記録したリード流量とその要約を状態として応答します
+        (別のプロセスで作成しても、getReedFlowsとgetReedSummariesで得られるようにする)
         """
-        奏でる音を作成する
-        1: 必要なデータ(周波数群、サウンドデータ、オーボエデータ)を得る
-        2: 全ての周波数に対して、以下を実行する
+
+        if not self.trace:
+            return {}
+
+        return {"reedFlows": self.reedFlows, "reedSummaries": self.reedSummaries}
+
+    def renderNotes(self, frequencies, sound_wave_data):
+        """
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
+        1: 必要なデータ(オーボエデータ)を得る
+        2: ループの外で不変な値(Z0, 吹く圧力の変調)を求めておく
+        3: 全ての周波数に対して、以下を実行する
+           (getBackendが"numpy"なら、全ての周波数をnumpy配列として同時に進める)
            delay_lengthを求め、outputとright_wave, left_waveを0で初期化
-           2-: サンプル数に対して、以下を実行する
+           right_wave, left_waveは遅延線(リングバッファ)として扱い、
+           ロールの代わりに先頭の位置を動かす
+           3-: サンプル数に対して、以下を実行する
             a. p_bとp_cを求め、delta_pを求める
-            b. UとZ0を求め、新しい右向き波を求める
-            c. right_waveとleft_waveを一つロールする
-            d. right_waveの先頭を新しい波で更新する
+            b. Uを求め、新しい右向き波を求める
+            c. right_waveの先頭を新しい波で更新する
+            d. right_waveとleft_waveを一つロールする(先頭位置を動かす)
             e. 右向き波を反転させ、反射波を得る
             f. output[n]を更新する
+        4: 出力波形を正規化し、応答する
         """
 
-        sound_wave_data = soundWaveData()
         oboe_data = oboeData()
-        red_frequencies = redFrequencies()
 
-        for a_frequency in red_frequencies:
+        num_samples = sound_wave_data["num_samples"]
+        threshold = oboe_data["threshold"]
+        alpha = oboe_data["alpha"]
+        reflection = oboe_data["reflection"]
+
+        Z0 = sound_wave_data["sound_speed"] * oboe_data["rho"]
+        half_Z0 = Z0 / twoInt()
+
+        # 5Hzの吹く圧力の変調は全ての音で共通のため、あらかじめ求めておく
+        sample_indexes = np.arange(num_samples)
+        blowing_pressures = (oboe_data["blowing_pressure"] * (
+            1.0 + 0.005 * np.sin(2 * np.pi * 5 * sample_indexes / sound_wave_data["sampling_rate"]))).tolist()
+
+        trace = self.trace
+
+        if self.getBackend() == "numpy":
+            delay_lengths = [int(sound_wave_data["sampling_rate"] / (twoInt() * a_frequency))
+                             for a_frequency in frequencies]
+            outputs, flows = self.__reedInLockstep(delay_lengths, blowing_pressures,
+                                                   threshold, alpha, reflection, half_Z0)
+            for a_frequency, output, a_flow in zip(frequencies, outputs, flows):
+                self.__normalizeSound(a_frequency, output, a_flow if trace else None)
+            return outputs
+
+        outputs = np.zeros((len(frequencies), num_samples))
+
+        for output, a_frequency in zip(outputs, frequencies):
             delay_length = int(sound_wave_data["sampling_rate"] / (twoInt() * a_frequency))
-            output = np.zeros(sound_wave_data["num_samples"])
-            right_wave = np.zeros(delay_length)
-            left_wave = np.zeros(delay_length)
-
-            for n in range(sound_wave_data["num_samples"]):
-                p_b = oboe_data["blowing_pressure"] * (1.0 + 0.005 * np.sin(2 * np.pi * 5 * n / sound_wave_data["sampling_rate"]))
-                p_c = right_wave[zeroInt()] + left_wave[zeroInt()]
-                #print(p_c)
+            # 右向き波は(元のロールの向きに合わせて)逆順に持つため、
+            # 最も古い値の次(tap(1))がロール後の末尾の値に当たる
+            right_wave = DelayLine(delay_length)
+            left_wave = DelayLine(delay_length)
+
+            if trace:
+                flows = np.zeros(num_samples)
+
+            for n, p_b in enumerate(blowing_pressures):
+                p_c = right_wave.tap(0) + left_wave.tap(0)
                 delta_p = p_b - p_c
-                if delta_p > oboe_data["threshold"]:
-                    U = max(zeroInt(), oboe_data["alpha"]*(delta_p - oboe_data["threshold"]))
+                if delta_p > threshold:
+                    U = alpha * (delta_p - threshold)
                 else:
                     U = 0.0
-                print(U)
-                Z0 = sound_wave_data["sound_speed"] * oboe_data["rho"]
-
-                p_plus_new = left_wave[zeroInt()] + (Z0 * U / twoInt())
-
-                right_wave[zeroInt()] = p_plus_new
-                right_wave = np.roll(right_wave, oneInt())
-                left_wave = np.roll(left_wave, -oneInt())
-                left_wave[-1] = oboe_data["reflection"] * right_wave[-1]
-                output[n] = right_wave[-1] + left_wave[-1]
-            
-            #print(left_wave)
-            #print(right_wave)
-            #print(output)
-            output /= max(abs(output))
-            #print(output[0:1000])
-        
-            self.soundsInstrumentPlay.append(output)
\ No newline at end of file
+                if trace:
+                    flows[n] = U
+
+                right_wave.push(left_wave.tap(0) + half_Z0 * U)
+                right_last = right_wave.tap(1)
+                # 左向き波の先頭を一つ進め、空いた末尾に反射波を書き込む
+                left_wave.push(reflection * right_last)
+                output[n] = right_last + left_wave.tap(-1)
+
+            self.__normalizeSound(a_frequency, output, flows if trace else None)
+
+        return outputs
+
+    def __normalizeSound(self, frequency, output, flows):
+        """
+        出力波形を(その場で)正規化します
+        トレースを行っている場合は、リード流量とその要約を記録します
+        Arguments:
+            frequency : 周波数
+            output : 出力波形
+            flows : リード流量(トレースを行っていなければNone)
+        """
+
+        if flows is not None:
+            self.reedFlows.append(flows)
+            self.reedSummaries.append({"frequency": float(frequency),
+                                       "min": float(flows.min()),
+                                       "max": float(flows.max()),
+                                       "open": np.count_nonzero(flows) / len(flows)})
+
+        # 音が管の往復より短い場合は出力が全て0のため、そのままにする(NaNにしない)
+        peak = max(abs(output))
+        if peak > 0.0:
+            output /= peak
+
+    def __reedInLockstep(self, delay_lengths, blowing_pressures,
+                         threshold, alpha, reflection, half_Z0):
+        """
+        全ての音の右向き波、左向き波を1サンプルずつ同時に進め、
+        (出力波形, リード流量)(それぞれ 音の数 × サンプル数)を応答します
+        遅延線は(最も長い遅延線に合わせて詰めた)2次元バッファの行として持ち、
+        行ごとの先頭の位置を、遅延線長に達した行だけ0に戻しながら動かす
+        (右向き波、左向き波の先頭は常に同じ位置にある)
+        Arguments:
+            delay_lengths : 音ごとの遅延線の長さ
+            blowing_pressures : 吹く圧力の時間軸データ
+            threshold : リードが開く圧力差
+            alpha : 流量の係数
+            reflection : 反射係数
+            half_Z0 : 特性インピーダンスの半分
+        """
+
+        num_notes = len(delay_lengths)
+        num_samples = len(blowing_pressures)
+        rows = np.arange(num_notes)
+        lengths = np.array(delay_lengths)
+
+        right_waves = np.zeros((num_notes, lengths.max()))
+        left_waves = np.zeros((num_notes, lengths.max()))
+        heads = np.zeros(num_notes, dtype=np.intp)
+
+        outputs = np.zeros((num_notes, num_samples))
+        flows = np.zeros((num_notes, num_samples))
+
+        for n, p_b in enumerate(blowing_pressures):
+            left_oldest = left_waves[rows, heads]
+            delta_p = p_b - (right_waves[rows, heads] + left_oldest)
+            U = np.where(delta_p > threshold, alpha * (delta_p - threshold), 0.0)
+            flows[:, n] = U
+
+            right_waves[rows, heads] = left_oldest + half_Z0 * U
+            nexts = heads + 1
+            nexts[nexts == lengths] = 0
+            seconds = nexts + 1
+            seconds[seconds == lengths] = 0
+            right_last = right_waves[rows, seconds]
+            left_newest = reflection * right_last
+            left_waves[rows, heads] = left_newest
+            outputs[:, n] = right_last + left_newest
+            heads = nexts
+
+        return outputs, flows
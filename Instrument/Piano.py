@@ -8,17 +8,19 @@ Piano : ピアノ
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
 
 from .Instrument import Instrument
 
 from Returner.Returner import (blueChar, blueFrequencies,
-                               soundWaveData, pianoData,
-                               pianoResonator)
+                               pianoData)
 
 import numpy as np
 
-import time
+from scipy.signal import lfilter
+
+from DSP.ResonatorBank import ResonatorBank
+from DSP.SilenceDetector import SilenceDetector
 
 class Piano(Instrument):
     """
@@ -30,7 +32,7 @@ class Piano(Instrument):
     Target:
         0: Instrumentクラスを正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
     """
 
@@ -41,60 +43,69 @@ class Piano(Instrument):
 
         super().__init__()
         self.color = blueChar()
+        self.frequencies = blueFrequencies()
+
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        numpy : 弦の応答をlfilterでまとめて求める(既定)
+        reference : 弦の応答を1サンプルずつ求める
+        """
+
+        return ("numpy", "reference")
     
-    def makeSound(self):
+    def renderNotes(self, frequencies, sound_wave_data):
         """
-        奏でる音を作成する
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
         Target:
-            1: サウンドデータ、周波数群、pianoデータを得る
+            1: pianoデータを得る
             2: 弦の長さを束縛する [6.06, 6.05, 6.04, 6.03, 6.02, 6.01, 6.00]
+               (青色の周波数に対する長さであり、それ以外の周波数は線形補間する)
             3: 全ての周波数に対して、以下を繰り返す
                 a. 遅延線長を決定し、バッファをノイズによって初期化
                 b. ハンマー模型を準備 <- これは、3:の前段階で行う
                     ハンマーを振る速さ、ハンマーの質量, 非線形ハンマーを準備
                     速さ = 初速 + 加速度*圧力を加える時間(おそらく微小)
                     加速度 = 力 / 質量
-                    弦の速度 = 弦の長さ / 圧力を加える時間
-                c. サウンドボードの共鳴フィルタを準備 <- これは、3:の前段階で行う
-                d. 出力波形を準備
-                e. サンプル数分、以下を実行する
-                    e-1. ハンマーと弦の相互作用を求める
-                    e-2. 遅延線アルゴリズムを用いて、新たな値を求める
-                    e-3. 弦遅延線を進める
-                    e-4. new_valをサウンドボードに通す
-                    e-?. ペダル効果を得て、適応する
-                    e-5. 出力波形に書き込む
-                f. 正規化を行って、当該プロパティに束縛する
-        """
-
-        sound_wave_data = soundWaveData()
-        blue_frequencies = blueFrequencies()
+                c. サウンドボードの共鳴フィルタ群(SOS)を準備 <- これは、3:の前段階で行う
+                d. 接触フェーズ: ハンマーが弦に触れている間だけ、
+                   1サンプルずつハンマーと弦の相互作用(非線形)を求め、
+                   弦に与える速度(励振)を得る
+                e. 弦フェーズ: 接触が終われば系は線形であるため、
+                   打弦位置のコムフィルタ、遅延線アルゴリズムをlfilterでまとめて求める
+                   (無音の閾値があれば、区切って求め、聞こえなくなった時点で打ち切る)
+                e-?. ペダル効果を得て、適応する
+            4: 全ての音の弦の応答に、サウンドボードの共鳴フィルタ群を一度に掛ける
+            5: 出力が有限であることを確かめてから正規化を行い、応答する
+        """
+
         piano_data = pianoData()
 
-        resonant_data = piano_data["resonant_filters"]
-        string_lengthes = piano_data["string_lengthes"]
+        string_lengthes = np.interp(frequencies, blueFrequencies(),
+                                    piano_data["string_lengthes"])
 
         hammer_acceleration = piano_data["hammer_force"] / piano_data["hammer_mass"]
-        hammer_velocity = 1.0 + hammer_acceleration * piano_data["force_time"]
-        hammer_position = piano_data["hammer_position"]
-        string_position = piano_data["string_position"]
+        initial_hammer_velocity = 1.0 + hammer_acceleration * piano_data["force_time"]
 
-        dt = sound_wave_data["dt"]
+        damping = piano_data["damping"] + 0.002 * piano_data["pedal"]
 
-        resonators = []
-        for r in resonant_data:
-            f = pianoResonator()
-            f.setSamplingRate(fs=sound_wave_data["sampling_rate"])
-            f.setFrequency(r)
-            f.defineOtherProperties()
-            resonators.append(f)
+        resonator_bank = ResonatorBank(piano_data["resonant_filters"], sound_wave_data["sampling_rate"])
 
-        for a_frequency, a_string_length in zip(blue_frequencies, string_lengthes):
+        if self.getBackend() == "numpy":
+            string_response = self.__stringResponse
+        else:
+            string_response = self.__stringResponseByStep
+
+        strings = np.zeros((len(frequencies), sound_wave_data["num_samples"]))
+        cutoffs = np.zeros(len(frequencies), dtype=np.intp)
+
+        for i, (a_frequency, a_string_length) in enumerate(zip(frequencies, string_lengthes)):
             delay_length = int(sound_wave_data["sampling_rate"] / a_frequency)
             delay_line = np.random.uniform(-1, 1, delay_length)
 
-            string_velocity = a_string_length / piano_data["force_time"]
-
             # string_mass u = m / L よって、m = u*L
             # このuを求める
             # 2Lf = √T / u
@@ -106,37 +117,210 @@ class Piano(Instrument):
             u = piano_data["string_tension"] / (4 * (a_string_length**2) * (a_frequency**2))
             #print(u)
 
-            string_mass = u * a_string_length
-
-            output = np.zeros(sound_wave_data["num_samples"])
-
-            for n in range(sound_wave_data["num_samples"]):
-                damping = piano_data["damping"] + 0.002 * piano_data["pedal"]
-                #contact_force = self.__hammerNonliearly(hammer_velocity, string_velocity)
-                contact_force = self.__hartzTypeHammerModel(hammer_position, string_position,
-                                                            hammer_velocity, string_velocity,
-                                                            k=1e5, p=3.0)
-                #print(resonated)
-                #time.sleep(0.5)
-
-                hammer_acceleration = -contact_force / piano_data["hammer_mass"]
-                string_acceleration = contact_force / string_mass
-                hammer_velocity += hammer_acceleration * dt
-                string_velocity += string_acceleration * dt
-                hammer_position += hammer_velocity * dt
-                string_position += string_velocity * dt
-
-                new_val = 0.5 * (delay_line[0] + delay_line[-1]) * damping + string_position
-                delay_line = np.roll(delay_line, -1)
-                delay_line[-1] = new_val
-
-                resonated = sum(f.process(new_val) for f in resonators)
-                output[n] = resonated
-            
-            output /= max(abs(output))
-            print(output)
-            self.soundsInstrumentPlay.append(output)
+            # 弦の特性インピーダンス Z = √(T*u) = T / 2Lf
+            string_impedance = np.sqrt(piano_data["string_tension"] * u)
+
+            excitation = self.__hammerContact(initial_hammer_velocity,
+                                              piano_data["hammer_position"],
+                                              piano_data["hammer_mass"],
+                                              string_impedance,
+                                              sound_wave_data["dt"],
+                                              sound_wave_data["num_samples"])
+
+            strings[i], cutoffs[i] = string_response(excitation, delay_line, damping,
+                                                     int(piano_data["string_position"] * delay_length),
+                                                     sound_wave_data["num_samples"],
+                                                     self.silenceThreshold)
+
+        self.noteCutoffs = cutoffs
+
+        # 全ての音の弦の応答に、サウンドボードの共鳴フィルタ群をまとめて掛ける
+        # 無音で打ち切った後の値は0であるため、フィルタは最も遅く打ち切った位置までに掛け、残りは0のままとする
+        # (0を入れ続けると、フィルタの状態が非正規化数まで小さくなり、かえって遅くなる)
+        sounding_end = cutoffs.max()
+        outputs = np.zeros_like(strings)
+        outputs[:, :sounding_end] = resonator_bank.process(strings[:, :sounding_end])
+
+        assert np.all(np.isfinite(outputs)), "Pianoの出力に有限でない値が含まれています"
+
+        for output in outputs:
+            peak = max(abs(output))
+            if peak > 0.0:
+                output /= peak
+
+        return outputs
+
+    def __hammerContact(self, hammer_velocity, hammer_position,
+                        hammer_mass, string_impedance, dt, max_samples):
+        """
+        ハンマーが弦に触れている間だけ、1サンプルずつハンマーと弦の相互作用を求め、
+        打弦点で弦に与えられる速度(励振)の群れを応答します。
+        打弦点の弦は、両側に伸びる弦の特性インピーダンス 2Z を負荷として
+        v = F / 2Z で動くものとする。
+        ハンマーが弦から離れる(または跳ね返る)と、接触フェーズを終える
+        Arguments:
+            hammer_velocity : ハンマーの初速
+            hammer_position : ハンマーの初期位置(弦の静止位置を0とする)
+            hammer_mass : ハンマーの質量
+            string_impedance : 弦の特性インピーダンス
+            dt : サンプリング周期
+            max_samples : 接触フェーズの最大サンプル数
+        """
+
+        string_position = 0.0
+        string_velocity = 0.0
+        excitation = []
+        in_contact = False
+
+        for n in range(max_samples):
+            contact_force = self.__hartzTypeHammerModel(hammer_position, string_position,
+                                                        hammer_velocity, string_velocity,
+                                                        k=1e5, p=3.0)
+            if contact_force > 0.0:
+                in_contact = True
+            elif in_contact:
+                break
+
+            hammer_velocity += -contact_force / hammer_mass * dt
+            string_velocity = contact_force / (2 * string_impedance)
+            hammer_position += hammer_velocity * dt
+            string_position += string_velocity * dt
+
+            excitation.append(string_velocity)
+
+        return np.array(excitation)
+
+    def __stringResponse(self, excitation, delay_line, damping, strike_delay, num_samples,
+                         silence_threshold):
+        """
+        励振に対する弦の応答を線形フィルタとして一度に求め、(応答, 計算を打ち切った位置)を応答します
+        遅延線アルゴリズム new_val = 0.5 * (d[0] + d[-1]) * damping + e[n] は、
+        y[n] = c*y[n-1] + c*y[n-L] + (初期値の寄与) + e[n]  (c = damping / 2)
+        という IIR フィルタと等価である。
+        励振には打弦位置によるコムフィルタ e[n] - e[n - strike_delay] を掛ける
+        無音の閾値があれば、励振が終わった後はlfilterを(状態を持ち越しながら)区切って掛け、
+        直近の遅延線長分の応答が閾値を下回った(SilenceDetector)時点で打ち切り、残りを0で埋める
+        Arguments:
+            excitation : 接触フェーズで得た励振
+            delay_line : 遅延線の初期値
+            damping : 減衰係数
+            strike_delay : 打弦位置に相当する遅延サンプル数
+            num_samples : サンプル数
+            silence_threshold : 無音の閾値(最大振幅に対するdB)、Noneなら最後まで求める
+        """
+
+        L = len(delay_line)
+        c = 0.5 * damping
+
+        drive, drive_end = self.__stringDrive(excitation, delay_line, c, strike_delay, num_samples)
+
+        a = np.zeros(L + 1)
+        a[0] = 1.0
+        a[1] -= c
+        a[L] -= c
+
+        if silence_threshold is None:
+            return lfilter([1.0], a, drive), num_samples
+
+        output = np.zeros(num_samples)
+        output[:drive_end], state = lfilter([1.0], a, drive[:drive_end], zi=np.zeros(L))
+
+        detector = SilenceDetector([L], silence_threshold, num_samples, [np.max(np.abs(delay_line))])
+        row = np.zeros(1, dtype=np.intp)
+        silent = detector.update(row, output[np.newaxis, :drive_end], drive_end)[0]
+
+        start = drive_end
+        block_size = max(L, 4096)
+        while start < num_samples and not silent:
+            stop = min(start + block_size, num_samples)
+            output[start:stop], state = lfilter([1.0], a, drive[start:stop], zi=state)
+            silent = detector.update(row, output[np.newaxis, start:stop], stop)[0]
+            start = stop
+
+        return output, detector.cutoffs[0]
     
+    def __stringResponseByStep(self, excitation, delay_line, damping, strike_delay, num_samples,
+                               silence_threshold):
+        """
+        __stringResponseと同じ弦の応答を、
+        y[n] = c*y[n-1] + c*y[n-L] + drive[n] に従って1サンプルずつ求め、
+        (応答, 計算を打ち切った位置)を応答します(検証用の参照実装)
+        無音の判定は励振が終わった後に1サンプルごとに行う
+        Arguments:
+            excitation : 接触フェーズで得た励振
+            delay_line : 遅延線の初期値
+            damping : 減衰係数
+            strike_delay : 打弦位置に相当する遅延サンプル数
+            num_samples : サンプル数
+            silence_threshold : 無音の閾値(最大振幅に対するdB)、Noneなら最後まで求める
+        """
+
+        L = len(delay_line)
+        c = 0.5 * damping
+
+        drive = [0.0] * num_samples
+        for n in range(min(len(excitation), num_samples)):
+            drive[n] = excitation[n]
+        if 0 < strike_delay < num_samples:
+            drive = drive[:strike_delay] + [drive[n] - drive[n - strike_delay]
+                                            for n in range(strike_delay, num_samples)]
+        for n in range(min(L, num_samples)):
+            drive[n] += c * delay_line[n]
+        drive[0] += c * delay_line[-1]
+
+        _, drive_end = self.__stringDrive(excitation, delay_line, c, strike_delay, num_samples)
+        if silence_threshold is not None:
+            ratio = 10.0 ** (silence_threshold / 20.0)
+        peak = float(np.max(np.abs(delay_line)))
+        quiet_run = 0
+        cutoff = num_samples
+
+        output = [0.0] * num_samples
+        for n in range(num_samples):
+            y = drive[n]
+            if n >= 1:
+                y += c * output[n - 1]
+            if n >= L:
+                y += c * output[n - L]
+            output[n] = y
+
+            if silence_threshold is not None:
+                peak = max(peak, abs(y))
+                quiet_run = quiet_run + 1 if abs(y) <= peak * ratio else 0
+                if quiet_run >= L and n + 1 >= drive_end:
+                    cutoff = n + 1
+                    break
+
+        return np.array(output), cutoff
+
+    def __stringDrive(self, excitation, delay_line, c, strike_delay, num_samples):
+        """
+        弦の応答のフィルタに入れる信号(励振と初期値の寄与)と、
+        それが0でなくなる最後の位置の次(これより後は0)を応答します
+        Arguments:
+            excitation : 接触フェーズで得た励振
+            delay_line : 遅延線の初期値
+            c : 減衰係数の半分
+            strike_delay : 打弦位置に相当する遅延サンプル数
+            num_samples : サンプル数
+        """
+
+        L = len(delay_line)
+
+        drive = np.zeros(num_samples)
+        contact_length = min(len(excitation), num_samples)
+        drive[:contact_length] = excitation[:contact_length]
+        drive_end = contact_length
+        if 0 < strike_delay < num_samples:
+            drive[strike_delay:] -= drive[:-strike_delay].copy()
+            drive_end = min(contact_length + strike_delay, num_samples)
+
+        head = min(L, num_samples)
+        drive[:head] += c * delay_line[:head]
+        drive[0] += c * delay_line[-1]
+
+        return drive, max(drive_end, head)
+
     def __hammerNonliearly(self, hammer_velocity, string_velocity):
         """
         ハンマーと弦の相互作用から、実際にハンマーが接触した際の
@@ -8,14 +8,13 @@ ReggaeOrgan : レゲエオルガン
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
 
 from .Instrument import Instrument
 
 from Returner.Returner import (redChar, redFrequencies,
-                               soundWaveData, reggaeADSREnvelopTimeData,
-                               zeroInt, oneInt, twoInt,
-                               returnFalse, returnReggaeHarmonics,
+                               reggaeADSREnvelopTimeData, nonePointer,
+                               returnReggaeHarmonics,
                                returnReggaeAmplitude, returnTimeData)
 
 import numpy as np
@@ -30,10 +29,19 @@ class ReggaeOrgan(Instrument):
     Target:
         0: Instrumentクラスを正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
     """
 
+    # 1周期分の波形テーブルのキャッシュ
+    __wavetable_cache = {}
+
+    # 一度に求めるサンプルの区間の長さ(作業用の配列は 音の数 × この長さ に収まる)
+    __blockLength = 4096
+
+    # テーブルを引く場合の区間の長さ(作業用の配列を三つ使うため、合わせて__blockLength一つ分より小さくする)
+    __wavetableBlockLength = 1024
+
     def __init__(self):
         """
         このクラスのコンストラクタ
@@ -41,38 +49,177 @@ class ReggaeOrgan(Instrument):
 
         super().__init__()
         self.color = redChar()
+        self.frequencies = redFrequencies()
+        self.wavetableSize = nonePointer()
+
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        numpy : 全ての音の正弦波を、倍音ごと、サンプルの区間ごとにまとめて求める(既定)
+        reference : 音ごと、倍音ごとに正弦波を求めて足し合わせる
+                    (波形テーブルの設定によらず、正弦波をそのまま求める)
+        """
+
+        return ("numpy", "reference")
+
+    def setWavetable(self, table_size):
+        """
+        倍音の和を1周期分の波形テーブルから引くかどうかを設定します
+        テーブルを使っても使わなくても、作業用の配列はサンプルの区間ごとに確保するため、
+        音の長さや数が増えてもメモリは出力(音の数 × サンプル数)に収まる
+        Arguments:
+            table_size : テーブルの大きさ(Noneならテーブルを使わず、正弦波をそのまま求める)
+        """
+
+        self.wavetableSize = table_size
     
-    def makeSound(self):
+    def renderNotes(self, frequencies, sound_wave_data):
         """
-        奏でる音を作成します
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
         Target:
             1. 時間軸配列tを生成
-            2. 全ての周波数に対して、以下を実行 -> a_frequency
-                出力波形を0で初期化
-                各倍音について、
-                    a. 求める周波数 = a_frequency * harmonics[i]
-                    b. 正弦波 = sin(2π * 周波数 * t)
-                    c. 振幅 = amplitudes[i]
-                    d. 出力波形に足し合わせる
-                エンベロープを適用する
-                波形を正規化する
-                正規化した波形を束縛する
-        """
-
-        sound_wave_data = soundWaveData()
-        red_frequencies = redFrequencies()
+            2. 周波数群と倍音群の外積から、全ての部分音の周波数(音の数 × 倍音の数)を求める
+            3. 全ての音の出力波形(音の数 × サンプル数)を一度に求める
+                テーブルを使わない場合:
+                    振幅 × sin(2π * 部分音の周波数 * t) を倍音について足し合わせる
+                テーブルを使う場合:
+                    1周期分の倍音の和のテーブルを、位相 f*t (mod 1) で引く
+            4. エンベロープを適用する
+            5. 波形を(絶対値の最大値で)正規化する
+            6. 正規化した波形を応答する
+        """
+
         harmonics = returnReggaeHarmonics()
         amplitudes = returnReggaeAmplitude()
-        num_samples = int(sound_wave_data["duration"]*sound_wave_data["sampling_rate"])
-        t = returnTimeData()
-        adsr_envelop = reggaeADSREnvelopTimeData()
-        for a_frequency in red_frequencies:
-            output = np.zeros(num_samples)
+        t = returnTimeData(sound_wave_data["duration"])
+        adsr_envelop = reggaeADSREnvelopTimeData(sound_wave_data["duration"])
+
+        if self.getBackend() == "reference":
+            outputs = self.__additive_by_note(frequencies, harmonics, amplitudes, t)
+        elif self.wavetableSize is None:
+            outputs = self.__additive_bank(frequencies, harmonics, amplitudes, t)
+        else:
+            outputs = self.__wavetable_bank(frequencies, harmonics, amplitudes, t,
+                                            self.wavetableSize)
+
+        outputs *= adsr_envelop
+        # 絶対値の配列(音の数 × サンプル数)を作らずに、音ごとの絶対値の最大値を求める
+        peaks = np.maximum(np.max(outputs, axis=-1), -np.min(outputs, axis=-1))
+        # 無音の音(最大値が0)は、0で割らずにそのままとする
+        peaks[peaks == 0.0] = 1.0
+        outputs /= peaks[:, np.newaxis]
+
+        return outputs
+
+    def __additive_bank(self, frequencies, harmonics, amplitudes, t):
+        """
+        全ての音の正弦波を倍音ごとに求め、確保済みの出力(音の数 × サンプル数)に足し合わせて応答します
+        正弦波はサンプルの区間(__blockLength)ごとに作業用の配列へ求めるため、
+        (音の数 × 倍音の数 × サンプル数)の配列を作ることはない
+        Arguments:
+            frequencies : 周波数群
+            harmonics : 倍音群
+            amplitudes : 倍音ごとの振幅
+            t : 時間軸データ
+        """
+
+        angular_frequencies = 2 * np.pi * np.outer(frequencies, harmonics)
+        outputs = np.zeros((len(angular_frequencies), len(t)))
+        scratch = np.empty((len(angular_frequencies), min(ReggaeOrgan.__blockLength, len(t))))
+
+        for start in range(0, len(t), ReggaeOrgan.__blockLength):
+            stop = min(start + ReggaeOrgan.__blockLength, len(t))
+            sin_wave = scratch[:, :stop - start]
+            for h, an_amplitude in enumerate(amplitudes):
+                np.multiply.outer(angular_frequencies[:, h], t[start:stop], out=sin_wave)
+                np.sin(sin_wave, out=sin_wave)
+                sin_wave *= an_amplitude
+                outputs[:, start:stop] += sin_wave
+
+        return outputs
+
+    def __additive_by_note(self, frequencies, harmonics, amplitudes, t):
+        """
+        __additive_bankと同じ波形を、音ごと、倍音ごとに求めて足し合わせ、応答します(検証用の参照実装)
+        Arguments:
+            frequencies : 周波数群
+            harmonics : 倍音群
+            amplitudes : 倍音ごとの振幅
+            t : 時間軸データ
+        """
+
+        outputs = np.zeros((len(frequencies), len(t)))
+        for i, a_frequency in enumerate(frequencies):
+            for a_harmonic, an_amplitude in zip(harmonics, amplitudes):
+                outputs[i] += an_amplitude * np.sin(2 * np.pi * a_frequency * a_harmonic * t)
+        return outputs
+
+    def __wavetable_bank(self, frequencies, harmonics, amplitudes, t, table_size):
+        """
+        1周期分の倍音の和のテーブルを位相で引き(線形補間)、
+        音ごとの波形(音の数 × サンプル数)を応答します
+        位相と添字は、サンプルの区間(__wavetableBlockLength)ごとに作業用の配列へ求め、出力に直接書き込む
+        Arguments:
+            frequencies : 周波数群
+            harmonics : 倍音群(整数であること)
+            amplitudes : 倍音ごとの振幅
+            t : 時間軸データ
+            table_size : テーブルの大きさ
+        """
+
+        table = self.__wavetable(harmonics, amplitudes, table_size)
+
+        frequencies = np.asarray(frequencies, dtype=float)
+        outputs = np.empty((len(frequencies), len(t)))
+        block_length = min(ReggaeOrgan.__wavetableBlockLength, len(t))
+        phase_scratch = np.empty((len(frequencies), block_length))
+        index_scratch = np.empty((len(frequencies), block_length), dtype=np.intp)
+        upper_scratch = np.empty((len(frequencies), block_length))
+
+        for start in range(0, len(t), ReggaeOrgan.__wavetableBlockLength):
+            stop = min(start + ReggaeOrgan.__wavetableBlockLength, len(t))
+            phases = phase_scratch[:, :stop - start]
+            indexes = index_scratch[:, :stop - start]
+            upper = upper_scratch[:, :stop - start]
+            lower = outputs[:, start:stop]
+
+            np.multiply.outer(frequencies, t[start:stop], out=phases)
+            phases %= 1.0
+            phases *= table_size
+            np.copyto(indexes, phases, casting="unsafe")
+            np.minimum(indexes, table_size - 1, out=indexes)
+            phases -= indexes
+
+            np.take(table, indexes, out=lower)
+            indexes += 1
+            np.take(table, indexes, out=upper)
+            upper -= lower
+            upper *= phases
+            lower += upper
+
+        return outputs
+
+    def __wavetable(self, harmonics, amplitudes, table_size):
+        """
+        1周期分の倍音の和 Σ振幅 × sin(2π * 倍音 * θ) のテーブルを作成し、応答します
+        補間のために、末尾に先頭の値を一つ加えておく
+        一度作成したテーブルはクラスに保存し、以降はそれを使い回す
+        Arguments:
+            harmonics : 倍音群(整数であること)
+            amplitudes : 倍音ごとの振幅
+            table_size : テーブルの大きさ
+        """
+
+        key = (tuple(harmonics), tuple(amplitudes), table_size)
+        cache = ReggaeOrgan.__wavetable_cache
+        if key not in cache:
+            assert all(float(h).is_integer() for h in harmonics), "倍音は整数である必要があります"
+            theta = np.arange(table_size + 1) / table_size
+            table = np.zeros(table_size + 1)
             for a_harmonic, an_amplitude in zip(harmonics, amplitudes):
-                f = a_frequency * a_harmonic
-                sin_wave = np.sin(2 * np.pi * f * t)
-                wave = sin_wave * an_amplitude
-                output += wave
-            output *= adsr_envelop
-            output /= np.max(output)
-            self.soundsInstrumentPlay.append(output)
+                table += an_amplitude * np.sin(2 * np.pi * a_harmonic * theta)
+            cache[key] = table
+        return cache[key]
@@ -8,16 +8,134 @@ Trumpet : トランペット
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
 
 from .Instrument import Instrument
 
 from Returner.Returner import (redChar, redFrequencies,
-                               zeroInt, oneInt, twoInt,
-                               soundWaveData, trumpetData)
+                               trumpetData)
 
 import numpy as np
 
+import math
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def lipReedKernel(output, delay, k, dt, blowing_pressure,
+                  a0, a1, a2, damping, rho,
+                  impedance, injected_scale, r_mouth):
+    """
+    唇(リード)の運動方程式と管の遅延線を1サンプルずつ進め、
+    マウスピースの圧力をoutputに書き込みます
+    numbaがあればこの関数をそのままJITコンパイルして用いるため、
+    numbaが扱える書き方(スカラーとnumpy配列のみ)で書いている
+    右向き波、左向き波はロールの代わりに先頭の位置を動かすリングバッファとして扱う
+    Arguments:
+        output : 出力波形(サンプル数分の配列)
+        delay : 遅延線の長さ
+        k : 唇のばね定数 (2πf)^2
+        dt : サンプリング周期
+        blowing_pressure : 吹く圧力
+        a0, a1, a2 : 唇の開口面積の係数
+        damping : 唇の減衰
+        rho : 空気の密度
+        impedance : 流量を圧力に変換するインピーダンス
+        injected_scale : 注入する圧力の倍率
+        r_mouth : マウスピースでの反射係数
+    """
+
+    right = np.zeros(delay)
+    left = np.zeros(delay)
+    right_head = 0
+    left_head = 0
+    x = 0.0
+    v = 0.0
+
+    for n in range(output.shape[0]):
+        Pc = right[right_head] + left[left_head]
+        dp = blowing_pressure - Pc
+        A = max(0.0, a0 + a1 * x + a2 * x * x)
+        accel = (dp * A - damping * v - k * x)
+        v += accel * dt
+        x += v * dt
+        if dp > 0.0:
+            sign = 1.0
+        elif dp < 0.0:
+            sign = -1.0
+        else:
+            sign = 0.0
+        U = A * sign * math.sqrt(2.0 * abs(dp) / rho)
+        inject_p = U * impedance
+        inject_p *= injected_scale
+
+        right_head = (right_head - 1) % delay
+        left_head = (left_head + 1) % delay
+
+        right[right_head] = r_mouth * left[left_head] + inject_p
+        left[(left_head - 1) % delay] = right[(right_head - 1) % delay]
+        output[n] = Pc
+
+def lipReedLockstep(outputs, delays, ks, dt, blowing_pressure,
+                    a0, a1, a2, damping, rho,
+                    impedance, injected_scale, r_mouth):
+    """
+    lipReedKernelと同じ計算を、全ての音について1サンプルずつ同時に(numpy配列として)進め、
+    マウスピースの圧力をoutputs(音の数 × サンプル数)に書き込みます
+    遅延線は(最も長い遅延線に合わせて詰めた)2次元バッファの行として持ち、
+    行ごとの先頭の位置を、遅延線の端を越えた行だけ折り返しながら動かす
+    Arguments:
+        outputs : 出力波形(音の数 × サンプル数の配列)
+        delays : 音ごとの遅延線の長さ
+        ks : 音ごとの唇のばね定数 (2πf)^2
+        その他 : lipReedKernelと同じ
+    """
+
+    num_notes = outputs.shape[0]
+    rows = np.arange(num_notes)
+    delays = np.asarray(delays, dtype=np.intp)
+    ks = np.asarray(ks, dtype=float)
+
+    right = np.zeros((num_notes, delays.max()))
+    left = np.zeros((num_notes, delays.max()))
+    right_heads = np.zeros(num_notes, dtype=np.intp)
+    left_heads = np.zeros(num_notes, dtype=np.intp)
+    x = np.zeros(num_notes)
+    v = np.zeros(num_notes)
+
+    for n in range(outputs.shape[1]):
+        Pc = right[rows, right_heads] + left[rows, left_heads]
+        dp = blowing_pressure - Pc
+        A = np.maximum(0.0, a0 + a1 * x + a2 * x * x)
+        accel = (dp * A - damping * v - ks * x)
+        v += accel * dt
+        x += v * dt
+        U = A * np.sign(dp) * np.sqrt(2.0 * np.abs(dp) / rho)
+        inject_p = U * impedance
+        inject_p *= injected_scale
+
+        right_heads -= 1
+        right_heads[right_heads < 0] = delays[right_heads < 0] - 1
+        left_heads += 1
+        left_heads[left_heads == delays] = 0
+
+        right_previous = right_heads - 1
+        right_previous[right_previous < 0] = delays[right_previous < 0] - 1
+        left_previous = left_heads - 1
+        left_previous[left_previous < 0] = delays[left_previous < 0] - 1
+
+        right[rows, right_heads] = r_mouth * left[rows, left_heads] + inject_p
+        left[rows, left_previous] = right[rows, right_previous]
+        outputs[:, n] = Pc
+
+if njit is not None:
+    compiledLipReedKernel = njit(cache=True)(lipReedKernel)
+else:
+    compiledLipReedKernel = None
+
+
 class Trumpet(Instrument):
     """
     トランペット
@@ -28,7 +146,7 @@ class Trumpet(Instrument):
     Target:
         0: Instrumentクラスを正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
     """
 
@@ -39,57 +157,76 @@ class Trumpet(Instrument):
 
         super().__init__()
         self.color = redChar()
+        self.frequencies = redFrequencies()
+
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        numbaが使える場合は、コンパイル済みの計算(jit)を既定とする
+        reference : 音ごとに、1サンプルずつの計算を純粋なPythonで行う(lipReedKernel)
+        numpy : 全ての音を1サンプルずつ同時に(numpy配列として)進める(lipReedLockstep)
+                (一サンプルごとのnumpyの呼び出しは重いため、音の数が多いほど有利になる)
+        jit : lipReedKernelをnumbaでコンパイルして行う
+        """
 
-    def makeSound(self):
+        if compiledLipReedKernel is None:
+            return ("reference", "numpy")
+        return ("jit", "reference", "numpy")
+
+    def renderNotes(self, frequencies, sound_wave_data):
         """
-        演奏する音を作成する
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
         Target:
             1: 必要なデータを全て用意する
-               (soundWaveData, trumpetData)
-            2: 全ての周波数に対して以下を実行する
+               (trumpetData)
+            2: 全ての周波数に対して、遅延線長と唇のばね定数を求める
+            3: 全ての周波数に対して、唇の運動と管の遅延線を1サンプルずつ進める
+               (getBackendが"jit"ならコンパイル済みの関数で行い、
+               "numpy"なら全ての周波数をnumpy配列として同時に進める)
+            4: 正規化を行い、応答する
         """
 
-        sound_wave_data = soundWaveData()
         trumpet_data = trumpetData()
-        red_frequencies = redFrequencies()
+
+        backend = self.getBackend()
+        kernel = compiledLipReedKernel if backend == "jit" else lipReedKernel
+
+        tube_area = trumpet_data["mouse_open_area_scale"]
+        Zc = trumpet_data["rho"] * sound_wave_data["sound_speed"] / tube_area
+        if trumpet_data["use_impedance_conversion"] == True:
+            impedance = Zc
+        else:
+            impedance = trumpet_data["Z_scale"]
 
         effective_length = max(0.1, 
                                trumpet_data["tube_length"] + trumpet_data["mp_effective_length"])
-        for a_frequency in red_frequencies:
-            delay = max(2, int(effective_length / sound_wave_data["sound_speed"] * a_frequency))
-
-            right = np.zeros(delay)
-            left = np.zeros(delay)
-            output = np.zeros(sound_wave_data["num_samples"])
-            x = 0.0
-            v = 0.0
-            k = (2 * np.pi * a_frequency)**2
-
-            tube_area = trumpet_data["mouse_open_area_scale"]
-            Zc = trumpet_data["rho"] * sound_wave_data["sound_speed"] / tube_area
-
-            for n in range(sound_wave_data["num_samples"]):
-                Pc = right[0] + left[0]
-                dp = trumpet_data["blowing_pressure"] - Pc
-                A = max(0.0, trumpet_data["a0"] + trumpet_data["a1"] * x + trumpet_data["a2"] * x * x)
-                accel = (dp * A - trumpet_data["damping"] * v - k * x)
-                v += accel * sound_wave_data["dt"]
-                x+= v * sound_wave_data["dt"]
-                U = A * np.sign(dp) * np.sqrt(2.0 * abs(dp) / trumpet_data["rho"])
-                if trumpet_data["use_impedance_conversion"] == True:
-                    inject_p = U * Zc
-                else:
-                    inject_p = trumpet_data["Z_scale"] * U
-                inject_p *= trumpet_data["injected_scale"]
-
-                right = np.roll(right, 1)
-                left = np.roll(left, -1)
-
-                right[0] = trumpet_data["r_mouth"] * left[0] + inject_p
-                left[-1] = right[-1]
-                output[n] = Pc
-            
+        delays = [max(2, int(effective_length / sound_wave_data["sound_speed"] * a_frequency))
+                  for a_frequency in frequencies]
+        ks = [(2 * np.pi * a_frequency)**2 for a_frequency in frequencies]
+        outputs = np.zeros((len(frequencies), sound_wave_data["num_samples"]))
+
+        if backend == "numpy":
+            lipReedLockstep(outputs, delays, ks, sound_wave_data["dt"],
+                            trumpet_data["blowing_pressure"],
+                            trumpet_data["a0"], trumpet_data["a1"], trumpet_data["a2"],
+                            trumpet_data["damping"], trumpet_data["rho"],
+                            impedance, trumpet_data["injected_scale"],
+                            trumpet_data["r_mouth"])
+        else:
+            for output, delay, k in zip(outputs, delays, ks):
+                kernel(output, delay, k, sound_wave_data["dt"],
+                       trumpet_data["blowing_pressure"],
+                       trumpet_data["a0"], trumpet_data["a1"], trumpet_data["a2"],
+                       trumpet_data["damping"], trumpet_data["rho"],
+                       impedance, trumpet_data["injected_scale"],
+                       trumpet_data["r_mouth"])
+
+        for output in outputs:
             maxv = np.max(np.abs(output)) + 1e-12
-            output = output / maxv * 0.95
-            self.soundsInstrumentPlay.append(output)
-        
\ No newline at end of file
+            output /= maxv
+            output *= 0.95
+
+        return outputs
@@ -8,19 +8,18 @@ Ukulele : ウクレレ
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/26"
+__date__ = "2025/10/26 (Updated: 2025/11/21)"
 
 from .Instrument import Instrument
 
 from Returner.Returner import (yellowChar, yellowFrequencies,
-                               soundWaveData, ukuleleData,
+                               ukuleleData,
                                ukuleleADSREnvelopTimeData)
 
 import numpy as np
 
-from scipy.signal import lfilter
-
-from collections import deque
+from DSP.KarplusStrongBank import KarplusStrongBank
+from DSP.BiquadBank import BiquadBank, resonatorSOS
 
 class Ukulele(Instrument):
     """
@@ -32,7 +31,7 @@ class Ukulele(Instrument):
     Target:
         0: Instrumentクラスを正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
     """
 
@@ -43,43 +42,66 @@ class Ukulele(Instrument):
 
         super().__init__()
         self.color = yellowChar()
-    
-    def makeSound(self):
+        self.frequencies = yellowFrequencies()
+
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        numpy : 全ての弦をブロック単位でまとめて進める(既定)
+        reference : 全ての弦を1サンプルずつ進める
+        """
+
+        return ("numpy", "reference")
+
+    def renderNotes(self, frequencies, sound_wave_data):
         """
-        奏でる音を作成する
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
         """
 
-        sound_wave_data = soundWaveData()
-        yellow_frequencies = yellowFrequencies()
         ukulele_data = ukuleleData()
-        ukulele_envelop = ukuleleADSREnvelopTimeData()
+        ukulele_envelop = ukuleleADSREnvelopTimeData(sound_wave_data["duration"])
+
+        initial_waves = []
 
-        for a_frequency in yellow_frequencies:
+        for a_frequency in frequencies:
             delay_length = sound_wave_data["sampling_rate"] / a_frequency
-            delay_line = self.__create_initial_wave(ukulele_data["pluck_force"],
-                                                    ukulele_data["pluck_position"],
-                                                    delay_length)
-            
-            output = np.zeros(sound_wave_data["num_samples"])
-
-            for n in range(sound_wave_data["num_samples"]):
-                y = ukulele_data["damping"] * ((delay_line[0] + delay_line[1]) / 2)
-                delay_line.append(y)
-                delay_line.popleft()
-                output[n] = y
-
-            for a_body in ukulele_data["body_resonance"]:
-                output = self.__resonant_filter(output, a_body)
-                
+            initial_waves.append(self.__create_initial_wave(ukulele_data["pluck_force"],
+                                                            ukulele_data["pluck_position"],
+                                                            delay_length))
+
+        # 全ての弦をまとめて鳴らす(無音の閾値があれば、聞こえなくなった弦から計算を打ち切る)
+        string_bank = KarplusStrongBank(initial_waves, ukulele_data["damping"])
+        if self.getBackend() == "numpy":
+            strings = string_bank.process(sound_wave_data["num_samples"], self.silenceThreshold)
+        else:
+            strings = string_bank.processByStep(sound_wave_data["num_samples"], self.silenceThreshold)
+        self.noteCutoffs = string_bank.cutoffs
+
+        # 胴の共鳴は全ての音で共通のため、全ての音をまとめて一度だけフィルタを掛ける
+        body_filter = BiquadBank(resonatorSOS(ukulele_data["body_resonance"], 5,
+                                              sound_wave_data["sampling_rate"]))
+        # 無音で打ち切った後の値は0であるため、フィルタは最も遅く打ち切った位置までに掛け、残りは0のままとする
+        # (0を入れ続けると、フィルタの状態が非正規化数まで小さくなり、かえって遅くなる)
+        sounding_end = string_bank.cutoffs.max()
+        outputs = np.zeros_like(strings)
+        outputs[:, :sounding_end] = body_filter.process(strings[:, :sounding_end])
+
+        for output in outputs:
             output *= ukulele_envelop
 
-            output /= max(abs(output))
+            peak = max(abs(output))
+            if peak > 0.0:
+                output /= peak
+
+        return outputs
+
 
-            self.soundsInstrumentPlay.append(output)
-            
     def __create_initial_wave(self, pluck_force, pluck_position, delay_length):
         """
-        初期波形を求めて、応答します
+        初期波形(弾いた位置を頂点とする三角波)を求めて、応答します
         Arguments:
             pluck_force : 弦を弾く強さ
             pluck_position : 弦を弾く位置
@@ -88,33 +110,7 @@ class Ukulele(Instrument):
 
         L = int(delay_length)
         Np = int(L * pluck_position)
-        wave = np.zeros(L)
-        for i in range(L):
-            if i < Np:
-                wave[i] = (pluck_force / Np) * i
-            else:
-                wave[i] = pluck_force * (1 - (i - Np) / (L - Np))
-        return deque(wave)
-    
-    def __resonant_filter(self, output, frequency, Q=5, sample_rate=44100):
-        """
-        出力波形にIIRフィルターを掛けます。
-        Arguments:
-            output : 出力波形
-            frequency : 周波数
-            Q : ?
-        """
-
-        omega = 2 * np.pi * frequency / sample_rate
-        alpha = np.sin(omega) / (2 * Q)
-
-        b0 = alpha
-        b1 = 0
-        b2 = -alpha
-        a0 = 1 + alpha
-        a1 = -2 * np.cos(omega)
-        a2 = 1 - alpha
-
-        b = np.array([b0, b1, b2]) / a0
-        a = np.array([1, a1 / a0, a2 / a0])
-        return lfilter(b, a, output)
\ No newline at end of file
+        i = np.arange(L)
+        rising = (pluck_force / max(Np, 1)) * i
+        falling = pluck_force * (1 - (i - Np) / (L - Np))
+        return np.where(i < Np, rising, falling)
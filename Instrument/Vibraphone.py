@@ -8,16 +8,19 @@ Vibraphone : ヴィブラフォン
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/27"
+__date__ = "2025/10/27 (Updated: 2025/11/21)"
 
 from .Instrument import Instrument
 
 from Returner.Returner import (blueChar, blueFrequencies,
-                               soundWaveData, vibraphoneData,
+                               vibraphoneData,
                                returnTimeData)
 
 import numpy as np
 
+from DSP.DelayLine import DelayLine
+from DSP.SilenceDetector import SilenceDetector
+
 class Vibraphone(Instrument):
     """
     ヴィブラフォン
@@ -28,7 +31,7 @@ class Vibraphone(Instrument):
     Target:
         0: Instrumentクラスを正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
     """
 
@@ -39,76 +42,187 @@ class Vibraphone(Instrument):
 
         super().__init__()
         self.color = blueChar()
+        self.frequencies = blueFrequencies()
+
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        numpy : 全てのモードの遅延線をブロック単位でまとめて進める(既定)
+        reference : モードごとに、遅延線を1サンプルずつ進める
+        """
+
+        return ("numpy", "reference")
     
-    def makeSound(self):
+    def renderNotes(self, frequencies, sound_wave_data):
         """
-        奏でる音を作成する
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
         Target:
-            1: サウンドデータ、周波数群、Vibraphoneデータを得る
-            2: 時間軸データtを束縛する
-            3: 共鳴モードの周波数比を束縛する
-            4: 全ての周波数に対して、以下を繰り返す
-                a. 各モードの周波数と周波数に対する重み付けを得る
-                b. 各モードごとに遅延線を初期化(uniform(-1, 1) * mallet_force)
-                c. 出力バッファを確保
-                d. サンプル数に対して、以下を実行
-                    d-1. ファン回転によるビブラートを周波数に掛ける
-                    d-2. 各モードの遅延線を1ステップ進め、加算
-                    d-3. 出力波形に記録をする
-                e. 出力を正規化し、当該プロパティに加える
+            1: Vibraphoneデータを得る
+            2: 時間軸データtを束縛し、ファン回転によるビブラートを一度だけ求める
+            3: 共鳴モードの周波数比と、その重み・減衰係数を束縛する
+            4: 全ての周波数、全てのモードに対して、
+               遅延線を初期化(uniform(-1, 1) * mallet_force)する
+            5: 全ての遅延線(音の数 × モードの数)を一つの2次元バッファとしてまとめて進める
+               (無音の閾値があれば、聞こえなくなった遅延線から計算を打ち切る)
+            6: 各モードの重みを行列積として掛け、音ごとの出力波形を得る
+            7: 出力を正規化し、応答する
         """
 
-        sound_wave_data = soundWaveData()
-        blue_frequencies = blueFrequencies()
         vibraphone_data = vibraphoneData()
-        time_data = returnTimeData()
+        time_data = returnTimeData(sound_wave_data["duration"])
 
         vibrato_depth = vibraphone_data["vibrato_depth"]
         vibrato_rate = vibraphone_data["vibrato_rate"]
 
         reso_mode_freq_ratios = vibraphone_data["f_n"]
 
-        for frequency in blue_frequencies:
-            #effective_freq = frequency * reso_mode_freq_ratios[i]
-            #mode_weight = self.__mode_weight(reso_mode_freq_ratios[i],
-            #                                 vibraphone_data["strike_position"],
-            #                                 vibraphone_data["mallet_size"])
-            #delay_length = sound_wave_data["sampling_rate"] / effective_freq
-            #delay_line = np.random.uniform(-1, 1, delay_length)
+        vibrato = 1.0 + vibrato_depth * np.sin(2 * np.pi * vibrato_rate * time_data)
 
-            output = np.zeros(sound_wave_data["num_samples"])
+        weights = np.array([self.__mode_weight(ratio,
+                                               vibraphone_data["strike_position"],
+                                               vibraphone_data["mallet_size"])
+                            for ratio in reso_mode_freq_ratios])
+        mode_dampings = np.array([vibraphone_data["damping"]**(1 + i*0.1)
+                                  for i in range(len(reso_mode_freq_ratios))])
 
-            for i, ratio in enumerate(reso_mode_freq_ratios):
+        delay_lines = []
+        for frequency in frequencies:
+            for ratio in reso_mode_freq_ratios:
                 effective_freq = frequency * ratio
-                delay_length = int(sound_wave_data["sampling_rate"] / effective_freq)
-                delay_line = np.random.uniform(-1, 1, delay_length)
-                weight = self.__mode_weight(ratio,
-                                            vibraphone_data["strike_position"],
-                                            vibraphone_data["mallet_size"])
-                
-                for n in range(sound_wave_data["num_samples"]):
-                    vibrato = 1.0 + vibrato_depth * np.sin(2 * np.pi * vibrato_rate * time_data[n])
-                    damping = vibraphone_data["damping"]**(1 + i*0.1)
-                    val = 0.5 * (delay_line[0] + delay_line[1]) * damping * vibrato
-                    output[n] += val * weight
-                    delay_line = np.roll(delay_line, -1)
-                    delay_line[-1] = val
-
-            #for n in range(sound_wave_data["num_samples"]):
-            #    vibrato = 1.0 + vibrato_depth * np.sin(2 * np.pi * vibrato_rate * time_data)
-
-            #    mode_sum = 0
-            #    for a_mode in reso_mode_freq_ratios:
-            #        val = vibraphone_data["damping"] * vibrato
-            #        mode_sum += val * mode_weight
-                
-            #    delay_line[0] = mode_sum * delay_line[-1]
-            #    delay_line = np.roll(delay_line, -1)
-            #    output[n] = delay_line[-1]
-            
-            output /= max(abs(output))
-
-            self.soundsInstrumentPlay.append(output)
+                delay_length = max(2, int(sound_wave_data["sampling_rate"] / effective_freq))
+                delay_lines.append(np.random.uniform(-1, 1, delay_length))
+
+        dampings = np.tile(mode_dampings, len(frequencies))
+
+        if self.getBackend() == "numpy":
+            mode_outputs, mode_cutoffs = self.__advance_modes(delay_lines, dampings, vibrato,
+                                                              sound_wave_data["num_samples"],
+                                                              self.silenceThreshold)
+        else:
+            mode_outputs, mode_cutoffs = self.__advance_modes_by_step(delay_lines, dampings, vibrato,
+                                                                      sound_wave_data["num_samples"],
+                                                                      self.silenceThreshold)
+        mode_outputs = mode_outputs.reshape(len(frequencies),
+                                            len(reso_mode_freq_ratios),
+                                            sound_wave_data["num_samples"])
+        # 音の計算を打ち切った位置は、その音の全てのモードが無音になった位置とする
+        self.noteCutoffs = mode_cutoffs.reshape(len(frequencies),
+                                                len(reso_mode_freq_ratios)).max(axis=1)
+
+        outputs = weights @ mode_outputs
+
+        for output in outputs:
+            peak = max(abs(output))
+            if peak > 0.0:
+                output /= peak
+
+        return outputs
+
+    def __advance_modes(self, delay_lines, dampings, vibrato, num_samples, silence_threshold):
+        """
+        全てのモードの遅延線をまとめて進め、
+        (各モードの出力(モード数 × サンプル数), モードごとに計算を打ち切った位置)を応答します
+        各遅延線は val[n] = 0.5 * (d[n] + d[n+1]) * damping * vibrato[n]
+        (d は初期値の後ろに val が続く列)に従う。
+        val[n] が参照する値は遅延線長-1 サンプル以上前のものであるため、
+        最短の遅延線長-1 サンプルずつブロックとして一度に求める。
+        遅延線は長さの異なる行を右詰めにした2次元バッファに保持する
+        無音の閾値があれば、聞こえなくなった遅延線(SilenceDetector)をブロックから外し、残りを0で埋める
+        (ビブラートの利得は1をわずかに超えるが、一周期の平均では減衰するため、同じ判定を用いる)
+        Arguments:
+            delay_lines : 遅延線の初期値の群れ
+            dampings : 遅延線ごとの減衰係数
+            vibrato : ビブラートの時間軸データ
+            num_samples : サンプル数
+            silence_threshold : 無音の閾値(最大振幅に対するdB)、Noneなら最後まで求める
+        """
+
+        lengths = np.array([len(a_line) for a_line in delay_lines])
+        padding = lengths.max()
+        num_rows = len(delay_lines)
+
+        history = np.zeros((num_rows, padding + num_samples))
+        for row, a_line in enumerate(delay_lines):
+            history[row, padding - len(a_line):padding] = a_line
+
+        dampings = np.asarray(dampings)[:, np.newaxis]
+        if silence_threshold is None:
+            detector = None
+        else:
+            detector = SilenceDetector(lengths, silence_threshold, num_samples,
+                                       [np.max(np.abs(a_line)) for a_line in delay_lines])
+        active = np.arange(num_rows)
+        # 鳴っている遅延線の添字と減衰係数(遅延線を打ち切るたびに作り直す)
+        active_rows, active_dampings = active[:, np.newaxis], dampings
+
+        block = lengths.min() - 1
+        offsets = (padding - lengths)[:, np.newaxis] + np.arange(block + 1)
+
+        start = 0
+        while start < num_samples and len(active) > 0:
+            stop = min(start + block, num_samples)
+            width = stop - start
+            taps = history[active_rows, offsets[:, :width + 1] + start]
+            values = 0.5 * (taps[:, :-1] + taps[:, 1:]) * active_dampings * vibrato[start:stop]
+            history[active, padding + start:padding + stop] = values
+            start = stop
+
+            if detector is not None:
+                silent = detector.update(active, values, stop)
+                if np.any(silent):
+                    active = active[~silent]
+                    active_rows, active_dampings = active[:, np.newaxis], dampings[active]
+                    if len(active) > 0:
+                        block = lengths[active].min() - 1
+                        offsets = (padding - lengths[active])[:, np.newaxis] + np.arange(block + 1)
+
+        if detector is None:
+            cutoffs = np.full(num_rows, num_samples)
+        else:
+            cutoffs = detector.cutoffs
+
+        return history[:, padding:], cutoffs
+    
+    def __advance_modes_by_step(self, delay_lines, dampings, vibrato, num_samples, silence_threshold):
+        """
+        __advance_modesと同じ(各モードの出力(モード数 × サンプル数), モードごとに計算を打ち切った位置)を、
+        モードごとに遅延線を1サンプルずつ進めて求め、応答します(検証用の参照実装)
+        無音の判定は1サンプルごとに行い、静かなサンプルが遅延線長以上続けば、そのモードを打ち切る
+        Arguments:
+            delay_lines : 遅延線の初期値の群れ
+            dampings : 遅延線ごとの減衰係数
+            vibrato : ビブラートの時間軸データ
+            num_samples : サンプル数
+            silence_threshold : 無音の閾値(最大振幅に対するdB)、Noneなら最後まで求める
+        """
+
+        mode_outputs = np.zeros((len(delay_lines), num_samples))
+        cutoffs = np.full(len(delay_lines), num_samples)
+        vibrato = vibrato.tolist()
+        if silence_threshold is not None:
+            ratio = 10.0 ** (silence_threshold / 20.0)
+
+        for row, (a_line, a_damping) in enumerate(zip(delay_lines, dampings)):
+            delay_line = DelayLine(len(a_line), a_line)
+            output = mode_outputs[row]
+            peak = float(np.max(np.abs(a_line)))
+            quiet_run = 0
+            for n in range(num_samples):
+                val = 0.5 * (delay_line.tap(0) + delay_line.tap(1)) * a_damping * vibrato[n]
+                delay_line.push(val)
+                output[n] = val
+
+                if silence_threshold is not None:
+                    peak = max(peak, abs(val))
+                    quiet_run = quiet_run + 1 if abs(val) <= peak * ratio else 0
+                    if quiet_run >= len(a_line):
+                        cutoffs[row] = n + 1
+                        break
+
+        return mode_outputs, cutoffs
     
     def __mode_weight(self, f_n, strike_position, mallet_size):
         """
@@ -8,17 +8,20 @@ Violin: ヴァイオリン
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/24"
+__date__ = "2025/10/24 (Updated: 2025/11/21)"
 
 from .Instrument import Instrument
 
 from Returner.Returner import (greenChar, greenFrequencies,
-                               soundWaveData, violinData)
+                               violinData,
+                               nonePointer)
 
 import numpy as np
 
 import math
 
+from DSP.DelayLine import DelayLine
+
 class Violin(Instrument):
     """
     ヴァイオリン
@@ -29,7 +32,7 @@ class Violin(Instrument):
     Target:
         0: Instrumentクラスを正しく実装する
         1: __init__を実装する
-        2: makeSoundを正しく実装する
+        2: renderNotesを正しく実装する
         3: テストを行う
     """
 
@@ -40,56 +43,206 @@ class Violin(Instrument):
 
         super().__init__()
         self.color = greenChar()
-    
-    def makeSound(self):
+        self.frequencies = greenFrequencies()
+        self.frictionErrorBound = nonePointer()
+
+    def getBackends(self):
+        """
+        この楽器が持つ計算の実装の名前の群れを応答します
+        reference : 音ごとに、遅延線を1サンプルずつ進める(既定)
+        numpy : 全ての音を1サンプルずつ同時に(numpy配列として)進める
+                (一サンプルごとのnumpyの呼び出しは重いため、音の数が多いほど有利になる)
+        """
+
+        return ("reference", "numpy")
+
+    def setFrictionTable(self, error_bound):
         """
-        奏でる音を作成する
+        摩擦モデルを、あらかじめ求めた補間テーブルで近似するかどうかを設定します
+        Arguments:
+            error_bound : 許容する誤差の上限(Noneならテーブルを使わず、摩擦モデルをそのまま求める)
+        """
+
+        self.frictionErrorBound = error_bound
+
+    def renderNotes(self, frequencies, sound_wave_data):
+        """
+        周波数の群れの音を作成し、(音の数 × サンプル数)の配列として応答します
+        Arguments:
+            frequencies : 周波数の群れ
+            sound_wave_data : 音の長さに合わせたsoundWaveData
         Target:
-            1: サウンドデータやヴァイオリンデータ、周波数を得る
-            2: 全ての周波数に対して、以下を実行する
+            1: ヴァイオリンデータを得る
+            2: ループの中で変わらない値(弓の速さ、圧力、反射係数など)を束縛しておく
+            3: 全ての周波数に対して、以下を実行する
+               (getBackendが"numpy"なら、全ての周波数をnumpy配列として同時に進める)
                 a. 弦の張力を考慮した周波数を求め、遅延線を求める
+                   (遅延線長は音の長さによらず、サンプリング周波数から求める)
+                   遅延線はロールの代わりに先頭の位置を動かすリングバッファ(DelayLine)として扱う
                 b. 出力配列をゼロで初期化する
                 c. 弓の状態(弓が引いている弦の位置)を初期化する
                 d. 出力配列の大きさ分、以下を実行する
                     d-1. 弓と弦の相対速度を求める
-                    d_2. 摩擦による力を摩擦モデルから求める
+                    d_2. 摩擦による力を摩擦モデル(またはその補間テーブル)から求める
                     (摩擦モデル) = (0.5 + 0.5 * string_tension) * 摩擦モデル(v_relative, bow_pressure)
                     d_3. reclrection_coeffを更新する(ちなしなくても良い)
                     d_4. 力を元に加える
                     d_5. 出力を行う(つまり、output[n]に伝播した遅延線を束縛させる)
                 e. 正規化を行う
                 f. 右耳成分を再現する
-                g. 自分自身が持つ当該プロパティに出力波形を束縛させる
+                g. 出力波形を応答する
         """
 
-        green_frequencies = greenFrequencies()
-        sound_wave_data   = soundWaveData()
-        violin_data       = violinData()
-
-        for a_frequency in green_frequencies:
+        violin_data = violinData()
+
+        v_bow = violin_data["bow_velocity"]
+        bow_pressure = violin_data["bow_pressure"]
+        tension_scale = 0.5 + 0.5 * violin_data["string_tension"]
+        reflection_coeff = violin_data["reflection_coeff"]
+        damping = violin_data["damping"]
+        num_samples = sound_wave_data["num_samples"]
+
+        use_table = self.frictionErrorBound is not None
+        if use_table:
+            table, v_min, inverse_step = self.__friction_table(bow_pressure,
+                                                               self.frictionErrorBound)
+            last_index = len(table) - 1
+        tanh = math.tanh
+
+        if self.getBackend() == "numpy":
+            delay_lengths = [int(sound_wave_data["sampling_rate"]
+                                 / (a_frequency * violin_data["string_tension"]))
+                             for a_frequency in frequencies]
+            if use_table:
+                friction = (table, v_min, inverse_step)
+            else:
+                friction = None
+            outputs = self.__bowInLockstep(delay_lengths, num_samples, v_bow, bow_pressure,
+                                           tension_scale, reflection_coeff, damping, friction)
+            for output in outputs:
+                peak = max(abs(output))
+                if peak > 0.0:
+                    output /= peak
+            return outputs
+
+        outputs = np.zeros((len(frequencies), num_samples))
+
+        for output, a_frequency in zip(outputs, frequencies):
             effective_freq = a_frequency * violin_data["string_tension"]
-            delay_len = int(sound_wave_data["num_samples"] / effective_freq)
-            delay_line = np.zeros(delay_len)
-
-            output = np.zeros(sound_wave_data["num_samples"])
+            delay_len = int(sound_wave_data["sampling_rate"] / effective_freq)
+            delay_line = DelayLine(delay_len)
+            tap = delay_line.tap
+            push = delay_line.push
 
             bow_position = delay_len // 3
 
-            for n in range(sound_wave_data["num_samples"]):
-                v_bow = violin_data["bow_velocity"]
-                v_string = delay_line[bow_position]
+            for n in range(num_samples):
+                v_string = tap(bow_position)
                 v_rel = v_bow - v_string
 
-                force = self.__friction_force(v_rel, violin_data["bow_pressure"])
-                force *= (0.5 + 0.5 * violin_data["string_tension"])
-
-                delay_line[0] = force + violin_data["reflection_coeff"] * delay_line[-1]
-                delay_line = np.roll(delay_line, -1)
-                output[n] = delay_line[-1] * violin_data["damping"]
+                if use_table:
+                    position = (v_rel - v_min) * inverse_step
+                    if position <= 0.0:
+                        force = table[0]
+                    elif position >= last_index:
+                        force = table[last_index]
+                    else:
+                        index = int(position)
+                        lower = table[index]
+                        force = lower + (position - index) * (table[index + 1] - lower)
+                else:
+                    force = tanh(-v_rel * bow_pressure * 5.0)
+                force *= tension_scale
+
+                new_value = force + reflection_coeff * tap(-1)
+                push(new_value)
+                output[n] = new_value * damping
             
-            output /= max(abs(output))
+            peak = max(abs(output))
+            if peak > 0.0:
+                output /= peak
+
+        return outputs
+
+    def __bowInLockstep(self, delay_lengths, num_samples, v_bow, bow_pressure,
+                        tension_scale, reflection_coeff, damping, friction):
+        """
+        全ての音の遅延線を1サンプルずつ同時に進め、出力波形(音の数 × サンプル数)を応答します
+        遅延線は(最も長い遅延線に合わせて詰めた)2次元バッファの行として持ち、
+        行ごとの先頭の位置を、遅延線長に達した行だけ0に戻しながら動かす
+        Arguments:
+            delay_lengths : 音ごとの遅延線の長さ
+            num_samples : サンプル数
+            v_bow : 弓の速さ
+            bow_pressure : 弓による摩擦力
+            tension_scale : 張力による力の倍率
+            reflection_coeff : 反射係数
+            damping : 出力の減衰
+            friction : 摩擦モデルの補間テーブル(テーブル, 相対速度の下限, 刻み幅の逆数)、使わないならNone
+        """
+
+        num_notes = len(delay_lengths)
+        rows = np.arange(num_notes)
+        lengths = np.array(delay_lengths)
+
+        delay_lines = np.zeros((num_notes, lengths.max()))
+        heads = np.zeros(num_notes, dtype=np.intp)
+        bow_positions = lengths // 3
+        newests = lengths - 1
+
+        if friction is not None:
+            table, v_min, inverse_step = friction
+            table = np.asarray(table)
+            last_index = len(table) - 1
+
+        outputs = np.zeros((num_notes, num_samples))
+
+        for n in range(num_samples):
+            bow_indexes = heads + bow_positions
+            bow_indexes[bow_indexes >= lengths] -= lengths[bow_indexes >= lengths]
+            v_rel = v_bow - delay_lines[rows, bow_indexes]
+
+            if friction is not None:
+                position = np.clip((v_rel - v_min) * inverse_step, 0.0, last_index)
+                index = np.minimum(position.astype(np.intp), last_index - 1)
+                lower = table[index]
+                force = lower + (position - index) * (table[index + 1] - lower)
+            else:
+                force = np.tanh(-v_rel * bow_pressure * 5.0)
+            force *= tension_scale
+
+            new_values = force + reflection_coeff * delay_lines[rows, newests]
+            delay_lines[rows, heads] = new_values
+            outputs[:, n] = new_values * damping
+
+            newests = heads
+            heads = heads + 1
+            heads[heads == lengths] = 0
+
+        return outputs
+
+    def __friction_table(self, pressure, error_bound):
+        """
+        摩擦モデルの線形補間テーブルを作成し、(テーブル, 相対速度の下限, 刻み幅の逆数)を応答します
+        tanh(z) は |z| > atanh(1 - error_bound) で飽和するため、その範囲の外は端の値で近似し、
+        範囲の中は線形補間の誤差 h^2 / 8 * max|f''| が error_bound 以下となる刻み幅 h で標本化する
+        (max|tanh''| = 4 / 3√3)
+        Arguments:
+            pressure : 弓による摩擦力
+            error_bound : 許容する誤差の上限
+        """
+
+        scale = pressure * 5.0
+        v_max = math.atanh(1.0 - error_bound) / scale
+        max_second_derivative = scale**2 * 4.0 / (3.0 * math.sqrt(3.0))
+        step = math.sqrt(8.0 * error_bound / max_second_derivative)
+        num_points = int(math.ceil(2.0 * v_max / step)) + 1
+        step = 2.0 * v_max / (num_points - 1)
+
+        velocities = np.linspace(-v_max, v_max, num_points)
+        table = [self.__friction_force(v, pressure) for v in velocities]
 
-            self.soundsInstrumentPlay.append(output)
+        return table, -v_max, 1.0 / step
     
     def __friction_force(self, v_relative, pressure):
         """
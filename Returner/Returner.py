@@ -12,10 +12,12 @@ Returner :
 
 __author__ = "Tsuji Kodai"
 __version__ = "1.0.0"
-__date__ = "2025/10/23"
+__date__ = "2025/10/23 (Updated: 2025/11/21)"
 
 import numpy as np
 
+import os
+
 ###### about char function ######
 
 def blankChar():
@@ -131,6 +133,107 @@ def emptyList():
 
     return []
 
+###### about backend function ######
+
+def backendNames():
+    """
+    楽器の計算の実装の名前の群れを応答する
+    reference : 1サンプルずつ素直に求める、検証の基準となる実装
+    numpy : numpyの配列演算でまとめて求める実装
+    jit : numbaでコンパイルした実装(numbaがインストールされている場合のみ)
+    """
+
+    return ("reference", "numpy", "jit")
+
+def backendEnvironmentVariable():
+    """
+    楽器の計算の実装を設定する環境変数の名前を応答する
+    """
+
+    return "INSTRUMENT_BACKEND"
+
+def configuredBackend():
+    """
+    環境変数に設定された、楽器の計算の実装の名前を応答する
+    設定されていなければNoneを応答する
+    """
+
+    backend = os.environ.get(backendEnvironmentVariable())
+    assert backend is None or backend in backendNames(), \
+        f"{backendEnvironmentVariable()}は{backendNames()}のいずれかです"
+    return backend
+
+###### about sample format function ######
+
+def sampleFormats():
+    """
+    楽器が作成した音を束縛する配列の型の名前の群れを応答する
+    先頭のものを既定の型とする
+    float64 : 計算に用いる型のまま束縛する
+    float32 : 半分の大きさで束縛する(そのまま再生やファイルへの書き出しに渡せる)
+    """
+
+    return ("float64", "float32")
+
+def sampleFormatEnvironmentVariable():
+    """
+    楽器が作成した音を束縛する配列の型を設定する環境変数の名前を応答する
+    """
+
+    return "INSTRUMENT_SAMPLE_FORMAT"
+
+def configuredSampleFormat():
+    """
+    環境変数に設定された、楽器が作成した音を束縛する配列の型の名前を応答する
+    設定されていなければNoneを応答する
+    """
+
+    sample_format = os.environ.get(sampleFormatEnvironmentVariable())
+    assert sample_format is None or sample_format in sampleFormats(), \
+        f"{sampleFormatEnvironmentVariable()}は{sampleFormats()}のいずれかです"
+    return sample_format
+
+###### about worker function ######
+
+def workerCountEnvironmentVariable():
+    """
+    色クラスが楽器の音を並列に作成するときのプロセス数を設定する環境変数の名前を応答する
+    """
+
+    return "INSTRUMENT_WORKERS"
+
+def configuredWorkerCount():
+    """
+    環境変数に設定された、楽器の音を並列に作成するときのプロセス数を応答する
+    設定されていなければNoneを応答する
+    """
+
+    worker_count = os.environ.get(workerCountEnvironmentVariable())
+    if worker_count is None:
+        return worker_count
+
+    assert worker_count.isdigit() and int(worker_count) > 0, \
+        f"{workerCountEnvironmentVariable()}は正の整数です"
+    return int(worker_count)
+
+###### about gater function ######
+
+def gaterData():
+    """
+    InstrumentGaterが全ての楽器の音を鳴らすのに必要なデータを応答する
+    block_size : コールバック1回で出力するサンプル数
+    channels : 出力のチャンネル数(全てのチャンネルに同じ音を出力する)
+    sample_format : 出力する配列の型の名前
+    ring_blocks : 足し合わせた音をコールバックに渡すリングバッファのブロックの数
+    """
+
+    return {
+        "block_size": 512,
+        "channels": 1,
+        "sample_format": "float32",
+        "ring_blocks": 8
+    }
+
 ###### about frequencies function ######
 
 def blueFrequencies():
@@ -167,25 +270,31 @@ def yellowFrequencies():
 
 ###### about data function ######
 
-def soundWaveData():
+def soundWaveData(duration : float = 1.0):
     """
     音波を作成するのに必要なデータを応答する
+    Arguments:
+        duration : 音の長さ(秒)
     """
 
+    sampling_rate = 44100
+
     return {
-        "sampling_rate": 44100,
-        "duration": 1.0,
-        "num_samples": 44100,
-        "dt": 1.0/44100,
+        "sampling_rate": sampling_rate,
+        "duration": duration,
+        "num_samples": int(sampling_rate * duration),
+        "dt": 1.0/sampling_rate,
         "sound_speed": 343
     }
 
-def returnTimeData():
+def returnTimeData(duration : float = 1.0):
     """
     timeデータを応答します
+    Arguments:
+        duration : 音の長さ(秒)
     """
 
-    sound_wave_data = soundWaveData()
+    sound_wave_data = soundWaveData(duration)
 
     return np.linspace(0, sound_wave_data["duration"], 
                        int(sound_wave_data["sampling_rate"] * sound_wave_data["duration"]),
@@ -226,20 +335,26 @@ def ADSREnvelopTimeData(adsr_envelop : dict,
     a_samples = int(sound_data["sampling_rate"] * adsr_envelop["attack"])
     d_samples = int(sound_data["sampling_rate"] * adsr_envelop["decay"])
     r_samples = int(sound_data["sampling_rate"] * adsr_envelop["release"])
+
+    # 音が短くてA,D,Rが収まらない場合は、はみ出した部分を切り捨てる
+    # (Rは常に末尾に置き、重なった部分はRで上書きする)
+    a_length = min(a_samples, len(env))
+    d_length = max(zeroInt(), min(a_samples + d_samples, len(env)) - a_length)
+    r_samples = min(r_samples, len(env))
     s_samples = int(len(time_data) - (a_samples + d_samples + r_samples))
 
     env[:a_samples] = np.linspace(zeroInt(),
                                    oneInt(), a_samples, 
-                                   endpoint=returnFalse())
+                                   endpoint=returnFalse())[:a_length]
     env[a_samples:a_samples+d_samples] = np.linspace(oneInt(), 
                                                      adsr_envelop["sustain"],
                                                      d_samples, 
-                                                     endpoint=returnFalse())
+                                                     endpoint=returnFalse())[:d_length]
     env[a_samples+d_samples:a_samples+d_samples+s_samples] = adsr_envelop["sustain"]
-    env[-r_samples:] = np.linspace(adsr_envelop["sustain"], 
-                                   zeroInt(),
-                                   r_samples,
-                                   endpoint=returnFalse())
+    env[len(env)-r_samples:] = np.linspace(adsr_envelop["sustain"], 
+                                           zeroInt(),
+                                           r_samples,
+                                           endpoint=returnFalse())
     return env
 
 ###### about electronic guitar function ######
@@ -265,17 +380,70 @@ def electronicGuitarADSRFloatValue():
 
     return ADSREnvelopFloatValue(0.01, 0.0, 0.2, 0.01)
 
-def electronicGuitarADSRTimeData():
+def electronicGuitarADSRTimeData(duration : float = 1.0):
     """
     エレクトリックギターのADSR時間軸データを応答します
+    Arguments:
+        duration : 音の長さ(秒)
     """
 
     adsr_envelop = electronicGuitarADSRFloatValue()
-    time_data = returnTimeData()
-    sound_data = soundWaveData()
+    time_data = returnTimeData(duration)
+    sound_data = soundWaveData(duration)
 
     return ADSREnvelopTimeData(adsr_envelop, time_data, sound_data)
 
+###### about electronic drum function ######
+
+def electronicDrumData():
+    """
+    電子的なドラムのデータを応答します
+    voices : 各周波数を鳴らすドラムの種類(kick, snare, hat)
+    seed : ノイズの群れを作る乱数のシード
+    種類ごとのデータ:
+        pitch_ratio : 周波数に掛けて、音程の終わりの周波数を求める比
+        sweep_ratio : 音程の始まりの周波数 / 終わりの周波数
+        sweep_time : 音程が下がる時定数
+        tone_level, tone_decay : 音程のある成分の大きさと減衰の時定数
+        noise_level, noise_decay : ノイズ成分の大きさと減衰の時定数
+        noise_filter : ノイズに掛けるフィルタ(種類, 遮断周波数, 次数)
+    """
+
+    return {
+        "voices": ["kick", "kick", "snare", "snare", "snare", "hat", "hat"],
+        "seed": 2025,
+        "kick": {
+            "pitch_ratio": 0.125,
+            "sweep_ratio": 4.0,
+            "sweep_time": 0.03,
+            "tone_level": 1.0,
+            "tone_decay": 0.2,
+            "noise_level": 0.05,
+            "noise_decay": 0.01,
+            "noise_filter": ("lowpass", (2000,), 2)
+        },
+        "snare": {
+            "pitch_ratio": 0.333,
+            "sweep_ratio": 1.5,
+            "sweep_time": 0.02,
+            "tone_level": 0.6,
+            "tone_decay": 0.1,
+            "noise_level": 0.8,
+            "noise_decay": 0.12,
+            "noise_filter": ("bandpass", (1000, 8000), 2)
+        },
+        "hat": {
+            "pitch_ratio": 0.0,
+            "sweep_ratio": 1.0,
+            "sweep_time": 0.01,
+            "tone_level": 0.0,
+            "tone_decay": 0.01,
+            "noise_level": 1.0,
+            "noise_decay": 0.05,
+            "noise_filter": ("highpass", (7000,), 4)
+        }
+    }
+
 ###### about reggae organ function ######
     
 def returnReggaeAmplitude():
@@ -307,14 +475,16 @@ def reggaeADSREnvelopFloatValue():
 
     return ADSREnvelopFloatValue(0.02, 0.10, 0.1, 0.10)
 
-def reggaeADSREnvelopTimeData():
+def reggaeADSREnvelopTimeData(duration : float = 1.0):
     """
     レゲエオルガンに用いるADSREnvelopの時間軸データを応答する
+    Arguments:
+        duration : 音の長さ(秒)
     """
 
     adsr_envelop = reggaeADSREnvelopFloatValue()
-    time_data = returnTimeData()
-    sound_data = soundWaveData()
+    time_data = returnTimeData(duration)
+    sound_data = soundWaveData(duration)
     
     return ADSREnvelopTimeData(adsr_envelop, time_data, sound_data)
 
@@ -361,6 +531,208 @@ def trumpetData():
         'injected_scale': 1e-5
     }
 
+###### about brass function ######
+
+def cornetData():
+    """
+    コルネットに関するデータを辞書形式で応答します
+    """
+
+    return {
+        "blowing_pressure": 2000,
+        "lip_mass": 0.002,
+        "lip_quality": 60,
+        "lip_tuning": 0.94,
+        "lip_area": 1e-4,
+        "a0": 1e-6,
+        "a1": 1e-2,
+        "rho": 1.204,
+        "tube_length": 1.48,
+        "tube_area": 1.1e-4,
+        "r_bell": -0.9,
+        "bell_lowpass": 0.6
+    }
+
+def cornetADSREnvelopFloatValue():
+    """
+    コルネットの吹く圧力のエンベロープの値を応答する
+    """
+
+    return ADSREnvelopFloatValue(0.03, 0.05, 0.8, 0.08)
+
+def cornetADSREnvelopTimeData(duration : float = 1.0):
+    """
+    コルネットの吹く圧力のエンベロープの時間軸データを応答する
+    Arguments:
+        duration : 音の長さ(秒)
+    """
+
+    adsr_envelop = cornetADSREnvelopFloatValue()
+    time_data = returnTimeData(duration)
+    sound_data = soundWaveData(duration)
+
+    return ADSREnvelopTimeData(adsr_envelop, time_data, sound_data)
+
+def flugelhornData():
+    """
+    フリューゲルホルンに関するデータを辞書形式で応答します
+    """
+
+    return {
+        "blowing_pressure": 1800,
+        "lip_mass": 0.002,
+        "lip_quality": 60,
+        "lip_tuning": 0.94,
+        "lip_area": 1e-4,
+        "a0": 1e-6,
+        "a1": 1e-2,
+        "rho": 1.204,
+        "tube_length": 1.48,
+        "tube_area": 1.4e-4,
+        "r_bell": -0.9,
+        "bell_lowpass": 0.75
+    }
+
+def flugelhornADSREnvelopFloatValue():
+    """
+    フリューゲルホルンの吹く圧力のエンベロープの値を応答する
+    """
+
+    return ADSREnvelopFloatValue(0.05, 0.05, 0.8, 0.1)
+
+def flugelhornADSREnvelopTimeData(duration : float = 1.0):
+    """
+    フリューゲルホルンの吹く圧力のエンベロープの時間軸データを応答する
+    Arguments:
+        duration : 音の長さ(秒)
+    """
+
+    adsr_envelop = flugelhornADSREnvelopFloatValue()
+    time_data = returnTimeData(duration)
+    sound_data = soundWaveData(duration)
+
+    return ADSREnvelopTimeData(adsr_envelop, time_data, sound_data)
+
+def tromboneData():
+    """
+    トロンボーンに関するデータを辞書形式で応答します
+    """
+
+    return {
+        "blowing_pressure": 2500,
+        "lip_mass": 0.003,
+        "lip_quality": 50,
+        "lip_tuning": 0.94,
+        "lip_area": 1e-4,
+        "a0": 1e-6,
+        "a1": 1e-2,
+        "rho": 1.204,
+        "tube_length": 2.7,
+        "tube_area": 1.2e-4,
+        "r_bell": -0.92,
+        "bell_lowpass": 0.5
+    }
+
+def tromboneADSREnvelopFloatValue():
+    """
+    トロンボーンの吹く圧力のエンベロープの値を応答する
+    """
+
+    return ADSREnvelopFloatValue(0.04, 0.05, 0.8, 0.1)
+
+def tromboneADSREnvelopTimeData(duration : float = 1.0):
+    """
+    トロンボーンの吹く圧力のエンベロープの時間軸データを応答する
+    Arguments:
+        duration : 音の長さ(秒)
+    """
+
+    adsr_envelop = tromboneADSREnvelopFloatValue()
+    time_data = returnTimeData(duration)
+    sound_data = soundWaveData(duration)
+
+    return ADSREnvelopTimeData(adsr_envelop, time_data, sound_data)
+
+def hornData():
+    """
+    ホルンに関するデータを辞書形式で応答します
+    """
+
+    return {
+        "blowing_pressure": 2200,
+        "lip_mass": 0.0025,
+        "lip_quality": 60,
+        "lip_tuning": 0.94,
+        "lip_area": 1e-4,
+        "a0": 1e-6,
+        "a1": 1e-2,
+        "rho": 1.204,
+        "tube_length": 3.7,
+        "tube_area": 0.9e-4,
+        "r_bell": -0.9,
+        "bell_lowpass": 0.7
+    }
+
+def hornADSREnvelopFloatValue():
+    """
+    ホルンの吹く圧力のエンベロープの値を応答する
+    """
+
+    return ADSREnvelopFloatValue(0.06, 0.05, 0.8, 0.12)
+
+def hornADSREnvelopTimeData(duration : float = 1.0):
+    """
+    ホルンの吹く圧力のエンベロープの時間軸データを応答する
+    Arguments:
+        duration : 音の長さ(秒)
+    """
+
+    adsr_envelop = hornADSREnvelopFloatValue()
+    time_data = returnTimeData(duration)
+    sound_data = soundWaveData(duration)
+
+    return ADSREnvelopTimeData(adsr_envelop, time_data, sound_data)
+
+def tubaData():
+    """
+    チューバに関するデータを辞書形式で応答します
+    """
+
+    return {
+        "blowing_pressure": 3500,
+        "lip_mass": 0.0025,
+        "lip_quality": 60,
+        "lip_tuning": 0.94,
+        "lip_area": 1e-4,
+        "a0": 1e-6,
+        "a1": 1e-2,
+        "rho": 1.204,
+        "tube_length": 5.5,
+        "tube_area": 1.2e-4,
+        "r_bell": -0.93,
+        "bell_lowpass": 0.7
+    }
+
+def tubaADSREnvelopFloatValue():
+    """
+    チューバの吹く圧力のエンベロープの値を応答する
+    """
+
+    return ADSREnvelopFloatValue(0.08, 0.05, 0.8, 0.15)
+
+def tubaADSREnvelopTimeData(duration : float = 1.0):
+    """
+    チューバの吹く圧力のエンベロープの時間軸データを応答する
+    Arguments:
+        duration : 音の長さ(秒)
+    """
+
+    adsr_envelop = tubaADSREnvelopFloatValue()
+    time_data = returnTimeData(duration)
+    sound_data = soundWaveData(duration)
+
+    return ADSREnvelopTimeData(adsr_envelop, time_data, sound_data)
+
 ###### about ukulele function ######
 
 def ukuleleData():
@@ -384,14 +756,16 @@ def ukuleleADSREnvelopFloatValue():
 
     return ADSREnvelopFloatValue(0.01, 0.5, 0.3, 0.5)
 
-def ukuleleADSREnvelopTimeData():
+def ukuleleADSREnvelopTimeData(duration : float = 1.0):
     """
     ウクレレのエンベロープの時間軸データを応答する
+    Arguments:
+        duration : 音の長さ(秒)
     """
 
     adsr_envelop = ukuleleADSREnvelopFloatValue()
-    time_data = returnTimeData()
-    sound_data = soundWaveData()
+    time_data = returnTimeData(duration)
+    sound_data = soundWaveData(duration)
     
     return ADSREnvelopTimeData(adsr_envelop, time_data, sound_data)
 
@@ -438,6 +812,113 @@ def violinData():
         "reflection_coeff" : 0.9
     }
 
+###### about bowed string function ######
+
+def violaData():
+    """
+    ヴィオラに関するデータを辞書形式で応答する
+    """
+
+    return {
+        "string_length": 0.37,
+        "string_tension": 45.0,
+        "bow_force": 0.03,
+        "bow_velocity": 0.2,
+        "bow_position": 0.127,
+        "bridge_reflection": 0.95,
+        "bridge_lowpass": 0.4
+    }
+
+def violaADSREnvelopFloatValue():
+    """
+    ヴィオラの弓の速さのエンベロープの値を応答する
+    """
+
+    return ADSREnvelopFloatValue(0.05, 0.05, 0.9, 0.1)
+
+def violaADSREnvelopTimeData(duration : float = 1.0):
+    """
+    ヴィオラの弓の速さのエンベロープの時間軸データを応答する
+    Arguments:
+        duration : 音の長さ(秒)
+    """
+
+    adsr_envelop = violaADSREnvelopFloatValue()
+    time_data = returnTimeData(duration)
+    sound_data = soundWaveData(duration)
+
+    return ADSREnvelopTimeData(adsr_envelop, time_data, sound_data)
+
+def celloData():
+    """
+    チェロに関するデータを辞書形式で応答する
+    """
+
+    return {
+        "string_length": 0.69,
+        "string_tension": 130.0,
+        "bow_force": 0.06,
+        "bow_velocity": 0.15,
+        "bow_position": 0.11,
+        "bridge_reflection": 0.96,
+        "bridge_lowpass": 0.5
+    }
+
+def celloADSREnvelopFloatValue():
+    """
+    チェロの弓の速さのエンベロープの値を応答する
+    """
+
+    return ADSREnvelopFloatValue(0.08, 0.05, 0.9, 0.15)
+
+def celloADSREnvelopTimeData(duration : float = 1.0):
+    """
+    チェロの弓の速さのエンベロープの時間軸データを応答する
+    Arguments:
+        duration : 音の長さ(秒)
+    """
+
+    adsr_envelop = celloADSREnvelopFloatValue()
+    time_data = returnTimeData(duration)
+    sound_data = soundWaveData(duration)
+
+    return ADSREnvelopTimeData(adsr_envelop, time_data, sound_data)
+
+def doubleBassData():
+    """
+    コントラバスに関するデータを辞書形式で応答する
+    """
+
+    return {
+        "string_length": 1.05,
+        "string_tension": 280.0,
+        "bow_force": 0.15,
+        "bow_velocity": 0.12,
+        "bow_position": 0.1,
+        "bridge_reflection": 0.97,
+        "bridge_lowpass": 0.6
+    }
+
+def doubleBassADSREnvelopFloatValue():
+    """
+    コントラバスの弓の速さのエンベロープの値を応答する
+    """
+
+    return ADSREnvelopFloatValue(0.12, 0.05, 0.9, 0.2)
+
+def doubleBassADSREnvelopTimeData(duration : float = 1.0):
+    """
+    コントラバスの弓の速さのエンベロープの時間軸データを応答する
+    Arguments:
+        duration : 音の長さ(秒)
+    """
+
+    adsr_envelop = doubleBassADSREnvelopFloatValue()
+    time_data = returnTimeData(duration)
+    sound_data = soundWaveData(duration)
+
+    return ADSREnvelopTimeData(adsr_envelop, time_data, sound_data)
+
 ###### about vibraphone function ######
 
 def vibraphoneData():
@@ -474,63 +955,3 @@ def pianoData():
         "string_lengthes": [1.8, 1.4, 1.1, 0.9, 0.8, 0.7, 0.6],
         "force_time": 0.02,
     }
-
-def pianoResonator():
-    """
-    ピアノの共鳴フィルタを作成し、応答します
-    """
-
-    class PianoResonator:
-        """
-        ピアノの共鳴フィルタクラス
-        """
-
-        def __init__(self, Q = 10, gain=1.0):
-            """
-            このクラスのコンストラクタ
-            """
-
-            self.Q = Q
-            self.gain = gain
-
-            self.y1 = 0.0
-            self.y2 = 0.0
-        
-        def setFrequency(self, f0):
-            """
-            周波数を設定します
-            """
-
-            self.f0 = f0
-        
-        def setSamplingRate(self, fs):
-            """
-            サンプリング周波数を設定します
-            """
-
-            self.fs = fs
-        
-        def defineOtherProperties(self):
-            """
-            プロパティの群れを定義します
-            """
-
-            self.omega = 2.0 * np.pi * self.f0 / self.fs
-            self.r = np.exp(-np.pi * self.f0 / (self.Q * self.fs))
-            self.a1 = 2.0 * self.r * np.cos(self.omega)
-            self.a2 = - (self.r**2)
-            self.b0 = (1.0 - self.r) * self.gain
-        
-        def process(self, x):
-            """
-            共鳴フィルタを掛けます
-            Arguments:
-                x : 値
-            """
-
-            y = self.a1 * self.y1 + self.a2 * self.y2 + self.b0 * x
-            self.y2 = self.y1
-            self.y1 = y
-            return y
-    
-    return PianoResonator()
\ No newline at end of file
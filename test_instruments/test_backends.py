@@ -0,0 +1,94 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+Instrument/の全ての楽器について、全ての計算の実装(backend)が
+referenceの出力と一致することを確かめ、その速さを比べるプログラム
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/20"
+
+from Instrument.Instrument import Instrument
+
+from Returner.Returner import soundWaveData
+
+import numpy as np
+
+import importlib
+import os
+import time
+
+def instrumentClasses():
+    """
+    Instrument/の各ファイルから、ファイル名と同じ名前の楽器クラスを集め、
+    子クラスを持たない(実際に音を奏でる)ものを応答します
+    """
+
+    directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "Instrument")
+    classes = []
+    for a_file in sorted(os.listdir(directory)):
+        name, extension = os.path.splitext(a_file)
+        if extension != ".py" or name.startswith("__"):
+            continue
+        a_class = getattr(importlib.import_module("Instrument." + name), name, None)
+        if isinstance(a_class, type) and issubclass(a_class, Instrument):
+            classes.append(a_class)
+
+    return [a_class for a_class in classes if not a_class.__subclasses__()]
+
+def render(an_instrument_class, backend):
+    """
+    指定した実装で楽器の音を作成し、(音の群れ, 作成にかかった時間)を応答します
+    乱数を使う楽器があるため、毎回同じシードから作成する
+    Arguments:
+        an_instrument_class : 楽器クラス
+        backend : 実装の名前
+    """
+
+    np.random.seed(0)
+    an_instrument = an_instrument_class()
+    an_instrument.setBackend(backend)
+    start = time.time()
+    an_instrument.makeSound()
+    elapsed = time.time() - start
+
+    return np.array(an_instrument.getSoundsInstrumentPlay()), elapsed
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    全ての楽器がreferenceを持つこと、
+    全ての実装の出力がreferenceの出力と一致すること(正規化した振幅で1e-6以内)を確かめ、
+    実装ごとの実時間比(作成にかかった時間 / 作成した音の長さの合計)を出力する
+    jitは最初の一回でコンパイルを行うため、二回目を計測する
+    """
+
+    sound_wave_data = soundWaveData()
+
+    for an_instrument_class in instrumentClasses():
+        backends = an_instrument_class().getBackends()
+        assert "reference" in backends, f"{an_instrument_class.__name__}にreferenceがありません"
+
+        reference_sounds, _ = render(an_instrument_class, "reference")
+        assert np.all(np.isfinite(reference_sounds))
+
+        for a_backend in backends:
+            if a_backend == "jit":
+                render(an_instrument_class, a_backend)
+            sounds, elapsed = render(an_instrument_class, a_backend)
+            difference = np.max(np.abs(sounds - reference_sounds))
+            real_time_factor = elapsed / (len(sounds) * sound_wave_data["duration"])
+            print(f"{an_instrument_class.__name__:>16} {a_backend:>9} "
+                  f"real time factor: {real_time_factor:.4f} difference: {difference:.3g}")
+            assert difference < 1e-6
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
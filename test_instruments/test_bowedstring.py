@@ -0,0 +1,57 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+BowedString(ヴィオラ、チェロ、コントラバス)の
+実時間比(Real Time Factor)を計測するプログラム
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/14"
+
+from Instrument.Viola import Viola
+from Instrument.Cello import Cello
+from Instrument.DoubleBass import DoubleBass
+
+from Returner.Returner import soundWaveData
+
+import numpy as np
+
+import time
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    実時間比 = 作成にかかった時間 / 作成した音の長さの合計
+    が目標を下回ることを確かめる
+    (jitは最初の一回でコンパイルを行うため、二回目を計測する)
+    """
+
+    real_time_factor_target = 0.25
+    sound_wave_data = soundWaveData()
+
+    for an_instrument_class in (Viola, Cello, DoubleBass):
+        an_instrument_class().makeSound()
+
+        an_instrument = an_instrument_class()
+        start = time.time()
+        an_instrument.makeSound()
+        elapsed = time.time() - start
+
+        sounds = an_instrument.getSoundsInstrumentPlay()
+        for sound in sounds:
+            assert np.all(np.isfinite(sound))
+
+        real_time_factor = elapsed / (len(sounds) * sound_wave_data["duration"])
+        print(an_instrument_class.__name__, an_instrument.getBackend(),
+              "elapsed:", elapsed, "real time factor:", real_time_factor)
+        assert real_time_factor < real_time_factor_target
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
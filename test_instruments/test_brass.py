@@ -0,0 +1,71 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+Brass(コルネット、フリューゲルホルン、トロンボーン、ホルン、チューバ)の
+実時間比(Real Time Factor)を計測するプログラム
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/15 (Updated: 2025/11/21)"
+
+from Instrument.Cornet import Cornet
+from Instrument.Flugelhorn import Flugelhorn
+from Instrument.Trombone import Trombone
+from Instrument.Horn import Horn
+from Instrument.Tuba import Tuba
+
+from Returner.Returner import soundWaveData
+
+import numpy as np
+
+import time
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    実時間比 = 作成にかかった時間 / 作成した音の長さの合計
+    が目標を下回ることを確かめる
+    (jitは最初の一回でコンパイルを行うため、二回目を計測する)
+    また、唇のモデルで表せない周波数(ナイキスト周波数の近く)は、
+    無限大やNaNの音を作らずにAssertionErrorとなることを確かめる
+    """
+
+    real_time_factor_target = 0.25
+    sound_wave_data = soundWaveData()
+
+    for an_instrument_class in (Cornet, Flugelhorn, Trombone, Horn, Tuba):
+        an_instrument_class().makeSound()
+
+        an_instrument = an_instrument_class()
+        start = time.time()
+        an_instrument.makeSound()
+        elapsed = time.time() - start
+
+        sounds = an_instrument.getSoundsInstrumentPlay()
+        for sound in sounds:
+            assert np.all(np.isfinite(sound))
+
+        real_time_factor = elapsed / (len(sounds) * sound_wave_data["duration"])
+        print(an_instrument_class.__name__, an_instrument.getBackend(),
+              "elapsed:", elapsed, "real time factor:", real_time_factor)
+        assert real_time_factor < real_time_factor_target
+
+        an_instrument = an_instrument_class()
+        an_instrument.makeSound([14000.0], [0.05])
+        assert np.all(np.isfinite(an_instrument.getSoundBank()))
+        try:
+            an_instrument_class().makeSound([20000.0], [0.05])
+        except AssertionError as an_error:
+            print(an_instrument_class.__name__, "20000Hz:", an_error)
+        else:
+            assert False, "20000Hzの音が作成されました"
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+ColorのprepareToPerformが、全ての楽器の音をプロセスプールで並列に作成し、
+順に作成したものと同じ音の群れを楽器に束縛することを確かめ、その速さを比べるプログラム
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+import Color.Color as color_module
+from Color.Color import Color
+
+from Instrument.Oboe import Oboe
+from Instrument.ReggaeOrgan import ReggaeOrgan
+
+from Returner.Returner import workerCountEnvironmentVariable
+
+from test_instruments.test_backends import instrumentClasses
+from test_instruments.test_gater import CountingPoolExecutor
+
+import numpy as np
+
+import os
+
+def prepare(max_workers, worker_count=None):
+    """
+    全ての楽器を持つColorを、指定したプロセス数で準備させ、(Color, 作られたプロセスプールの数)を応答します
+    乱数を使う楽器があるため、毎回同じシードから準備させる
+    Arguments:
+        max_workers : プロセス数(Noneなら環境変数、またはCPUの数)
+        worker_count : 環境変数に設定するプロセス数の文字列(Noneなら設定しない)
+    """
+
+    np.random.seed(0)
+    a_color = Color()
+    a_color.instruments = [an_instrument_class() for an_instrument_class in instrumentClasses()]
+    a_color.setMaxWorkers(max_workers)
+
+    num_pools = CountingPoolExecutor.count
+    color_module.ProcessPoolExecutor = CountingPoolExecutor
+    if worker_count is not None:
+        os.environ[workerCountEnvironmentVariable()] = worker_count
+    try:
+        a_color.prepareToPerform()
+    finally:
+        color_module.ProcessPoolExecutor = CountingPoolExecutor.__bases__[0]
+        os.environ.pop(workerCountEnvironmentVariable(), None)
+
+    return a_color, CountingPoolExecutor.count - num_pools
+
+def sameRenderState(a_state, another_state):
+    """
+    楽器に残した状態(getRenderStateの辞書)が一致するかを応答します
+    Arguments:
+        a_state : 状態
+        another_state : 比べる状態
+    """
+
+    if a_state.keys() != another_state.keys():
+        return False
+
+    return all(len(a_state[a_name]) == len(another_state[a_name])
+               and all(np.array_equal(a_value, another_value)
+                       for a_value, another_value in zip(a_state[a_name], another_state[a_name]))
+               for a_name in a_state)
+
+def traceOboe(max_workers, shared_memory):
+    """
+    トレースを有効にしたOboeを持つColorを、指定したプロセス数で準備させ、そのOboeを応答します
+    Arguments:
+        max_workers : プロセス数
+        shared_memory : 共有メモリで受け取るか
+    """
+
+    np.random.seed(0)
+    an_oboe = Oboe()
+    an_oboe.setTrace(True)
+    a_color = Color()
+    a_color.instruments = [an_oboe, ReggaeOrgan()]
+    a_color.setMaxWorkers(max_workers)
+    a_color.setSharedMemory(shared_memory)
+    a_color.prepareToPerform()
+
+    return an_oboe
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    全ての楽器について、以下を確かめる
+        1. プロセス数が1なら(setMaxWorkersでも環境変数でも)プロセスプールを作らず、
+           2以上なら一つだけ作る
+        2. 並列に作成した音の群れ、打ち切った位置、楽器に残した状態は、
+           どのプロセス数でも順に作成したものと一致する
+        3. 音の群れは楽器のsoundBankとsoundsInstrumentPlayに束縛される
+        4. プロセス数は楽器の数を超えず、環境変数でも選べる
+        5. 別のプロセスで楽器に残した状態(Oboeのトレースの記録)も、親のプロセスの楽器に束縛される
+    """
+
+    sequential, num_pools = prepare(1)
+    assert num_pools == 0
+    _, num_pools = prepare(None, "1")
+    assert num_pools == 0
+
+    for max_workers, worker_count in ((2, None), (4, None), (None, "3")):
+        parallel, num_pools = prepare(max_workers, worker_count)
+        assert num_pools == 1
+        for a_sequential, a_parallel in zip(sequential.instruments, parallel.instruments):
+            sound_bank = a_parallel.getSoundBank()
+            assert sound_bank is not None and len(sound_bank) == len(a_parallel.frequencies)
+            assert np.array_equal(sound_bank, a_sequential.getSoundBank())
+            assert all(a_sound.base is sound_bank for a_sound in a_parallel.getSoundsInstrumentPlay())
+            assert a_parallel.getSilenceCutoffs() == a_sequential.getSilenceCutoffs()
+            assert sameRenderState(a_parallel.getRenderState(), a_sequential.getRenderState())
+        parallel.releaseInstruments()
+
+    a_color = Color()
+    a_color.instruments = sequential.instruments[:2]
+    a_color.setMaxWorkers(8)
+    assert a_color.getMaxWorkers() == 2
+
+    a_color.setMaxWorkers(None)
+    for worker_count in ("1", "3"):
+        os.environ[workerCountEnvironmentVariable()] = worker_count
+        try:
+            assert a_color.getMaxWorkers() == min(int(worker_count), 2)
+        finally:
+            del os.environ[workerCountEnvironmentVariable()]
+
+    traced = traceOboe(1, True)
+    for shared_memory in (True, False):
+        an_oboe = traceOboe(2, shared_memory)
+        assert len(an_oboe.getReedFlows()) == len(traced.getReedFlows()) == len(an_oboe.frequencies)
+        assert all(np.array_equal(a_flow, an_expected)
+                   for a_flow, an_expected in zip(an_oboe.getReedFlows(), traced.getReedFlows()))
+        assert an_oboe.getReedSummaries() == traced.getReedSummaries()
+        assert [a_summary["frequency"] for a_summary in an_oboe.getReedSummaries()] == an_oboe.frequencies
+        an_oboe.releaseSounds()
+
+    print(f"{len(sequential.instruments)} instruments: the same sounds with 1, 2, 3 and 4 workers")
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+DSP(DelayLine, BiquadBank, ResonatorBank, KarplusStrongBank, SilenceDetector)のテストを行うプログラム
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/17 (Updated: 2025/11/21)"
+
+from DSP.DelayLine import DelayLine
+from DSP.BiquadBank import BiquadBank, resonatorSOS, butterworthSOS
+from DSP.ResonatorBank import ResonatorBank
+from DSP.KarplusStrongBank import KarplusStrongBank
+
+import numpy as np
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    1: 遅延線がnp.rollと同じ順に値を送ること
+    2: フィルタ群に信号を区切って渡しても、一度に渡した場合と同じ出力になること
+    3: 同じ設計のSOSは使い回されること
+    4: 弦の群れをlfilterで求めた値が、1サンプルずつ進めた値と一致すること
+    5: 無音で打ち切った弦の群れは、打ち切った位置から0であり、
+       最後まで求めた値との差が閾値に収まること
+    6: 打ち切った弦の群れのtapは、初期波形と値を繋げた列から読んだものと一致すること
+    """
+
+    values = np.arange(5, dtype=float)
+    delay_line = DelayLine(5, values)
+    for a_value in (10.0, 11.0, 12.0):
+        delay_line.push(a_value)
+        values = np.roll(values, -1)
+        values[-1] = a_value
+        assert delay_line.getValues() == values.tolist()
+        assert delay_line.tap(0) == values[0] and delay_line.tap(-1) == values[-1]
+
+    signals = np.random.default_rng(0).standard_normal((3, 4000))
+    for a_bank in (BiquadBank(resonatorSOS([200, 400], 4, 44100)),
+                   BiquadBank(butterworthSOS(2, (100, 6000), 'bandpass', 44100)),
+                   ResonatorBank([50, 100, 200], 44100)):
+        whole = a_bank.process(signals)
+        a_bank.reset()
+        blocks = np.concatenate([a_bank.process(signals[:, :1500]),
+                                 a_bank.process(signals[:, 1500:])], axis=-1)
+        assert np.allclose(whole, blocks)
+
+    assert resonatorSOS([200, 400], 4, 44100) is resonatorSOS([200, 400], 4, 44100)
+
+    initial_waves = [np.random.default_rng(i).uniform(-1, 1, length)
+                     for i, length in enumerate((37, 52, 80))]
+    strings = KarplusStrongBank(initial_waves, [0.996, 0.99, 0.98])
+    outputs = strings.process(3000)
+    assert np.allclose(outputs, strings.processByStep(3000))
+
+    delay_line = DelayLine(37, initial_waves[0])
+    for n in range(3000):
+        delay_line.push(0.498 * (delay_line.tap(0) + delay_line.tap(1)))
+    assert np.isclose(strings.tap(outputs, 5)[0, -1], delay_line.tap(5))
+
+    ratio = 10.0 ** (-60.0 / 20.0)
+    whole = strings.process(80000)
+    peaks = np.array([np.max(np.abs(a_wave)) for a_wave in initial_waves])[:, np.newaxis]
+    for a_process in (strings.process, strings.processByStep):
+        silenced = a_process(80000, -60.0)
+        assert np.all(strings.cutoffs < 80000)
+        for a_row, a_cutoff in zip(silenced, strings.cutoffs):
+            assert not np.any(a_row[a_cutoff:])
+        assert np.all(np.abs(silenced - whole) <= ratio * np.maximum(peaks, np.max(np.abs(whole), axis=1, keepdims=True)))
+        for an_offset in (0, 5, 36):
+            sequences = [np.concatenate([a_wave, a_row]) for a_wave, a_row in zip(initial_waves, silenced)]
+            expected = np.array([a_sequence[1 + an_offset:1 + an_offset + 80000] for a_sequence in sequences])
+            assert np.array_equal(strings.tap(silenced, an_offset), expected)
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+ElectronicDrumのテストを行うプログラム
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/16 (Updated: 2025/11/21)"
+
+from Instrument.ElectronicDrum import ElectronicDrum
+
+import numpy as np
+
+import time
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    ノイズとフィルタは一度求めたものを使い回すため、
+    二回目の打撃は、一回目に保存したノイズの群れを(求め直さずに)そのまま使うことを確かめる
+    また、ノイズは音の長さによらない一つの音源であり、
+    長さの異なる音を作っても、保存するノイズの群れが増えないことを確かめる
+    """
+
+    noise_cache = ElectronicDrum._ElectronicDrum__noise_cache
+    filtered_noise_cache = ElectronicDrum._ElectronicDrum__filtered_noise_cache
+
+    first = ElectronicDrum()
+    start = time.time()
+    first.makeSound()
+    first_elapsed = time.time() - start
+    caches = (noise_cache, filtered_noise_cache)
+    cached = [dict(a_cache) for a_cache in caches]
+    assert all(len(a_cached) > 0 for a_cached in cached)
+
+    second = ElectronicDrum()
+    start = time.time()
+    second.makeSound()
+    second_elapsed = time.time() - start
+
+    print("first:", first_elapsed, "second:", second_elapsed)
+
+    for a_sound, the_same_sound in zip(first.getSoundsInstrumentPlay(),
+                                       second.getSoundsInstrumentPlay()):
+        assert np.all(np.isfinite(a_sound))
+        assert np.array_equal(a_sound, the_same_sound)
+
+    for a_cache, a_cached in zip(caches, cached):
+        assert a_cache.keys() == a_cached.keys()
+        assert all(a_cache[key] is a_cached[key] for key in a_cache)
+
+    num_entries = (len(noise_cache), len(filtered_noise_cache))
+    for a_duration in (0.25, 0.5, 0.75, 0.1, 2.0, 0.3):
+        ElectronicDrum().makeSound(durations=a_duration)
+    assert (len(noise_cache), len(filtered_noise_cache)) == num_entries
+
+    short_notes = ElectronicDrum().makeSound(durations=0.3)
+    long_notes = ElectronicDrum().makeSound(durations=2.0)
+    long_prefix = long_notes[:, :short_notes.shape[1]]
+    long_prefix_peaks = np.max(np.abs(long_prefix), axis=1)
+    assert np.allclose(short_notes * long_prefix_peaks[:, np.newaxis], long_prefix)
+
+    reference = ElectronicDrum()
+    reference.setBackend("reference")
+    assert np.max(np.abs(reference.makeSound(durations=0.3) - short_notes)) < 1e-6
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
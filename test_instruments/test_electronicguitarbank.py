@@ -0,0 +1,73 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+ElectronicGuitarが赤色の周波数の音を正しく(有限で、正規化され、無音でなく)作成し、
+その弦の群れ(KarplusStrongBank)をブロック単位で求めた値が、
+1サンプルずつ進めた値と一致することを確かめるプログラム
+音を鳴らさない(sounddeviceを用いない)
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+from DSP.KarplusStrongBank import KarplusStrongBank
+
+from Instrument.ElectronicGuitar import ElectronicGuitar
+
+from Returner.Returner import electronicGuitarData, redFrequencies, soundWaveData
+
+import numpy as np
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    以下を確かめる
+        1. 全ての計算の実装で、赤色の周波数の音は有限で、絶対値の最大値が1に正規化され、無音でない
+        2. ElectronicGuitarと同じ遅延線長、初期波形、減衰係数の弦の群れについて、
+           processはprocessByStepと一致し、ピックアップ位置のtapも一致する
+    """
+
+    sound_wave_data = soundWaveData()
+    num_samples = sound_wave_data["num_samples"]
+
+    for backend in ElectronicGuitar().getBackends():
+        np.random.seed(0)
+        electronic_guitar = ElectronicGuitar()
+        electronic_guitar.setBackend(backend)
+        outputs = electronic_guitar.makeSound()
+        assert outputs.shape == (len(redFrequencies()), num_samples)
+        assert np.all(np.isfinite(outputs))
+        peaks = np.max(np.abs(outputs), axis=1)
+        assert np.all(peaks > 0.0) and np.allclose(peaks, 1.0, atol=1e-6)
+
+    electronicguitar_data = electronicGuitarData()
+    rng = np.random.default_rng(0)
+    initial_waves = []
+    pickup_indexes = []
+    for a_frequency in redFrequencies():
+        delay_int = int(sound_wave_data["sampling_rate"] / a_frequency)
+        delay_line = rng.uniform(-1, 1, delay_int) * electronicguitar_data["pluck_force"]
+        delay_line[0] += 1.0
+        initial_waves.append(delay_line)
+        pickup_indexes.append(int(electronicguitar_data["pickup_position"] * delay_int))
+    pickup_indexes = np.array(pickup_indexes)
+
+    strings = KarplusStrongBank(initial_waves, 0.996)
+    blocks = strings.process(num_samples)
+    block_taps = strings.tap(blocks, pickup_indexes)
+    steps = strings.processByStep(num_samples)
+    step_taps = strings.tap(steps, pickup_indexes)
+
+    assert np.max(np.abs(blocks - steps)) < 1e-12
+    assert np.max(np.abs(block_taps - step_taps)) < 1e-12
+    assert np.all(strings.cutoffs == num_samples)
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
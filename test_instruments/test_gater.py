@@ -0,0 +1,158 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+InstrumentGaterが、全ての楽器の音を開始位置(サンプル単位)に合わせて足し合わせ、
+コールバック1回分の時間に収まる速さで出力できることを確かめるプログラム
+音を鳴らす(sounddeviceを用いる)代わりに、コールバックが用いるmixを直接呼び出す
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+import Color.Color as color_module
+from Color.Color import Color
+
+from Gater.InstrumentGater import InstrumentGater
+
+from Instrument.Flute import Flute
+from Instrument.Oboe import Oboe
+from Instrument.ReggaeOrgan import ReggaeOrgan
+from Instrument.Trumpet import Trumpet
+
+from Returner.Returner import soundWaveData
+
+from test_instruments.test_backends import instrumentClasses
+
+import numpy as np
+
+import time
+
+class CountingPoolExecutor(color_module.ProcessPoolExecutor):
+    """
+    作られたプロセスプールの数を数えるプロセスプール
+    """
+
+    count = 0
+
+    def __init__(self, *arguments, **keywords):
+        """
+        このクラスのコンストラクタ
+        作られたプロセスプールの数を数える
+        """
+
+        CountingPoolExecutor.count += 1
+        super().__init__(*arguments, **keywords)
+
+def prepareColors(max_workers):
+    """
+    二つの色と、まだ音のない楽器を受け取ったゲーターに演奏の準備をさせ、
+    (ゲーター, 音を作成した楽器の群れ)を応答します
+    Arguments:
+        max_workers : プロセス数
+    """
+
+    np.random.seed(1)
+    colors = [Color(), Color()]
+    colors[0].instruments = [Flute(), Oboe()]
+    colors[1].instruments = [Trumpet(), ReggaeOrgan()]
+    extra = ReggaeOrgan()
+
+    a_gater = InstrumentGater(colors)
+    a_gater.addInstrument(extra)
+    a_gater.setMaxWorkers(max_workers)
+    a_gater.prepareToPerform()
+
+    return a_gater, colors[0].instruments + colors[1].instruments + [extra]
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    全ての楽器について、以下を確かめる
+        1. 出力は、楽器ごとの音(soundBankの行を順に並べたもの)を開始位置にずらし、音量をかけて足したものと一致する
+        2. 開始時刻を指定した楽器は、そのサンプルから鳴り始める
+        3. 最も遅く鳴り終わる楽器の終わりで止まり、最後のブロックの残りは0で埋まる
+        4. コールバック1回分の足し合わせは、ブロックの時間に収まる
+    また、複数の色の楽器と、addInstrumentで加えた音のない楽器は、
+    一つのプロセスプールでまとめて作成され、順に作成した音と一致することを確かめる
+    """
+
+    np.random.seed(0)
+    a_color = Color()
+    a_color.instruments = [an_instrument_class() for an_instrument_class in instrumentClasses()]
+
+    late = ReggaeOrgan()
+    late.makeSound([440.0], 0.5)
+
+    a_gater = InstrumentGater([a_color])
+    a_gater.setMaxWorkers(1)
+    a_gater.addInstrument(late, start=0.25, gain=0.5)
+    a_gater.prepareToPerform()
+
+    sampling_rate = soundWaveData()["sampling_rate"]
+    num_voices = len(a_color.instruments) + 1
+    late_start = int(0.25 * sampling_rate)
+    expected = np.zeros(a_gater.getNumSamples())
+    for an_instrument in a_color.instruments:
+        a_sound = an_instrument.getSoundBank().reshape(-1)
+        expected[:len(a_sound)] += a_sound / num_voices
+    late_sound = late.getSoundBank().reshape(-1)
+    expected[late_start:late_start + len(late_sound)] += 0.5 * late_sound
+    assert a_gater.getNumSamples() == max(late_start + len(late_sound),
+                                          max(len(an_instrument.getSoundBank().reshape(-1))
+                                              for an_instrument in a_color.instruments))
+
+    outdata = np.zeros((a_gater.blockSize, a_gater.channels), dtype=np.float32)
+    blocks = []
+    elapsed = []
+    playing = True
+    while playing:
+        start = time.perf_counter()
+        playing = a_gater.mix(outdata, a_gater.blockSize)
+        elapsed.append(time.perf_counter() - start)
+        blocks.append(outdata.copy())
+    outputs = np.concatenate(blocks)[:, 0]
+
+    assert len(outputs) >= a_gater.getNumSamples() > len(outputs) - a_gater.blockSize
+    assert not np.any(outputs[a_gater.getNumSamples():])
+    assert np.max(np.abs(outputs[:a_gater.getNumSamples()] - expected)) < 1e-5
+
+    alone = InstrumentGater()
+    alone.addInstrument(late, start=0.25, gain=0.5)
+    alone.prepareToPerform()
+    outdata = np.zeros((alone.blockSize, alone.channels), dtype=np.float32)
+    blocks = []
+    while alone.mix(outdata, alone.blockSize):
+        blocks.append(outdata.copy())
+    first_sample = np.flatnonzero(np.concatenate(blocks)[:, 0])[0]
+    assert first_sample == late_start + np.flatnonzero(late_sound)[0]
+
+    block_duration = a_gater.blockSize / sampling_rate
+    assert np.median(elapsed) < block_duration
+
+    print(f"{num_voices} instruments: {len(elapsed)} blocks, "
+          f"mix {np.median(elapsed) * 1e6:.1f}us per {block_duration * 1e3:.1f}ms block")
+
+    serial_gater, serial_instruments = prepareColors(1)
+    color_module.ProcessPoolExecutor = CountingPoolExecutor
+    try:
+        parallel_gater, parallel_instruments = prepareColors(2)
+    finally:
+        color_module.ProcessPoolExecutor = CountingPoolExecutor.__bases__[0]
+    assert CountingPoolExecutor.count == 1
+    for serial, parallel in zip(serial_instruments, parallel_instruments):
+        assert np.array_equal(serial.getSoundBank(), parallel.getSoundBank())
+    assert np.array_equal(serial_gater.voiceBank, parallel_gater.voiceBank)
+    for an_instrument in parallel_instruments:
+        an_instrument.releaseSounds()
+
+    print(f"{len(parallel_instruments)} instruments of 2 colors: {CountingPoolExecutor.count} process pool")
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
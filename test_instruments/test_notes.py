@@ -0,0 +1,93 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+Instrument/の全ての楽器について、makeSound(frequencies, durations, velocities)が
+任意の周波数、長さ、強さの音の群れを(音の数 × サンプル数)の配列として作れることを確かめるプログラム
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+from Returner.Returner import soundWaveData
+
+from test_instruments.test_backends import instrumentClasses
+
+import numpy as np
+
+import time
+
+def render(an_instrument_class, *arguments):
+    """
+    毎回同じシードから楽器の音を作成し、(応答された配列, 楽器)を応答します
+    Arguments:
+        an_instrument_class : 楽器クラス
+        arguments : makeSoundに渡す引数
+    """
+
+    np.random.seed(0)
+    an_instrument = an_instrument_class()
+    outputs = an_instrument.makeSound(*arguments)
+
+    return outputs, an_instrument
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    全ての楽器について、以下を確かめる
+        1. 引数なしのmakeSoundは、色の周波数の群れを渡したものと一致する
+        2. 一つの任意の周波数の音を作れる
+        3. 長さの異なる音は、最も長い音に合わせて後ろが0で埋められる
+        4. 強さは、音の群れをそのまま倍にする
+        5. 多くの任意の周波数の音をまとめて作れる
+        6. 遅延線の往復より短い音(出力が全て0になりうる音)も、NaNにならない
+        7. 高い音(遅延線やジェットの遅れが数サンプルになる音)も、例外やNaNにならない
+    """
+
+    num_samples = soundWaveData()["num_samples"]
+    random_frequencies = np.geomspace(110.0, 1760.0, 32)
+
+    for an_instrument_class in instrumentClasses():
+        defaults, an_instrument = render(an_instrument_class)
+        explicits, _ = render(an_instrument_class, an_instrument.frequencies)
+        assert defaults.shape == (len(an_instrument.frequencies), num_samples)
+        assert np.array_equal(defaults, np.array(an_instrument.getSoundsInstrumentPlay()))
+        assert np.array_equal(defaults, explicits)
+
+        single, _ = render(an_instrument_class, 523.25, 0.5)
+        assert single.shape == (1, soundWaveData(0.5)["num_samples"])
+        assert np.all(np.isfinite(single)) and np.max(np.abs(single)) > 0.0
+
+        mixed, _ = render(an_instrument_class, [523.25, 523.25], [0.25, 0.5])
+        short_samples = soundWaveData(0.25)["num_samples"]
+        assert mixed.shape == (2, soundWaveData(0.5)["num_samples"])
+        assert not np.any(mixed[0, short_samples:])
+
+        loud, _ = render(an_instrument_class, [440.0, 660.0], 0.25)
+        quiet, _ = render(an_instrument_class, [440.0, 660.0], 0.25, [0.5, 0.25])
+        assert np.allclose(quiet, loud * np.array([[0.5], [0.25]]))
+
+        very_short, _ = render(an_instrument_class, [110.0, 440.0, 1760.0], 0.001)
+        assert very_short.shape == (3, soundWaveData(0.001)["num_samples"])
+        assert np.all(np.isfinite(very_short))
+
+        high, _ = render(an_instrument_class, [11025.0, 12000.0], 0.1)
+        assert high.shape == (2, soundWaveData(0.1)["num_samples"])
+        assert np.all(np.isfinite(high))
+
+        start = time.time()
+        batch, _ = render(an_instrument_class, random_frequencies, 0.1)
+        elapsed = time.time() - start
+        assert batch.shape == (len(random_frequencies), soundWaveData(0.1)["num_samples"])
+        assert np.all(np.isfinite(batch))
+
+        print(f"{an_instrument_class.__name__}: {len(random_frequencies)} notes in {elapsed:.3f}s")
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
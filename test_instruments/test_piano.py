@@ -13,6 +13,8 @@ from Instrument.Piano import Piano
 
 import sounddevice as sd
 
+import numpy as np
+
 def main():
     """
     テストのメインプログラム
@@ -23,6 +25,8 @@ def main():
         /Users/nyx_z/AP/MyPythonProgramming/sonification/InstrumentSoundPlayback/Instrument/Piano.py:106: RuntimeWarning: invalid value encountered in divide
         output /= max(abs(output))
         追記11/1 ハンマー模型が全て0を応答していることが原因。より良いモデルを探すことが求められる
+        追記 接触フェーズ(非線形)と弦フェーズ(線形)に分けて直す。
+             出力が有限であることを確かめてから鳴らす
     """
 
     piano = Piano()
@@ -30,6 +34,10 @@ def main():
 
     sounds = piano.getSoundsInstrumentPlay()
 
+    for sound in sounds:
+        assert np.all(np.isfinite(sound))
+        assert np.max(np.abs(sound)) > 0.0
+
     for sound in sounds:
         sd.play(sound)
         sd.wait(3.0)
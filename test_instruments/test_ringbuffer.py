@@ -0,0 +1,125 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+BlockRingBufferが、一つの書き手と一つの読み手の間でブロックを順に受け渡し、
+取りこぼし(underruns, overruns)、溜まったブロックの数の最大値、遅れを数えることを確かめるプログラム
+InstrumentGaterの書き手のスレッドと、コールバックの代わりに読むスレッドの間でも確かめる
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+from Gater.BlockRingBuffer import BlockRingBuffer
+from Gater.InstrumentGater import InstrumentGater
+
+from Instrument.ReggaeOrgan import ReggaeOrgan
+
+from Returner.Returner import soundWaveData
+
+import numpy as np
+
+import threading
+import time
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    以下を確かめる
+        1. 空きがなければwriteはブロックを捨ててoverrunsを数え、溜まったブロックの数の最大値はブロックの数となる
+        2. 書いた順に読まれ、一周した後も正しく読まれる
+        3. ブロックがなければ0で埋めてunderrunsを数え、閉じた後は続きがないと応答する
+        4. 別々のスレッドの書き手(InstrumentGater)と読み手の間で、
+           取りこぼした(0で埋めた)ブロックを除けば、足し合わせた音がそのまま受け渡される
+        5. 書き手はリングバッファを満たしたことをEventで知らせ、それまでに溜まった数は数え直せる
+        6. 書き手が例外で終わっても、リングバッファを閉じてEventで知らせる(待っている側が止まったままにならない)
+    """
+
+    ring_buffer = BlockRingBuffer(4, 8, 2)
+    blocks = [np.full((8, 2), index, dtype=np.float32) for index in range(10)]
+    assert all(ring_buffer.write(a_block) for a_block in blocks[:4])
+    assert not ring_buffer.write(blocks[4])
+    assert ring_buffer.overruns == 1 and ring_buffer.highWaterMark == 4
+    ring_buffer.resetHighWaterMark()
+    assert ring_buffer.highWaterMark == 0 and ring_buffer.getFillLevel() == 4
+
+    outdata = np.empty((8, 2), dtype=np.float32)
+    for index in range(4):
+        assert ring_buffer.read(outdata) and np.all(outdata == index)
+    for index in range(5, 10):
+        ring_buffer.getFreeBlock()[:] = blocks[index]
+        ring_buffer.commitBlock()
+        assert ring_buffer.read(outdata) and np.all(outdata == index)
+    assert ring_buffer.highWaterMark == 1
+    assert ring_buffer.getFreeBlock() is not None and ring_buffer.underruns == 0
+
+    assert ring_buffer.read(outdata) and not np.any(outdata) and ring_buffer.underruns == 1
+    ring_buffer.close()
+    assert not ring_buffer.read(outdata) and ring_buffer.underruns == 1 and ring_buffer.isFinished()
+    statistics = ring_buffer.getStatistics()
+    assert statistics["blocks_written"] == statistics["blocks_read"] == 9
+    assert 0.0 <= statistics["latency_mean"] <= statistics["latency_max"]
+
+    an_instrument = ReggaeOrgan()
+    an_instrument.makeSound([440.0, 660.0], 0.5)
+    a_gater = InstrumentGater()
+    a_gater.addInstrument(an_instrument, start=0.1)
+    a_gater.prepareToPerform()
+    outdata = np.zeros((a_gater.blockSize, a_gater.channels), dtype=np.float32)
+    expected = []
+    while a_gater.mix(outdata, a_gater.blockSize):
+        expected.append(outdata.copy())
+    expected.append(outdata.copy())
+
+    a_gater.position = 0
+    a_gater.ringBuffer = BlockRingBuffer(8, a_gater.blockSize, a_gater.channels)
+    ready = threading.Event()
+    producer = threading.Thread(target=a_gater.produce, args=(ready,))
+    producer.start()
+    assert ready.wait(timeout=10.0)
+    assert a_gater.ringBuffer.getFillLevel() == 8
+    a_gater.ringBuffer.resetHighWaterMark()
+
+    block_duration = a_gater.blockSize / soundWaveData()["sampling_rate"]
+    received = []
+    while True:
+        underruns = a_gater.ringBuffer.underruns
+        if not a_gater.ringBuffer.read(outdata):
+            break
+        if a_gater.ringBuffer.underruns == underruns:
+            received.append(outdata.copy())
+        time.sleep(block_duration / 2)
+    producer.join()
+
+    assert len(received) == len(expected)
+    assert all(np.array_equal(a_block, an_expected) for a_block, an_expected in zip(received, expected))
+    statistics = a_gater.getStatistics()
+    assert statistics["blocks_read"] == statistics["blocks_written"] == len(expected)
+    assert statistics["overruns"] == 0 and 0 < statistics["high_water_mark"] <= 8
+
+    broken = InstrumentGater()
+    broken.ringBuffer = BlockRingBuffer(8, broken.blockSize, broken.channels)
+    ready = threading.Event()
+    producer = threading.Thread(target=lambda: broken.produce(ready), daemon=True)
+    threading_excepthook = threading.excepthook
+    threading.excepthook = lambda arguments: None
+    try:
+        producer.start()
+        assert ready.wait(timeout=10.0)
+        producer.join()
+    finally:
+        threading.excepthook = threading_excepthook
+    assert broken.ringBuffer.closed and broken.ringBuffer.isFinished()
+
+    print(f"{len(expected)} blocks: underruns {statistics['underruns']} "
+          f"high water mark {statistics['high_water_mark']} "
+          f"latency mean {statistics['latency_mean'] * 1e3:.2f}ms max {statistics['latency_max'] * 1e3:.2f}ms")
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+ColorのprepareToPerformが並列に作成した音の群れを、共有メモリでコピーせずに受け取り、
+pickleで受け取ったものと一致すること、楽器を解放すると共有メモリも解放されることを確かめるプログラム
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+from Color.Color import Color
+
+from test_instruments.test_backends import instrumentClasses
+
+import numpy as np
+
+import os
+import time
+
+def prepare(shared_memory):
+    """
+    全ての楽器を持つColorを、2つのプロセスで準備させ、(Color, 準備にかかった時間)を応答します
+    乱数を使う楽器があるため、毎回同じシードから準備させる
+    Arguments:
+        shared_memory : 共有メモリで受け取るか
+    """
+
+    np.random.seed(0)
+    a_color = Color()
+    a_color.instruments = [an_instrument_class() for an_instrument_class in instrumentClasses()]
+    a_color.setMaxWorkers(2)
+    a_color.setSharedMemory(shared_memory)
+    start = time.time()
+    a_color.prepareToPerform()
+    elapsed = time.time() - start
+
+    return a_color, elapsed
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    全ての楽器について、以下を確かめる
+        1. 共有メモリで受け取った音の群れは、pickleで受け取ったものと一致する
+        2. soundBankは共有メモリを包む配列(コピーではない)であり、共有メモリの名前は既に消えている
+        3. もう一度準備させると、音の群れが加わった新しい共有メモリに置き換わる
+        4. 楽器を解放すると、共有メモリも閉じられる
+    """
+
+    pickled, pickled_elapsed = prepare(False)
+    shared, shared_elapsed = prepare(True)
+
+    shared_memories = []
+    for a_pickled, a_shared in zip(pickled.instruments, shared.instruments):
+        sound_bank = a_shared.getSoundBank()
+        assert np.array_equal(sound_bank, a_pickled.getSoundBank())
+        assert a_shared.getSilenceCutoffs() == a_pickled.getSilenceCutoffs()
+        assert sound_bank is a_shared.sharedSoundBank.soundBank and not sound_bank.flags["OWNDATA"]
+        assert not os.path.exists(os.path.join("/dev/shm", a_shared.sharedSoundBank.getName()))
+        shared_memories.append(a_shared.sharedSoundBank.sharedMemory)
+    del sound_bank
+
+    shared.prepareToPerform()
+    for an_instrument, a_memory in zip(shared.instruments, shared_memories):
+        assert len(an_instrument.getSoundBank()) == 2 * len(an_instrument.frequencies)
+        assert an_instrument.sharedSoundBank.sharedMemory is not a_memory and a_memory.buf is None
+
+    shared_memories = [an_instrument.sharedSoundBank.sharedMemory for an_instrument in shared.instruments]
+    an_instrument = shared.instruments[0]
+    shared.releaseInstruments()
+    assert shared.instruments == [] and an_instrument.getSoundBank() is None
+    assert an_instrument.sharedSoundBank is None
+    assert all(a_memory.buf is None for a_memory in shared_memories)
+
+    print(f"{len(pickled.instruments)} instruments: pickled {pickled_elapsed:.3f}s "
+          f"shared {shared_elapsed:.3f}s")
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
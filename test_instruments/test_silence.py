@@ -0,0 +1,83 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+減衰する楽器(ElectronicGuitar, Ukulele, JapaneseGuitar, Vibraphone, Piano)について、
+無音の閾値を設定すると、聞こえなくなった音の計算を打ち切ることを確かめ、その速さを比べるプログラム
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+from Instrument.ElectronicGuitar import ElectronicGuitar
+from Instrument.Ukulele import Ukulele
+from Instrument.JapaneseGuitar import JapaneseGuitar
+from Instrument.Vibraphone import Vibraphone
+from Instrument.Piano import Piano
+
+from Returner.Returner import soundWaveData
+
+import numpy as np
+
+import time
+
+def render(an_instrument_class, silence_threshold, duration):
+    """
+    無音の閾値を設定して楽器の音を作成し、(音の群れ, 楽器, 作成にかかった時間)を応答します
+    乱数を使う楽器があるため、毎回同じシードから作成する
+    Arguments:
+        an_instrument_class : 楽器クラス
+        silence_threshold : 無音の閾値(dB)、またはNone
+        duration : 音の長さ(秒)
+    """
+
+    np.random.seed(0)
+    an_instrument = an_instrument_class()
+    an_instrument.setSilenceThreshold(silence_threshold)
+    start = time.time()
+    outputs = an_instrument.makeSound(durations=duration)
+    elapsed = time.time() - start
+
+    return outputs, an_instrument, elapsed
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    長い音について、以下を確かめる
+        1. 閾値を設定しなければ、打ち切らない
+        2. 閾値を設定すれば、打ち切った位置が音の長さに収まり、最も遅く打ち切った位置から後は0になる
+        3. 打ち切った音と最後まで求めた音の差は小さい
+        4. 少なくとも一つの音は、音の長さより前で打ち切られる
+    Vibraphoneはゆっくり減衰するため、閾値を高く、音を長くして確かめる
+    """
+
+    settings = [(ElectronicGuitar, -80.0, 6.0),
+                (Ukulele, -80.0, 6.0),
+                (JapaneseGuitar, -80.0, 6.0),
+                (Vibraphone, -50.0, 8.0),
+                (Piano, -80.0, 6.0)]
+
+    for an_instrument_class, silence_threshold, duration in settings:
+        num_samples = soundWaveData(duration)["num_samples"]
+
+        wholes, an_instrument, whole_elapsed = render(an_instrument_class, None, duration)
+        assert an_instrument.getSilenceCutoffs() == [num_samples] * len(wholes)
+
+        silenced, an_instrument, silenced_elapsed = render(an_instrument_class, silence_threshold, duration)
+        cutoffs = an_instrument.getSilenceCutoffs()
+        assert len(cutoffs) == len(silenced) and max(cutoffs) <= num_samples
+        assert min(cutoffs) < num_samples, f"{an_instrument_class.__name__}の音が打ち切られていません"
+        assert not np.any(silenced[:, max(cutoffs):])
+        assert np.max(np.abs(silenced - wholes)) < 1e-2
+
+        print(f"{an_instrument_class.__name__}: whole {whole_elapsed:.3f}s "
+              f"silenced {silenced_elapsed:.3f}s cutoffs {cutoffs}")
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
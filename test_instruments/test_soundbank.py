@@ -0,0 +1,99 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+Instrument/の全ての楽器について、音の群れが一つの連続した配列(soundBank)に束縛され、
+float32で束縛する場合も、float64の音と(float32の精度で)一致することを確かめるプログラム
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+from Instrument.ReggaeOrgan import ReggaeOrgan
+
+from Returner.Returner import sampleFormatEnvironmentVariable, soundWaveData
+
+from test_instruments.test_backends import instrumentClasses
+
+import numpy as np
+
+import os
+import tracemalloc
+
+def render(an_instrument_class, sample_format):
+    """
+    毎回同じシードから、指定した型で楽器の音を作成し、楽器を応答します
+    Arguments:
+        an_instrument_class : 楽器クラス
+        sample_format : 配列の型の名前
+    """
+
+    np.random.seed(0)
+    an_instrument = an_instrument_class()
+    an_instrument.setSampleFormat(sample_format)
+    an_instrument.makeSound()
+
+    return an_instrument
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    全ての楽器について、以下を確かめる
+        1. soundBankはC連続な(音の数 × サンプル数)の配列であり、
+           getSoundsInstrumentPlayはその行(コピーではない)を応答する
+        2. float32のsoundBankは、float64の半分の大きさで、float64の音と一致する
+        3. 続けてmakeSoundを呼ぶと、同じsoundBankに音の群れが加わる
+        4. 環境変数でも型を選べる
+    また、float64で同じ長さの音を作る場合は、renderNotesの配列をコピーせずにsoundBankとするため、
+    確保するメモリの最大値が音の群れの配列の1.5倍に収まることを確かめる
+    """
+
+    for an_instrument_class in instrumentClasses():
+        wide = render(an_instrument_class, "float64").getSoundBank()
+
+        an_instrument = render(an_instrument_class, "float32")
+        sound_bank = an_instrument.getSoundBank()
+        assert sound_bank.dtype == np.float32 and sound_bank.flags["C_CONTIGUOUS"]
+        assert sound_bank.shape == wide.shape and sound_bank.nbytes * 2 == wide.nbytes
+        for a_row, a_sound in zip(sound_bank, an_instrument.getSoundsInstrumentPlay()):
+            assert a_sound.base is sound_bank and np.array_equal(a_row, a_sound)
+        assert np.max(np.abs(sound_bank - wide)) < 1e-6
+
+        added = an_instrument.makeSound([440.0], 0.5)
+        sound_bank = an_instrument.getSoundBank()
+        assert sound_bank.dtype == np.float32 and len(sound_bank) == len(wide) + 1
+        assert added.base is sound_bank and len(an_instrument.getSoundsInstrumentPlay()) == len(sound_bank)
+        assert not np.any(sound_bank[-1, soundWaveData(0.5)["num_samples"]:])
+
+    os.environ[sampleFormatEnvironmentVariable()] = "float32"
+    try:
+        np.random.seed(0)
+        an_instrument = instrumentClasses()[0]()
+        an_instrument.makeSound()
+        assert an_instrument.getSoundBank().dtype == np.float32
+    finally:
+        del os.environ[sampleFormatEnvironmentVariable()]
+
+    for sample_format in ("float64", "float32"):
+        reggae_organ = ReggaeOrgan()
+        reggae_organ.setSampleFormat(sample_format)
+        tracemalloc.start()
+        reggae_organ.makeSound(np.geomspace(110.0, 1760.0, 100))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        sound_bank = reggae_organ.getSoundBank()
+        rendered_bytes = sound_bank.size * np.dtype(np.float64).itemsize
+        print(f"{sample_format}: bank {sound_bank.nbytes / 1e6:.0f}MB peak {peak / 1e6:.0f}MB")
+        if sample_format == "float64":
+            assert peak < 1.5 * sound_bank.nbytes
+        else:
+            assert peak < 1.5 * sound_bank.nbytes + rendered_bytes
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#! /usr/bin/env python
+#! -*- coding: utf-8 -*-
+
+"""
+ReggaeOrganの倍音の足し合わせ(テーブルを使う場合と使わない場合)が、
+参照実装と一致し、多くの音を作ってもメモリが出力の大きさに収まることを確かめるプログラム
+"""
+
+__author__ = "Tsuji Kodai"
+__version__ = "1.0.0"
+__date__ = "2025/11/21"
+
+from Instrument.ReggaeOrgan import ReggaeOrgan
+
+import numpy as np
+
+import tracemalloc
+
+def render(frequencies, backend, table_size, duration=None):
+    """
+    ReggaeOrganの音を作成し、(音の群れ, 作成中に確保したメモリの最大値(バイト))を応答します
+    Arguments:
+        frequencies : 周波数の群れ
+        backend : 実装の名前
+        table_size : テーブルの大きさ(Noneならテーブルを使わない)
+        duration : 音の長さ(秒)、Noneなら既定の長さ
+    """
+
+    reggae_organ = ReggaeOrgan()
+    reggae_organ.setBackend(backend)
+    reggae_organ.setWavetable(table_size)
+
+    tracemalloc.start()
+    outputs = reggae_organ.makeSound(frequencies, duration)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return outputs, peak
+
+def main():
+    """
+    テストのメインプログラム
+    常にリターンコードが0となることを想定している
+    以下を確かめる
+        1. テーブルを使わない足し合わせは参照実装と一致し、テーブルを使う場合も十分に近い
+        2. 300音(1秒)を作っても、確保するメモリは出力(音の数 × サンプル数)の3倍に収まる
+           (音の数 × 倍音の数 × サンプル数の配列を作らない)
+        3. テーブルを使っても、使わない場合よりメモリを多く確保しない
+        4. 無音の音(エンベロープが0である最初の1サンプルだけの音)は、0で割らずに0のままとなる
+    """
+
+    frequencies = np.geomspace(110.0, 1760.0, 300)
+
+    references, _ = render(frequencies[:20], "reference", None)
+    additives, _ = render(frequencies[:20], "numpy", None)
+    wavetables, _ = render(frequencies[:20], "numpy", 4096)
+    assert np.max(np.abs(additives - references)) < 1e-6
+    assert np.max(np.abs(wavetables - references)) < 1e-4
+
+    peaks = {}
+    for table_size in (None, 4096):
+        outputs, peak = render(frequencies, "numpy", table_size)
+        assert outputs.shape == (300, 44100) and np.all(np.isfinite(outputs))
+        assert peak < 3 * outputs.nbytes
+        peaks[table_size] = peak
+
+        print(f"table {table_size}: output {outputs.nbytes / 1e6:.0f}MB peak {peak / 1e6:.0f}MB")
+    assert peaks[4096] <= peaks[None]
+
+    for table_size in (None, 4096):
+        for backend in ("numpy", "reference"):
+            silent, _ = render([440.0, 880.0], backend, table_size, 1.5 / 44100)
+            assert silent.shape == (2, 1) and np.all(np.isfinite(silent)) and not np.any(silent)
+
+    return 0
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())